@@ -122,6 +122,16 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 12,
+    # orjson-backed JSON, output-compatible with DRF's JSONRenderer/JSONParser.
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 # JWT Configuration
@@ -171,10 +181,60 @@ SPECTACULAR_SETTINGS = {
     ],
 }
 
+# Catalog search: fall back to trigram title matching when full-text search
+# finds nothing (requires the pg_trgm PostgreSQL extension)
+CATALOG_SEARCH_TRIGRAM_FALLBACK = os.getenv("CATALOG_SEARCH_TRIGRAM_FALLBACK") == "True"
+
+# Product images: store storage URLs alongside image paths when they are written
+# (only for storages with stable, unsigned URLs)
+CATALOG_IMAGE_URLS_AT_WRITE = os.getenv("CATALOG_IMAGE_URLS_AT_WRITE") == "True"
+
+# Cart: cache each user's serialized cart; item writes invalidate the entry
+CART_CACHE_ENABLED = os.getenv("CART_CACHE_ENABLED") == "True"
+CART_CACHE_TIMEOUT = int(os.getenv("CART_CACHE_TIMEOUT", 5 * 60))  # seconds
+
+# Cart storage: "database" or "redis" (carts live only in Redis until checkout)
+CART_STORE = os.getenv("CART_STORE", "database")
+CART_REDIS_URL = os.getenv("CART_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/3"))
+CART_REDIS_TTL = int(os.getenv("CART_REDIS_TTL", 30 * 24 * 60 * 60))  # seconds
+
+# Stock reservations: hold checkout stock in Redis instead of locking product
+# rows; committed sales are flushed to the database by Celery beat
+STOCK_RESERVATIONS_ENABLED = os.getenv("STOCK_RESERVATIONS_ENABLED") == "True"
+STOCK_RESERVATION_TTL = int(os.getenv("STOCK_RESERVATION_TTL", 15 * 60))  # seconds
+STOCK_RESERVATIONS_REDIS_URL = os.getenv(
+    "STOCK_RESERVATIONS_REDIS_URL",
+    os.getenv("REDIS_URL", "redis://localhost:6379/2"),
+)
+
+CELERY_BEAT_SCHEDULE = {
+    "flush-committed-stock": {
+        "task": "orders.tasks.flush_committed_stock",
+        "schedule": 10.0,
+    },
+    "release-expired-stock-holds": {
+        "task": "orders.tasks.release_expired_stock_holds",
+        "schedule": 60.0,
+    },
+    # Safety net for webhook events whose processing could not be enqueued
+    "process-webhook-events": {
+        "task": "payments.tasks.process_webhook_events",
+        "schedule": 30.0,
+    },
+}
+
 # Chapa Payment Configuration
 CHAPA_SECRET_KEY = os.getenv("CHAPA_SECRET_KEY")
 CHAPA_PUBLIC_KEY = os.getenv("CHAPA_PUBLIC_KEY")
 CHAPA_BASE_URL = os.getenv("CHAPA_BASE_URL", "https://api.chapa.co/v1")
+# Gateway client (payments/gateway.py): timeouts in seconds, retries for
+# requests Chapa never acted on, and the circuit breaker's threshold/cool-down
+CHAPA_CONNECT_TIMEOUT = float(os.getenv("CHAPA_CONNECT_TIMEOUT", 3.05))
+CHAPA_READ_TIMEOUT = float(os.getenv("CHAPA_READ_TIMEOUT", 10))
+CHAPA_MAX_RETRIES = int(os.getenv("CHAPA_MAX_RETRIES", 2))
+CHAPA_POOL_SIZE = int(os.getenv("CHAPA_POOL_SIZE", 10))
+CHAPA_BREAKER_FAILURES = int(os.getenv("CHAPA_BREAKER_FAILURES", 5))
+CHAPA_BREAKER_RESET = float(os.getenv("CHAPA_BREAKER_RESET", 30))
 
 # Payment Callback URLs
 PAYMENT_CALLBACK_URL = os.getenv(
@@ -0,0 +1,30 @@
+"""
+Per-user cache of the serialized cart.
+
+Reads are served from the cache when CART_CACHE_ENABLED is set. Every write
+to a cart's items deletes the entry, and CART_CACHE_TIMEOUT bounds how long
+product titles and prices shown in the cart can lag behind the catalog.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+CART_KEY = "cart:user:{user_id}"
+
+
+def cart_cache_enabled():
+    return getattr(settings, "CART_CACHE_ENABLED", False)
+
+
+def get_cached_cart(user_id):
+    if not cart_cache_enabled():
+        return None
+    return cache.get(CART_KEY.format(user_id=user_id))
+
+
+def set_cached_cart(user_id, data):
+    if cart_cache_enabled():
+        cache.set(CART_KEY.format(user_id=user_id), data, settings.CART_CACHE_TIMEOUT)
+
+
+def invalidate_cart_cache(user_id):
+    cache.delete(CART_KEY.format(user_id=user_id))
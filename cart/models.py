@@ -18,6 +18,9 @@ class Cart(models.Model):
 
     @property
     def total(self) -> Decimal:
+        # Sum already-loaded items instead of issuing an aggregate query.
+        if "items" in getattr(self, "_prefetched_objects_cache", {}):
+            return sum((item.line_total for item in self.items.all()), Decimal("0.00"))
         agg = self.items.aggregate(total=Sum(F("unit_price") * F("quantity")))
         return agg["total"] or Decimal("0.00")
 
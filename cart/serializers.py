@@ -1,4 +1,3 @@
-from django.db import transaction
 from rest_framework import serializers
 
 from catalog.models import Product
@@ -51,35 +50,71 @@ class CartItemCreateSerializer(serializers.Serializer):
             raise serializers.ValidationError("Quantity must be > 0")
         return value
 
-    def validate_product_id(self, value):
-        try:
-            product = Product.objects.get(pk=value, is_active=True)
-        except Product.DoesNotExist:
-            raise serializers.ValidationError("Product not found or inactive.")
-        return value
+    def validate(self, attrs):
+        # The product fetched here is the one the store writes against, so
+        # each add-to-cart resolves it exactly once.
+        product = Product.objects.filter(pk=attrs["product_id"], is_active=True).first()
+        if product is None:
+            raise serializers.ValidationError({"product_id": ["Product not found or inactive."]})
+        if product.stock_quantity < attrs["quantity"]:
+            raise serializers.ValidationError({"quantity": ["Not enough stock for this product."]})
+        attrs["product"] = product
+        return attrs
 
     def save(self, **kwargs):
         """
-        Create or increment CartItem. Expects 'cart' in context (Cart instance).
+        Create or increment the cart item. Expects 'store' in context (a cart store).
         """
-        cart: Cart = self.context["cart"]
-        product = Product.objects.select_for_update().get(pk=self.validated_data["product_id"])
-        qty = self.validated_data["quantity"]
+        return self.context["store"].add_item(
+            self.validated_data["product"], self.validated_data["quantity"]
+        )
 
-        # Validate stock availability (product has stock_quantity field)
-        if hasattr(product, "stock_quantity") and product.stock_quantity < qty:
-            raise serializers.ValidationError("Not enough stock for this product.")
 
-        # Upsert item
-        with transaction.atomic():
-            item, created = CartItem.objects.select_for_update().get_or_create(
-                cart=cart, product=product,
-                defaults={"quantity": qty, "unit_price": product.price}
+class CartItemLineSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(default=1)
+
+    def validate_quantity(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Quantity must be > 0")
+        return value
+
+
+class CartItemBulkSerializer(serializers.Serializer):
+    items = CartItemLineSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, value):
+        """
+        Merge repeated products and check every line against a single product query.
+        """
+        quantities = {}
+        for line in value:
+            product_id = line["product_id"]
+            quantities[product_id] = quantities.get(product_id, 0) + line["quantity"]
+
+        products = Product.objects.filter(pk__in=quantities, is_active=True).in_bulk()
+        missing = sorted(set(quantities) - set(products))
+        if missing:
+            raise serializers.ValidationError(
+                f"Products not found or inactive: {', '.join(map(str, missing))}."
+            )
+        short = sorted(
+            product_id for product_id, quantity in quantities.items()
+            if products[product_id].stock_quantity < quantity
+        )
+        if short:
+            raise serializers.ValidationError(
+                f"Not enough stock for products: {', '.join(map(str, short))}."
             )
-            if not created:
-                item.quantity += qty
-                item.save(update_fields=["quantity", "updated_at"])
-        return item
+
+        self.products = products
+        return quantities
+
+    def save(self, **kwargs):
+        """
+        Add every line to the cart. Expects 'store' in context (a cart store).
+        """
+        return self.context["store"].add_items(self.products, self.validated_data["items"])
 
 
 class CartItemUpdateSerializer(serializers.ModelSerializer):
@@ -98,9 +133,7 @@ class CartItemUpdateSerializer(serializers.ModelSerializer):
         product = instance.product
         if hasattr(product, "stock_quantity") and product.stock_quantity < qty:
             raise serializers.ValidationError("Not enough stock for this product.")
-        instance.quantity = qty
-        instance.save(update_fields=["quantity", "updated_at"])
-        return instance
+        return self.context["store"].update_item(instance, qty)
 
 
 class CartSerializer(serializers.ModelSerializer):
@@ -0,0 +1,324 @@
+"""
+Cart storage backends.
+
+CART_STORE selects where carts live until checkout:
+
+- ``"database"`` (default) keeps them in ``Cart``/``CartItem`` rows.
+- ``"redis"`` keeps each user's cart in a single Redis hash, so browsing and
+  editing a cart never writes to PostgreSQL. Checkout reads the items from
+  the store, and the resulting order rows are the database record of the cart.
+
+Both stores hand out ``Cart``/``CartItem`` instances so the views and
+serializers are shared. Instances built by the Redis store are never saved.
+"""
+import json
+from decimal import Decimal
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from catalog.models import Product
+from .models import Cart, CartItem
+
+CART_KEY = "cart:{user_id}"
+CART_IDS_KEY = "cart:ids"
+CART_FIELD = "cart"
+ITEM_FIELD_PREFIX = "item:"
+
+# KEYS: cart hash, id counter
+# ARGV: product id, quantity, unit price, now, ttl
+ADD_ITEM_SCRIPT = """
+local cart = redis.call('HGET', KEYS[1], 'cart')
+if cart then
+    cart = cjson.decode(cart)
+else
+    cart = {id = redis.call('INCR', KEYS[2]), created_at = ARGV[4]}
+end
+cart.updated_at = ARGV[4]
+local field = '""" + ITEM_FIELD_PREFIX + """' .. ARGV[1]
+local item = redis.call('HGET', KEYS[1], field)
+if item then
+    item = cjson.decode(item)
+    item.quantity = item.quantity + tonumber(ARGV[2])
+else
+    item = {
+        id = redis.call('INCR', KEYS[2]),
+        quantity = tonumber(ARGV[2]),
+        unit_price = ARGV[3],
+        created_at = ARGV[4],
+    }
+end
+item.updated_at = ARGV[4]
+item = cjson.encode(item)
+redis.call('HSET', KEYS[1], 'cart', cjson.encode(cart), field, item)
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return item
+"""
+
+# KEYS: cart hash
+# ARGV: product id, quantity, now, ttl
+UPDATE_ITEM_SCRIPT = """
+local field = '""" + ITEM_FIELD_PREFIX + """' .. ARGV[1]
+local item = redis.call('HGET', KEYS[1], field)
+if not item then
+    return nil
+end
+item = cjson.decode(item)
+item.quantity = tonumber(ARGV[2])
+item.updated_at = ARGV[3]
+item = cjson.encode(item)
+redis.call('HSET', KEYS[1], field, item)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return item
+"""
+
+# KEYS: cart hash
+# Drops every item but keeps the cart's id and timestamps.
+CLEAR_SCRIPT = """
+local removed = 0
+for _, field in ipairs(redis.call('HKEYS', KEYS[1])) do
+    if field ~= 'cart' then
+        removed = removed + redis.call('HDEL', KEYS[1], field)
+    end
+end
+return removed
+"""
+
+
+class DatabaseCartStore:
+    def __init__(self, user):
+        self.user = user
+
+    def _items_queryset(self):
+        return CartItem.objects.filter(cart__user=self.user).select_related("product")
+
+    def get_cart(self):
+        """
+        Load the user's cart with its items and their products in two queries.
+        """
+        items = Prefetch(
+            "items", queryset=CartItem.objects.select_related("product").order_by("id")
+        )
+        cart = Cart.objects.filter(user=self.user).prefetch_related(items).first()
+        if cart is None:
+            cart, _ = Cart.objects.get_or_create(user=self.user)
+            prefetch_related_objects([cart], items)
+        return cart
+
+    def list_items(self):
+        return list(self._items_queryset().order_by("id"))
+
+    def get_item(self, item_id):
+        try:
+            return self._items_queryset().get(pk=item_id)
+        except (CartItem.DoesNotExist, ValueError, TypeError):
+            raise Http404
+
+    def _locked_cart(self):
+        """
+        Get or create the user's cart with its row locked. Adds for one user
+        then run one at a time, including adds of lines that do not exist yet
+        and so have no row to lock.
+        """
+        cart, _ = Cart.objects.select_for_update().get_or_create(user=self.user)
+        return cart
+
+    def add_item(self, product, quantity):
+        """
+        Create the item or increment its quantity. ``product`` has already been
+        validated (active, enough stock), so only the cart is locked.
+        """
+        with transaction.atomic():
+            cart = self._locked_cart()
+            item, created = CartItem.objects.select_for_update().get_or_create(
+                cart=cart, product=product,
+                defaults={"quantity": quantity, "unit_price": product.price}
+            )
+            if not created:
+                item.product = product  # reuse the validated instance
+                item.quantity += quantity
+                item.save(update_fields=["quantity", "updated_at"])
+        return item
+
+    def add_items(self, products, quantities):
+        """
+        Add ``{product_id: quantity}`` to the cart with a single upsert.
+        ``products`` maps the same ids to already validated products.
+        """
+        with transaction.atomic():
+            # The upsert writes existing + quantity, so the read must not race.
+            cart = self._locked_cart()
+            existing = dict(
+                CartItem.objects.select_for_update()
+                .filter(cart=cart, product_id__in=quantities)
+                .values_list("product_id", "quantity")
+            )
+            CartItem.objects.bulk_create(
+                [
+                    CartItem(
+                        cart=cart,
+                        product=products[product_id],
+                        quantity=existing.get(product_id, 0) + quantity,
+                        unit_price=products[product_id].price,
+                    )
+                    for product_id, quantity in sorted(quantities.items())
+                ],
+                update_conflicts=True,
+                unique_fields=["cart", "product"],
+                # keep the price snapshot taken when the line was first added
+                update_fields=["quantity", "updated_at"],
+            )
+
+    def update_item(self, item, quantity):
+        item.quantity = quantity
+        item.save(update_fields=["quantity", "updated_at"])
+        return item
+
+    def remove_item(self, item):
+        item.delete()
+
+    def clear(self):
+        CartItem.objects.filter(cart__user=self.user).delete()
+
+
+class RedisCartStore:
+    """
+    One hash per user: a ``cart`` field with the cart's id and timestamps, and
+    an ``item:<product_id>`` field per line. Ids come from a shared counter so
+    item URLs keep working like their database counterparts. Idle carts
+    expire after CART_REDIS_TTL seconds.
+    """
+
+    def __init__(self, user, client):
+        self.user = user
+        self.client = client
+        self.key = CART_KEY.format(user_id=user.pk)
+        self.ttl = settings.CART_REDIS_TTL
+        self._add_item = client.register_script(ADD_ITEM_SCRIPT)
+        self._update_item = client.register_script(UPDATE_ITEM_SCRIPT)
+        self._clear = client.register_script(CLEAR_SCRIPT)
+
+    def _now(self):
+        return timezone.now().isoformat()
+
+    def _build_item(self, cart, product, data):
+        return CartItem(
+            id=data["id"],
+            cart=cart,
+            product=product,
+            quantity=data["quantity"],
+            unit_price=Decimal(data["unit_price"]),
+            created_at=parse_datetime(data["created_at"]),
+            updated_at=parse_datetime(data["updated_at"]),
+        )
+
+    def _load(self):
+        """Read the hash and its products: one HGETALL and one query."""
+        raw = {
+            field.decode(): json.loads(value)
+            for field, value in self.client.hgetall(self.key).items()
+        }
+        meta = raw.pop(CART_FIELD, None)
+        if meta is None:
+            now = self._now()
+            meta = {"id": self.client.incr(CART_IDS_KEY), "created_at": now, "updated_at": now}
+            if not self.client.hsetnx(self.key, CART_FIELD, json.dumps(meta)):
+                meta = json.loads(self.client.hget(self.key, CART_FIELD))
+            self.client.expire(self.key, self.ttl)
+
+        cart = Cart(
+            id=meta["id"],
+            user=self.user,
+            created_at=parse_datetime(meta["created_at"]),
+            updated_at=parse_datetime(meta["updated_at"]),
+        )
+        lines = {
+            int(field[len(ITEM_FIELD_PREFIX):]): data
+            for field, data in raw.items()
+            if field.startswith(ITEM_FIELD_PREFIX)
+        }
+        products = Product.objects.in_bulk(list(lines)) if lines else {}
+        # Lines whose product has since been deleted are dropped.
+        items = sorted(
+            (
+                self._build_item(cart, products[product_id], data)
+                for product_id, data in lines.items()
+                if product_id in products
+            ),
+            key=lambda item: item.id,
+        )
+        return cart, items
+
+    def get_cart(self):
+        cart, items = self._load()
+        # Serve cart.items.all() and Cart.total from the loaded lines.
+        cart._prefetched_objects_cache = {"items": items}
+        return cart
+
+    def list_items(self):
+        return self._load()[1]
+
+    def get_item(self, item_id):
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            raise Http404
+        for item in self.list_items():
+            if item.id == item_id:
+                return item
+        raise Http404
+
+    def add_item(self, product, quantity):
+        data = self._add_item(
+            keys=[self.key, CART_IDS_KEY],
+            args=[product.pk, quantity, str(product.price), self._now(), self.ttl],
+        )
+        data = json.loads(data)
+        cart = Cart(user=self.user)
+        return self._build_item(cart, product, data)
+
+    def add_items(self, products, quantities):
+        now = self._now()
+        pipe = self.client.pipeline()
+        for product_id, quantity in sorted(quantities.items()):
+            self._add_item(
+                keys=[self.key, CART_IDS_KEY],
+                args=[product_id, quantity, str(products[product_id].price), now, self.ttl],
+                client=pipe,
+            )
+        pipe.execute()
+
+    def update_item(self, item, quantity):
+        data = self._update_item(
+            keys=[self.key], args=[item.product_id, quantity, self._now(), self.ttl]
+        )
+        if data is None:
+            raise Http404
+        return self._build_item(item.cart, item.product, json.loads(data))
+
+    def remove_item(self, item):
+        self.client.hdel(self.key, f"{ITEM_FIELD_PREFIX}{item.product_id}")
+
+    def clear(self):
+        self._clear(keys=[self.key])
+
+
+_client = None
+
+
+def get_redis_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.CART_REDIS_URL)
+    return _client
+
+
+def get_cart_store(user):
+    if getattr(settings, "CART_STORE", "database") == "redis":
+        return RedisCartStore(user, get_redis_client())
+    return DatabaseCartStore(user)
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
@@ -81,3 +83,68 @@ class TestCartView:
 
         assert response.status_code == 204
         assert CartItem.objects.count() == 0
+
+    def test_get_cart_query_count_is_constant(self, auth_client, cart, category):
+        from catalog.models import Product
+
+        for i in range(5):
+            product = Product.objects.create(
+                category=category, title=f"Item {i}", price=10, stock_quantity=10
+            )
+            CartItem.objects.create(cart=cart, product=product, quantity=2, unit_price=10)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(reverse("cart-detail"))
+
+        assert response.status_code == 200
+        assert len(response.data["items"]) == 5
+        assert response.data["total"] == "100.00"
+        # auth is forced in tests, so every query belongs to the cart read
+        assert len(ctx.captured_queries) == 2
+
+    def test_get_cart_creates_missing_cart(self, auth_client, user):
+        response = auth_client.get(reverse("cart-detail"))
+
+        assert response.status_code == 200
+        assert response.data["items"] == []
+        assert response.data["total"] == "0.00"
+        assert Cart.objects.filter(user=user).exists()
+
+
+class TestCartCache:
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, settings):
+        from django.core.cache import cache
+
+        settings.CART_CACHE_ENABLED = True
+        cache.clear()
+
+    def test_repeat_reads_are_served_from_cache(self, auth_client, cart, cart_item):
+        url = reverse("cart-detail")
+        auth_client.get(url)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(url)
+
+        assert response.data["total"] == "50.00"
+        assert len(ctx.captured_queries) == 0
+
+    def test_item_writes_invalidate_cache(self, auth_client, cart, cart_item, product):
+        url = reverse("cart-detail")
+        auth_client.get(url)
+
+        auth_client.patch(
+            reverse("cartitem-detail", args=[cart_item.id]), {"quantity": 3}, format="json"
+        )
+        assert auth_client.get(url).data["total"] == "150.00"
+
+        auth_client.delete(reverse("cartitem-detail", args=[cart_item.id]))
+        assert auth_client.get(url).data["items"] == []
+
+        auth_client.post(
+            reverse("cartitem-list"), {"product_id": product.id, "quantity": 1}, format="json"
+        )
+        assert auth_client.get(url).data["total"] == "50.00"
+
+        auth_client.delete(reverse("cart-clear"))
+        assert auth_client.get(url).data["items"] == []
@@ -1,4 +1,9 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
@@ -96,6 +101,120 @@ class TestCartItemCreate:
         updated_item = CartItem.objects.get()
         assert updated_item.quantity == 4  # 1 + 3
 
+    def test_add_item_query_count(self, auth_client, cart, cart_item, product):
+        url = reverse("cartitem-list")
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.post(url, {"product_id": product.id}, format="json")
+
+        assert response.status_code == 201
+        sql = [q["sql"] for q in ctx.captured_queries]
+        # product, cart, locked cart line, update; plus the atomic savepoint pair
+        assert len(sql) == 6
+        assert sum('FROM "catalog_product"' in q for q in sql) == 1
+        assert not any('"catalog_product"' in q and "FOR UPDATE" in q for q in sql)
+
+    def test_add_inactive_product_is_rejected(self, auth_client, product):
+        product.is_active = False
+        product.save()
+
+        response = auth_client.post(
+            reverse("cartitem-list"), {"product_id": product.id}, format="json"
+        )
+
+        assert response.status_code == 400
+        assert "product_id" in response.data
+
+    def test_add_more_than_stock_is_a_quantity_error(self, auth_client, product):
+        response = auth_client.post(
+            reverse("cartitem-list"), {"product_id": product.id, "quantity": 11}, format="json"
+        )
+
+        assert response.status_code == 400
+        assert response.data == {"quantity": ["Not enough stock for this product."]}
+
+
+class TestCartItemBulk:
+    def make_products(self, category, count):
+        from catalog.models import Product
+        return [
+            Product.objects.create(
+                category=category, title=f"Item {i}", price=10, stock_quantity=10
+            )
+            for i in range(count)
+        ]
+
+    def test_bulk_add_merges_with_existing(self, auth_client, cart, cart_item, product, category):
+        other = self.make_products(category, 1)[0]
+        url = reverse("cartitem-bulk")
+
+        payload = {
+            "items": [
+                {"product_id": product.id, "quantity": 2},
+                {"product_id": other.id, "quantity": 1},
+                {"product_id": other.id, "quantity": 2},
+            ]
+        }
+        response = auth_client.post(url, payload, format="json")
+
+        assert response.status_code == 200
+        assert response.data["id"] == cart.id
+        assert response.data["total"] == "180.00"  # 3 x 50 + 3 x 10
+        quantities = dict(CartItem.objects.values_list("product_id", "quantity"))
+        assert quantities == {product.id: 3, other.id: 3}
+        cart_item.refresh_from_db()
+        assert cart_item.unit_price == 50
+
+    def test_bulk_add_query_count_is_constant(self, auth_client, cart, category):
+        url = reverse("cartitem-bulk")
+
+        def run(products):
+            payload = {"items": [{"product_id": p.id, "quantity": 1} for p in products]}
+            with CaptureQueriesContext(connection) as ctx:
+                response = auth_client.post(url, payload, format="json")
+            assert response.status_code == 200
+            return len(ctx.captured_queries)
+
+        assert run(self.make_products(category, 1)) == run(self.make_products(category, 10))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_concurrent_bulk_adds_keep_every_increment(self, user, cart, category):
+        products = self.make_products(category, 3)
+        payload = {"items": [{"product_id": p.id, "quantity": 1} for p in products]}
+        url = reverse("cartitem-bulk")
+        adds = 8
+        barrier = threading.Barrier(adds)
+
+        def add(_):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            try:
+                barrier.wait()
+                return client.post(url, payload, format="json").status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=adds) as pool:
+            statuses = list(pool.map(add, range(adds)))
+
+        assert statuses == [200] * adds
+        quantities = dict(CartItem.objects.values_list("product_id", "quantity"))
+        assert quantities == {p.id: adds for p in products}
+
+    def test_bulk_add_rejects_unknown_and_short_products(self, auth_client, product):
+        url = reverse("cartitem-bulk")
+
+        response = auth_client.post(
+            url, {"items": [{"product_id": 999999, "quantity": 1}]}, format="json"
+        )
+        assert response.status_code == 400
+
+        response = auth_client.post(
+            url, {"items": [{"product_id": product.id, "quantity": 11}]}, format="json"
+        )
+        assert response.status_code == 400
+        assert CartItem.objects.count() == 0
+
 
 class TestCartItemUpdate:
     def test_update_quantity(self, auth_client, cart_item):
@@ -109,6 +228,16 @@ class TestCartItemUpdate:
         cart_item.refresh_from_db()
         assert cart_item.quantity == 3
 
+    def test_update_query_count(self, auth_client, cart_item):
+        url = reverse("cartitem-detail", args=[cart_item.id])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.patch(url, {"quantity": 3}, format="json")
+
+        assert response.status_code == 200
+        # the line joined with its product, then the update; no cart lookup
+        assert len(ctx.captured_queries) == 2
+
 
 class TestCartItemDelete:
     def test_delete_cart_item(self, auth_client, cart_item):
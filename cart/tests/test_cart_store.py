@@ -0,0 +1,147 @@
+import fakeredis
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from cart import stores
+from cart.models import Cart, CartItem
+from orders.models import Order
+
+User = get_user_model()
+
+SHIPPING_ADDRESS = {
+    "address_line": "123 Test St",
+    "city": "Test City",
+    "postal_code": "12345",
+    "country": "Test Country",
+}
+
+
+@pytest.fixture(autouse=True)
+def redis_store(settings, monkeypatch):
+    settings.CART_STORE = "redis"
+    monkeypatch.setattr(stores, "_client", fakeredis.FakeRedis())
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username="testuser", email="test@example.com", password="pass1234"
+    )
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def product(db):
+    from catalog.models import Category, Product
+
+    category = Category.objects.create(name="Clothes")
+    return Product.objects.create(
+        category=category, title="T-Shirt", price=50, stock_quantity=10
+    )
+
+
+def add(client, product, quantity=1):
+    return client.post(
+        reverse("cartitem-list"),
+        {"product_id": product.id, "quantity": quantity},
+        format="json",
+    )
+
+
+def writes(queries):
+    return [
+        q["sql"] for q in queries
+        if q["sql"].split()[0].upper() in {"INSERT", "UPDATE", "DELETE"}
+    ]
+
+
+@pytest.mark.django_db
+class TestRedisCartStore:
+    def test_add_item_does_not_write_to_database(self, auth_client, product):
+        with CaptureQueriesContext(connection) as ctx:
+            response = add(auth_client, product, 2)
+            add(auth_client, product, 1)
+
+        assert response.status_code == 201
+        assert response.data["quantity"] == 2
+        assert response.data["line_total"] == "100.00"
+        assert writes(ctx.captured_queries) == []
+        assert Cart.objects.count() == 0
+        assert CartItem.objects.count() == 0
+
+    def test_cart_matches_database_contract(self, auth_client, product):
+        item_id = add(auth_client, product, 2).data["id"]
+
+        response = auth_client.get(reverse("cart-detail"))
+
+        assert response.status_code == 200
+        assert response.data["id"] is not None
+        assert response.data["total"] == "100.00"
+        [item] = response.data["items"]
+        assert item["id"] == item_id
+        assert item["product"] == {"id": product.id, "title": "T-Shirt", "price": "50.00"}
+        assert item["unit_price"] == "50.00"
+
+    def test_bulk_add(self, auth_client, product):
+        add(auth_client, product, 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.post(
+                reverse("cartitem-bulk"),
+                {"items": [{"product_id": product.id, "quantity": 2}]},
+                format="json",
+            )
+
+        assert response.status_code == 200
+        assert response.data["items"][0]["quantity"] == 3
+        assert response.data["total"] == "150.00"
+        assert writes(ctx.captured_queries) == []
+
+    def test_update_retrieve_and_delete_item(self, auth_client, product):
+        item_id = add(auth_client, product).data["id"]
+        url = reverse("cartitem-detail", args=[item_id])
+
+        response = auth_client.patch(url, {"quantity": 4}, format="json")
+        assert response.status_code == 200
+        assert auth_client.get(url).data["quantity"] == 4
+
+        response = auth_client.patch(url, {"quantity": 11}, format="json")
+        assert response.status_code == 400
+
+        assert auth_client.delete(url).status_code == 204
+        assert auth_client.get(url).status_code == 404
+
+    def test_clear_keeps_cart_id(self, auth_client, product):
+        add(auth_client, product)
+        cart_id = auth_client.get(reverse("cart-detail")).data["id"]
+
+        assert auth_client.delete(reverse("cart-clear")).status_code == 204
+
+        response = auth_client.get(reverse("cart-detail"))
+        assert response.data["id"] == cart_id
+        assert response.data["items"] == []
+
+    def test_checkout_reads_from_store(self, auth_client, product):
+        add(auth_client, product, 3)
+
+        response = auth_client.post(
+            reverse("orders:order-list"),
+            {"shipping_address": SHIPPING_ADDRESS, "payment_method": "chapa"},
+            format="json",
+        )
+
+        assert response.status_code == 201
+        order = Order.objects.get(pk=response.data["id"])
+        assert order.items.get().quantity == 3
+        assert auth_client.get(reverse("cart-detail")).data["items"] == []
+        assert Cart.objects.count() == 0
@@ -1,4 +1,3 @@
-from django.db import transaction
 from rest_framework import status, viewsets, mixins
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
@@ -7,20 +6,18 @@ from rest_framework.generics import get_object_or_404
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter
 from rest_framework import serializers
 
-from .models import Cart, CartItem
+from .cache_utils import get_cached_cart, invalidate_cart_cache, set_cached_cart
+from .models import CartItem
+from .stores import get_cart_store
 from .serializers import (
     CartSerializer,
     CartItemSerializer,
     CartItemCreateSerializer,
+    CartItemBulkSerializer,
     CartItemUpdateSerializer,
 )
 
 
-def get_or_create_cart_for_user(user):
-    cart, _ = Cart.objects.get_or_create(user=user)
-    return cart
-
-
 class CartViewSet(viewsets.ViewSet):
     """
     GET /api/cart/ -> retrieve current user's cart
@@ -36,9 +33,11 @@ class CartViewSet(viewsets.ViewSet):
     )
     def list(self, request):
         # list() mapped to GET /cart/ by DefaultRouter when using ViewSet
-        cart = get_or_create_cart_for_user(request.user)
-        serializer = CartSerializer(cart)
-        return Response(serializer.data)
+        data = get_cached_cart(request.user.pk)
+        if data is None:
+            data = CartSerializer(get_cart_store(request.user).get_cart()).data
+            set_cached_cart(request.user.pk, data)
+        return Response(data)
 
     @extend_schema(
         summary="Clear cart",
@@ -48,8 +47,8 @@ class CartViewSet(viewsets.ViewSet):
     )
     @action(detail=False, methods=["delete"], url_path="clear")
     def clear(self, request):
-        cart = get_or_create_cart_for_user(request.user)
-        cart.items.all().delete()
+        get_cart_store(request.user).clear()
+        invalidate_cart_cache(request.user.pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -66,8 +65,22 @@ class CartItemViewSet(
     lookup_field = "pk"
 
     def get_queryset(self):
-        cart = get_or_create_cart_for_user(self.request.user)
-        return CartItem.objects.filter(cart=cart).select_related("product")
+        return CartItem.objects.filter(cart__user=self.request.user).select_related("product")
+
+    def get_store(self):
+        # Build the store once per request and reuse it across the write path.
+        if not hasattr(self, "_store"):
+            self._store = get_cart_store(self.request.user)
+        return self._store
+
+    def get_object(self):
+        return self.get_store().get_item(self.kwargs[self.lookup_field])
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        quantity = serializer.validated_data.get("quantity", instance.quantity)
+        serializer.instance = self.get_store().update_item(instance, quantity)
+        invalidate_cart_cache(self.request.user.pk)
 
     @extend_schema(
         summary="List cart items",
@@ -76,8 +89,8 @@ class CartItemViewSet(
         tags=["Cart"],
     )
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = CartItemSerializer(queryset, many=True)
+        items = self.get_store().list_items()
+        serializer = CartItemSerializer(items, many=True)
         return Response({"results": serializer.data})
 
     @extend_schema(
@@ -91,15 +104,34 @@ class CartItemViewSet(
         tags=["Cart"],
     )
     def create(self, request, *args, **kwargs):
-        cart = get_or_create_cart_for_user(request.user)
-        serializer = CartItemCreateSerializer(data=request.data, context={"cart": cart})
+        serializer = CartItemCreateSerializer(
+            data=request.data, context={"store": self.get_store()}
+        )
         serializer.is_valid(raise_exception=True)
-
-        with transaction.atomic():
-            item = serializer.save()
+        item = serializer.save()
+        invalidate_cart_cache(request.user.pk)
 
         return Response(CartItemSerializer(item).data, status=status.HTTP_201_CREATED)
 
+    @extend_schema(
+        summary="Add several items to cart",
+        description=(
+            "Adds a list of products to the user's cart in one request. Quantities of products "
+            "already in the cart are incremented. Returns the updated cart."
+        ),
+        request=CartItemBulkSerializer,
+        responses={200: CartSerializer},
+        tags=["Cart"],
+    )
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        store = self.get_store()
+        serializer = CartItemBulkSerializer(data=request.data, context={"store": store})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        invalidate_cart_cache(request.user.pk)
+        return Response(CartSerializer(store.get_cart()).data)
+
     @extend_schema(
         summary="Update cart item quantity",
         description="Updates the quantity of an existing cart item.",
@@ -109,10 +141,13 @@ class CartItemViewSet(
     )
     def partial_update(self, request, *args, **kwargs):
         instance = self.get_object()
-        serializer = CartItemUpdateSerializer(instance, data=request.data, partial=True)
+        serializer = CartItemUpdateSerializer(
+            instance, data=request.data, partial=True, context={"store": self.get_store()}
+        )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(CartItemSerializer(instance).data)
+        item = serializer.save()
+        invalidate_cart_cache(request.user.pk)
+        return Response(CartItemSerializer(item).data)
 
     @extend_schema(
         summary="Delete cart item",
@@ -122,5 +157,6 @@ class CartItemViewSet(
     )
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.delete()
+        self.get_store().remove_item(instance)
+        invalidate_cart_cache(request.user.pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
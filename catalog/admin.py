@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
-from .models import Category, Product
+from .models import Category, Product, ProductImport
 
     
 @admin.register(Category)
@@ -10,4 +10,9 @@ class CategoryAdmin(admin.ModelAdmin):
 class ProductAdmin(admin.ModelAdmin):
     list_display = ("id", "title", "slug", "price", "stock_quantity", "is_active")
 
-    
\ No newline at end of file
+    
+
+@admin.register(ProductImport)
+class ProductImportAdmin(admin.ModelAdmin):
+    list_display = ("id", "seller", "format", "status", "processed_rows", "failed_count", "created_at")
+    list_filter = ("status", "format")
@@ -1,23 +1,195 @@
 """
 Shared cache helpers for catalog viewsets.
+
+List responses are namespaced by a generation counter instead of being
+deleted one by one. Bumping the counter is a single INCR, and entries from
+older generations are never read again and simply expire through their TTL.
+
+Expensive entries go through ``get_or_compute``, which lets a single caller
+rebuild an entry while concurrent callers keep serving the previous value.
 """
+import hashlib
+import math
+import random
+import time
+import uuid
+from urllib.parse import urlencode
+
 from django.core.cache import cache
 
-PRODUCT_LIST_PATTERN = "products:list:*"
+PRODUCT_LIST_GENERATION_KEY = "products:list:generation"
+PRODUCT_LIST_KEY = "products:list:v{generation}:{suffix}"
 PRODUCT_DETAIL_KEY = "products:detail:{product_id}"
+LOCK_KEY = "{key}:lock"
+
+# Longest a request waits on another caller's rebuild before computing the
+# entry itself. Kept well below the worker's request timeout.
+MAX_WAIT_TIMEOUT = 2
+
+
+def _seed_generation():
+    """
+    Seed value for a missing generation key. Time based so that a counter
+    lost to eviction never restarts at a value older entries still use.
+    """
+    return int(time.time())
+
+
+def get_product_list_generation():
+    generation = cache.get(PRODUCT_LIST_GENERATION_KEY)
+    if generation is None:
+        cache.add(PRODUCT_LIST_GENERATION_KEY, _seed_generation(), timeout=None)
+        generation = cache.get(PRODUCT_LIST_GENERATION_KEY, _seed_generation())
+    return generation
+
+
+def build_product_list_key(suffix):
+    """Return the list cache key for ``suffix`` in the current generation."""
+    return PRODUCT_LIST_KEY.format(
+        generation=get_product_list_generation(),
+        suffix=suffix,
+    )
+
+
+def canonical_query_key(query_params, allowed, lowercase=(), defaults=None):
+    """
+    Hash the parts of a query string that affect the response.
+
+    Only parameters named in ``allowed`` are kept, using the last value like
+    ``QueryDict.get`` does. Values are stripped, empty ones dropped,
+    ``lowercase`` parameters case-folded, and values equal to their entry in
+    ``defaults`` treated as absent. The result does not depend on parameter
+    order, so equivalent URLs share one cache entry.
+    """
+    defaults = defaults or {}
+    pairs = []
+    for name in sorted(set(query_params.keys()) & set(allowed)):
+        value = query_params.get(name, "").strip()
+        if name in lowercase:
+            value = value.lower()
+        if not value or value == defaults.get(name):
+            continue
+        pairs.append((name, value))
+    return hashlib.md5(urlencode(pairs).encode("utf-8")).hexdigest()
 
 
 def invalidate_product_cache(product_id=None):
     """
-    Clear cached entries for products. When delete_pattern is unavailable,
-    fall back to cache.clear to avoid stale responses.
+    Clear cached entries for products. The detail entry is deleted directly;
+    list entries are invalidated by moving to the next generation.
     """
     if product_id:
         cache.delete(PRODUCT_DETAIL_KEY.format(product_id=product_id))
 
-    if hasattr(cache, "delete_pattern"):
-        cache.delete_pattern(PRODUCT_LIST_PATTERN)
-    else:
-        cache.clear()
+    try:
+        cache.incr(PRODUCT_LIST_GENERATION_KEY)
+    except ValueError:
+        # Counter missing (first write or evicted): start a fresh generation.
+        cache.add(PRODUCT_LIST_GENERATION_KEY, _seed_generation(), timeout=None)
+        cache.incr(PRODUCT_LIST_GENERATION_KEY)
+
 
+def _read_entry(key):
+    entry = cache.get(key)
+    # Ignore values written before entries carried their expiry metadata.
+    if not isinstance(entry, dict) or "expires_at" not in entry:
+        return None
+    return entry
+
+
+def _acquire_lock(lock_key, lock_timeout):
+    """Take ``lock_key`` and return its token, or None if it is already held."""
+    token = uuid.uuid4().hex
+    return token if cache.add(lock_key, token, timeout=lock_timeout) else None
+
+
+def _release_lock(lock_key, token):
+    """
+    Delete ``lock_key`` only if it still holds ``token``. A holder whose lock
+    expired mid-compute must not drop the lock the next caller has taken.
+    """
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _wait_for_entry(key, lock_key, deadline, poll_interval=0.05):
+    """
+    Poll for ``key`` while another caller holds ``lock_key``. Returns the
+    entry, or None once the lock is released without one (the holder's
+    compute failed) or ``deadline`` passes.
+    """
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        # Check the lock first: the holder writes the entry before releasing it.
+        lock_held = cache.get(lock_key) is not None
+        entry = _read_entry(key)
+        if entry is not None or not lock_held:
+            return entry
+    return None
+
+
+def _compute_and_store(key, compute, timeout, stale_timeout):
+    started = time.monotonic()
+    value = compute()
+    delta = time.monotonic() - started
+    cache.set(
+        key,
+        {"value": value, "expires_at": time.time() + timeout, "delta": delta},
+        timeout=timeout + stale_timeout,
+    )
+    return value
+
+
+def get_or_compute(
+    key,
+    compute,
+    timeout,
+    stale_timeout=None,
+    lock_timeout=10,
+    wait_timeout=MAX_WAIT_TIMEOUT,
+    beta=1.0,
+):
+    """
+    Return ``(value, is_stale)`` for ``key``, calling ``compute`` to rebuild it.
+
+    Entries are fresh for ``timeout`` seconds and remain readable for another
+    ``stale_timeout`` seconds (defaults to ``timeout``). Once an entry expires -
+    or slightly before, with a probability that grows as expiry approaches
+    and with how long ``compute`` took - one caller takes a short lock and
+    recomputes while the others keep serving the previous value, flagged
+    stale if it has actually expired. When nothing is cached, callers that
+    lose the lock wait for the winner's entry. If the winner fails and
+    releases the lock, the next caller takes it over. After ``wait_timeout``
+    seconds (capped at ``lock_timeout``) a waiter stops polling and computes
+    without the lock.
+    """
+    if stale_timeout is None:
+        stale_timeout = timeout
+    wait_timeout = min(wait_timeout, lock_timeout)
+    lock_key = LOCK_KEY.format(key=key)
+
+    entry = _read_entry(key)
+    if entry is not None:
+        now = time.time()
+        # -log(u) is >= 0, so this is always true once the entry has expired.
+        refresh_at = now - entry["delta"] * beta * math.log(1.0 - random.random())
+        if refresh_at < entry["expires_at"]:
+            return entry["value"], False
+        token = _acquire_lock(lock_key, lock_timeout)
+        if token is None:
+            return entry["value"], now >= entry["expires_at"]
+    else:
+        token = _acquire_lock(lock_key, lock_timeout)
+        deadline = time.monotonic() + wait_timeout
+        while token is None:
+            entry = _wait_for_entry(key, lock_key, deadline)
+            if entry is not None:
+                return entry["value"], False
+            if time.monotonic() >= deadline:
+                return _compute_and_store(key, compute, timeout, stale_timeout), False
+            token = _acquire_lock(lock_key, lock_timeout)
 
+    try:
+        return _compute_and_store(key, compute, timeout, stale_timeout), False
+    finally:
+        _release_lock(lock_key, token)
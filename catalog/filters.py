@@ -1,7 +1,8 @@
 import django_filters
-from django.db.models import Q
+from rest_framework.filters import SearchFilter
 
-from .models import Product
+from .models import Category, Product
+from .search import search_products
 
 
 class ProductFilter(django_filters.FilterSet):
@@ -9,16 +10,33 @@ class ProductFilter(django_filters.FilterSet):
     max_price = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
     q = django_filters.CharFilter(method="filter_search")
     seller = django_filters.NumberFilter(field_name="seller_id")
+    # Matches products in the category or anywhere below it.
+    category = django_filters.ModelChoiceFilter(
+        queryset=Category.objects.all(), method="filter_category"
+    )
 
     class Meta:
         model = Product
         fields = ["category", "min_price", "max_price", "q", "seller"]
 
+    def filter_category(self, queryset, name, value):
+        if not value.path:
+            # Not saved through Category.save(); an empty prefix would match everything.
+            return queryset.filter(category=value)
+        return queryset.filter(category__path__startswith=value.path)
+
     def filter_search(self, queryset, name, value):
-        if not value:
+        return search_products(queryset, value)
+
+
+class ProductSearchFilter(SearchFilter):
+    """
+    SearchFilter that runs the ``search`` parameter through full-text search
+    instead of one ``icontains`` clause per search field.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
             return queryset
-        return queryset.filter(
-            Q(title__icontains=value)
-            | Q(description__icontains=value)
-            | Q(search_vector__icontains=value)
-        )
+        return search_products(queryset, " ".join(terms))
@@ -0,0 +1,167 @@
+"""
+Product image staging and variant generation.
+
+Uploads are written to storage as-is during the request ("staged") and
+recorded in ``Product.images`` as pending entries. The
+``process_product_images`` task then decodes each original once and stores
+resized WebP variants, plus AVIF when Pillow is built with it. The variant map
+is written back into ``Product.images``:
+
+    {
+        "original": "products/12/1700000000_0.jpg",
+        "status": "ready",
+        "variants": {
+            "thumbnail": {"webp": "products/12/1700000000_0_thumbnail.webp", ...},
+            "medium": {...},
+            "large": {...},
+        },
+    }
+
+Entries stored before this format (plain path strings) are read as entries
+without variants, and so is anything still pending or failed. Those fall
+back to the original file.
+
+With CATALOG_IMAGE_URLS_AT_WRITE, entries also carry a ``urls`` map of
+``{size: storage URL}`` computed when they are written, so serializing a
+product makes no storage calls. Only enable it for storages whose URLs are
+stable (not signed or expiring).
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+# Longest edge, in pixels, of each generated size.
+IMAGE_VARIANT_SIZES = {
+    "thumbnail": 200,
+    "medium": 600,
+    "large": 1200,
+}
+ORIGINAL = "original"
+IMAGE_SIZES = (*IMAGE_VARIANT_SIZES, ORIGINAL)
+
+# Preferred first when picking the URL for a size.
+IMAGE_FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "avif": {"format": "AVIF", "quality": 60},
+}
+
+STATUS_PENDING = "pending"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+def enabled_formats():
+    return [name for name in IMAGE_FORMATS if features.check(name)]
+
+
+def stage_images(product, files):
+    """Write uploaded files to storage untouched and return their paths."""
+    timestamp = int(timezone.now().timestamp())
+    paths = []
+    for idx, image in enumerate(files):
+        if not image:  # Skip None values
+            continue
+        file_ext = os.path.splitext(getattr(image, "name", "") or "")[1] or ".jpg"
+        image_path = f"products/{product.id}/{timestamp}_{idx}{file_ext}"
+        paths.append(default_storage.save(image_path, image))
+    return paths
+
+
+def pending_entry(path):
+    return {"original": path, "status": STATUS_PENDING, "variants": {}}
+
+
+def normalize_entry(entry):
+    """Return ``entry`` as a variant map, upgrading legacy path strings."""
+    if isinstance(entry, str):
+        return {"original": entry, "status": STATUS_READY, "variants": {}}
+    return entry
+
+
+def entry_path(entry, size):
+    """The stored path that best serves ``size`` for one images entry."""
+    entry = normalize_entry(entry)
+    for name in IMAGE_FORMATS:
+        path = entry.get("variants", {}).get(size, {}).get(name)
+        if path:
+            return path
+    return entry["original"]
+
+
+def with_urls(entry):
+    """Attach write-time URLs to ``entry`` when CATALOG_IMAGE_URLS_AT_WRITE is on."""
+    if not getattr(settings, "CATALOG_IMAGE_URLS_AT_WRITE", False):
+        return entry
+    return {
+        **entry,
+        "urls": {size: default_storage.url(entry_path(entry, size)) for size in IMAGE_SIZES},
+    }
+
+
+class ImageURLResolver:
+    """
+    Builds image URLs for one request. The absolute origin is computed once
+    and storage URLs are memoized per path, so a list page costs at most one
+    storage call per distinct image (none for entries with write-time URLs).
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+        self._origin = None
+        self._urls = {}
+
+    def absolute(self, url):
+        if self.request is None or url.startswith(("http://", "https://")):
+            return url
+        if not url.startswith("/"):
+            return self.request.build_absolute_uri(url)
+        if self._origin is None:
+            self._origin = self.request.build_absolute_uri("/")[:-1]
+        return self._origin + url
+
+    def url(self, path):
+        if path.startswith("http"):
+            return path
+        if path not in self._urls:
+            self._urls[path] = self.absolute(default_storage.url(path))
+        return self._urls[path]
+
+    def entry_url(self, entry, size):
+        stored = normalize_entry(entry).get("urls", {}).get(size)
+        if stored:
+            return self.absolute(stored)
+        return self.url(entry_path(entry, size))
+
+
+def generate_variants(path):
+    """
+    Decode the original at ``path`` once and store every size and format.
+    Returns the ``variants`` part of the entry.
+    """
+    with default_storage.open(path, "rb") as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    stem = os.path.splitext(path)[0]
+    formats = enabled_formats()
+    variants = {}
+    # Largest first, so each smaller size is resampled from the previous one.
+    for size, edge in sorted(IMAGE_VARIANT_SIZES.items(), key=lambda item: -item[1]):
+        image = image.copy()
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        variants[size] = {}
+        for name in formats:
+            buffer = BytesIO()
+            image.save(buffer, **IMAGE_FORMATS[name])
+            variants[size][name] = default_storage.save(
+                f"{stem}_{size}.{name}", ContentFile(buffer.getvalue())
+            )
+    return variants
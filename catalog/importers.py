@@ -0,0 +1,269 @@
+"""
+Streaming bulk import of a seller's products from CSV or JSON Lines.
+
+Rows are read lazily and written in chunks: each chunk is validated in
+memory, new products get their slugs from one ``allocate_slugs`` query, and
+rows are written with ``bulk_create``/``bulk_update``. Caches are invalidated
+once when the import ends, also when a later chunk fails after earlier chunks
+were committed.
+
+A row with a ``slug`` that matches one of the seller's products updates that
+product; every other row creates a new one. Columns: ``title``, ``price``,
+``category`` (id or slug), and optionally ``description``,
+``stock_quantity``, ``is_active``, and ``slug``.
+"""
+import csv
+import io
+import json
+import logging
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from orders.reservations import get_ledger, reservations_enabled
+
+from .cache_utils import PRODUCT_DETAIL_KEY, invalidate_product_cache
+from .models import Category, Product
+from .slugs import allocate_slugs
+
+logger = logging.getLogger(__name__)
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+
+DEFAULT_BATCH_SIZE = 1000
+# Error details kept per import; the failed count is always exact.
+MAX_REPORTED_ERRORS = 1000
+# Chunks retried when a concurrent writer claims one of the allocated slugs.
+SLUG_CONFLICT_RETRIES = 3
+
+UPDATE_FIELDS = [
+    "title",
+    "description",
+    "price",
+    "stock_quantity",
+    "category",
+    "is_active",
+    "updated_at",
+]
+
+
+class ImportRowError(Exception):
+    pass
+
+
+def detect_format(filename):
+    return FORMAT_JSONL if filename.lower().endswith((".jsonl", ".ndjson")) else FORMAT_CSV
+
+
+def iter_rows(stream, fmt):
+    """
+    Yield ``(line_number, row)`` from a binary stream without reading it all.
+    Lines that cannot be parsed yield an ImportRowError instead of a dict.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == FORMAT_CSV:
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Empty cells mean "not provided", so optional columns get their defaults.
+            yield reader.line_num, {
+                key.strip(): value for key, value in row.items()
+                if key is not None and value not in ("", None)
+            }
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, ImportRowError(f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, ImportRowError("Each line must be a JSON object.")
+            continue
+        yield line_number, row
+
+
+class ProductImportRowSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=255)
+    slug = serializers.SlugField(max_length=50, required=False, allow_blank=True)
+    description = serializers.CharField(required=False, allow_blank=True, default="")
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("0"))
+    stock_quantity = serializers.IntegerField(min_value=0, default=0)
+    category = serializers.CharField()
+    is_active = serializers.BooleanField(required=False)
+
+    def validate_category(self, value):
+        categories = self.context["categories"]
+        category = categories.get(value.strip())
+        if category is None:
+            raise serializers.ValidationError("Category not found or inactive.")
+        return category
+
+
+class ImportStats:
+    def __init__(self):
+        self.processed = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line_number, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "processed": self.processed,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+class ProductImporter:
+    def __init__(self, seller, batch_size=DEFAULT_BATCH_SIZE, on_progress=None):
+        self.seller = seller
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.stats = ImportStats()
+        self.updated_ids = []
+        self.categories = self._load_categories()
+
+    def _load_categories(self):
+        # Rows name categories by id or slug; there are few enough to keep in memory.
+        categories = {}
+        for category in Category.objects.filter(is_active=True):
+            categories[str(category.pk)] = category
+            categories[category.slug] = category
+        return categories
+
+    def run(self, rows):
+        try:
+            chunk = []
+            for line_number, row in rows:
+                chunk.append((line_number, row))
+                if len(chunk) >= self.batch_size:
+                    self._process_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self._process_chunk(chunk)
+        finally:
+            self._invalidate_caches()
+        return self.stats
+
+    def _invalidate_caches(self):
+        if self.stats.created or self.stats.updated:
+            cache.delete_many(
+                [PRODUCT_DETAIL_KEY.format(product_id=pk) for pk in self.updated_ids]
+            )
+            invalidate_product_cache()
+
+    def _validate(self, chunk):
+        valid = []
+        for line_number, row in chunk:
+            if isinstance(row, ImportRowError):
+                self.stats.add_error(line_number, {"non_field_errors": [str(row)]})
+                continue
+            serializer = ProductImportRowSerializer(
+                data=row, context={"categories": self.categories}
+            )
+            if serializer.is_valid():
+                valid.append((line_number, serializer.validated_data))
+            else:
+                self.stats.add_error(line_number, serializer.errors)
+        return valid
+
+    def _process_chunk(self, chunk):
+        self.stats.processed += len(chunk)
+        valid = self._validate(chunk)
+        if valid:
+            for attempt in range(SLUG_CONFLICT_RETRIES):
+                try:
+                    with transaction.atomic():
+                        created, updated, errors = self._write(valid)
+                    break
+                except IntegrityError:
+                    if attempt == SLUG_CONFLICT_RETRIES - 1:
+                        raise
+                    logger.info("Slug conflict while importing products, retrying chunk.")
+            for line_number, error in errors:
+                self.stats.add_error(line_number, error)
+            self.stats.created += created
+            self.stats.updated += updated
+
+        if self.on_progress:
+            self.on_progress(self.stats)
+
+    def _write(self, valid):
+        slugs = {data["slug"] for _, data in valid if data.get("slug")}
+        matches = list(Product.objects.filter(slug__in=slugs)) if slugs else []
+        taken = {product.slug for product in matches}
+        existing = {
+            product.slug: product for product in matches
+            if product.seller_id == self.seller.pk
+        }
+
+        now = timezone.now()
+        to_create, to_update, old_stock, errors = [], {}, {}, []
+        explicit_slugs = set()
+        for line_number, data in valid:
+            slug = data.get("slug")
+            if slug in existing:
+                product = existing[slug]
+                old_stock.setdefault(product.pk, product.stock_quantity)
+                product.title = data["title"]
+                product.description = data["description"]
+                product.price = data["price"]
+                product.stock_quantity = data["stock_quantity"]
+                product.category = data["category"]
+                product.is_active = data.get("is_active", product.is_active)
+                # bulk_update does not apply auto_now
+                product.updated_at = now
+                to_update[product.pk] = product
+                continue
+            if slug and (slug in taken or slug in explicit_slugs):
+                errors.append((line_number, {"slug": ["This slug is already in use."]}))
+                continue
+            if slug:
+                explicit_slugs.add(slug)
+            to_create.append(
+                Product(
+                    seller=self.seller,
+                    title=data["title"],
+                    slug=slug or "",
+                    description=data["description"],
+                    price=data["price"],
+                    stock_quantity=data["stock_quantity"],
+                    category=data["category"],
+                    is_active=data.get("is_active", True),
+                )
+            )
+
+        unslugged = [product for product in to_create if not product.slug]
+        new_slugs = allocate_slugs(
+            Product, [product.title for product in unslugged], reserved=explicit_slugs
+        )
+        for product, slug in zip(unslugged, new_slugs):
+            product.slug = slug
+
+        Product.objects.bulk_create(to_create, batch_size=self.batch_size)
+        if to_update:
+            Product.objects.bulk_update(
+                list(to_update.values()), UPDATE_FIELDS, batch_size=self.batch_size
+            )
+            if reservations_enabled():
+                ledger = get_ledger()
+                for pk, product in to_update.items():
+                    ledger.adjust(pk, product.stock_quantity - old_stock[pk])
+            self.updated_ids.extend(to_update)
+        return len(to_create), len(to_update), errors
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.importers import (
+    DEFAULT_BATCH_SIZE,
+    FORMATS,
+    ProductImporter,
+    detect_format,
+    iter_rows,
+)
+
+# Row errors echoed to stderr; the full count is always reported.
+MAX_PRINTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Import products for a seller from a CSV or JSON Lines file. Rows with "
+        "the slug of one of the seller's products update it; others are created."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON Lines file to import.")
+        parser.add_argument(
+            "--seller",
+            required=True,
+            help="Username of the seller who will own the products.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="File format. Defaults to jsonl for .jsonl/.ndjson files, else csv.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Rows validated and written per chunk.",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            seller = User.objects.get(username=options["seller"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['seller']!r} does not exist.")
+
+        fmt = options["format"] or detect_format(options["path"])
+
+        def report(stats):
+            self.stdout.write(
+                f"Processed {stats.processed} row(s): {stats.created} created, "
+                f"{stats.updated} updated, {stats.failed} failed."
+            )
+
+        importer = ProductImporter(
+            seller, batch_size=options["batch_size"], on_progress=report
+        )
+        try:
+            with open(options["path"], "rb") as stream:
+                stats = importer.run(iter_rows(stream, fmt))
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for error in stats.errors[:MAX_PRINTED_ERRORS]:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if stats.failed > MAX_PRINTED_ERRORS:
+            self.stderr.write(f"... and {stats.failed - MAX_PRINTED_ERRORS} more.")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {stats.created + stats.updated} product(s) "
+                f"({stats.created} created, {stats.updated} updated, {stats.failed} failed)."
+            )
+        )
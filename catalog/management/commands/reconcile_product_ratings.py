@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from catalog.cache_utils import PRODUCT_DETAIL_KEY, invalidate_product_cache
+from catalog.models import Product, Review
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Product.rating_sum/review_count from the reviews table and "
+        "fix products whose stored counters have drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many products are out of sync.",
+        )
+
+    def handle(self, *args, **options):
+        per_product = Review.objects.filter(product=OuterRef("pk")).values("product")
+        actual_sum = Coalesce(
+            Subquery(per_product.annotate(total=Sum("rating")).values("total")),
+            Value(0),
+        )
+        actual_count = Coalesce(
+            Subquery(per_product.annotate(total=Count("id")).values("total")),
+            Value(0),
+        )
+
+        drifted = Product.objects.annotate(
+            actual_sum=actual_sum,
+            actual_count=actual_count,
+        ).exclude(rating_sum=F("actual_sum"), review_count=F("actual_count"))
+        drifted_ids = list(drifted.values_list("pk", flat=True))
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(drifted_ids)} product(s) out of sync.")
+            return
+
+        if drifted_ids:
+            Product.objects.filter(pk__in=drifted_ids).update(
+                rating_sum=actual_sum,
+                review_count=actual_count,
+            )
+            cache.delete_many(
+                [PRODUCT_DETAIL_KEY.format(product_id=pk) for pk in drifted_ids]
+            )
+            invalidate_product_cache()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled {len(drifted_ids)} product(s).")
+        )
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-17 06:30
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_review_aggregates(apps, schema_editor):
+    """Populate rating_sum/review_count from existing reviews in one UPDATE"""
+    Product = apps.get_model('catalog', 'Product')
+    Review = apps.get_model('catalog', 'Review')
+
+    per_product = Review.objects.filter(product=OuterRef('pk')).values('product')
+    Product.objects.update(
+        rating_sum=Coalesce(
+            Subquery(per_product.annotate(total=Sum('rating')).values('total')),
+            Value(0),
+        ),
+        review_count=Coalesce(
+            Subquery(per_product.annotate(total=Count('id')).values('total')),
+            Value(0),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_add_images_to_product_and_remove_productimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_review_aggregates, migrations.RunPython.noop),
+    ]
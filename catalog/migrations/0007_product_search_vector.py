@@ -0,0 +1,103 @@
+# Replace the plain-text search_vector copy with a trigger-maintained tsvector
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+CREATE_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION catalog_product_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS catalog_product_search_vector_trigger ON catalog_product;
+CREATE TRIGGER catalog_product_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, search_vector ON catalog_product
+    FOR EACH ROW EXECUTE FUNCTION catalog_product_search_vector_update();
+
+UPDATE catalog_product SET search_vector = NULL;
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS catalog_product_search_vector_trigger ON catalog_product;
+DROP FUNCTION IF EXISTS catalog_product_search_vector_update();
+"""
+
+CREATE_TRIGRAM_INDEX_SQL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS catalog_product_title_trgm
+    ON catalog_product USING gin (title gin_trgm_ops);
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    """Install the tsvector trigger and backfill existing rows (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_TRIGGER_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(DROP_TRIGGER_SQL)
+
+
+def create_trigram_index(apps, schema_editor):
+    """Index titles for the optional typo-tolerant fallback when pg_trgm is available"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute(CREATE_TRIGRAM_INDEX_SQL)
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS catalog_product_title_trgm;")
+
+
+class PostgresAddIndex(migrations.AddIndex):
+    """AddIndex that is a no-op on databases without GIN support (e.g. SQLite)"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_product_rating_sum_product_review_count'),
+    ]
+
+    operations = [
+        # The old column held raw text; drop it rather than casting to tsvector.
+        migrations.RemoveField(
+            model_name='product',
+            name='search_vector',
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+        PostgresAddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='catalog_product_search_gin'),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-17 06:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_product_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='catalog_pro_is_acti_3308eb_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'created_at', 'id'], name='product_active_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'updated_at', 'id'], name='product_active_updated_id'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'price', 'id'], name='product_active_price_id'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'title', 'id'], name='product_active_title_id'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.0.6 on 2026-10-17 07:00
+
+from collections import deque
+
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    """
+    Fill path and depth breadth-first from the root categories. Categories
+    that no root reaches sit in (or under) a parent cycle; they are reported
+    instead of recursing forever.
+    """
+    Category = apps.get_model("catalog", "Category")
+    children = {}
+    roots = []
+    for pk, parent_id in Category.objects.values_list("pk", "parent_id"):
+        if parent_id is None:
+            roots.append(pk)
+        else:
+            children.setdefault(parent_id, []).append(pk)
+
+    paths = {pk: f"{pk}/" for pk in roots}
+    queue = deque(roots)
+    while queue:
+        pk = queue.popleft()
+        for child in children.get(pk, ()):
+            paths[child] = f"{paths[pk]}{child}/"
+            queue.append(child)
+
+    unreachable = sorted(
+        child for kids in children.values() for child in kids if child not in paths
+    )
+    if unreachable:
+        raise RuntimeError(
+            "Categories form a parent cycle and have no root: ids "
+            f"{unreachable}. Point one of them at a valid parent (or none) and migrate again."
+        )
+
+    categories = list(Category.objects.only("pk"))
+    for category in categories:
+        category.path = paths[category.pk]
+        category.depth = category.path.count("/") - 1
+    Category.objects.bulk_update(categories, ["path", "depth"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_product_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,29 @@
+from functools import partial
+
 from django.conf import settings
-from django.db import models
-from django.utils.text import slugify
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+
+from .slugs import save_with_unique_slug
+
+PATH_SEPARATOR = "/"
+
+
+class CategoryQuerySet(models.QuerySet):
+    def subtree(self, category, include_self=True):
+        """
+        ``category`` and all of its descendants, via an indexed prefix match.
+        A category written without save() (bulk_create, loaddata, update())
+        has no path yet and matches only itself.
+        """
+        if not category.path:
+            return self.filter(pk=category.pk) if include_self else self.none()
+        queryset = self.filter(path__startswith=category.path)
+        return queryset if include_self else queryset.exclude(pk=category.pk)
+
 
 class Category(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -13,16 +36,82 @@ class Category(models.Model):
         related_name="children",
     )
     is_active = models.BooleanField(default=True)
+    # Materialized path: ids from the root down to this category, e.g. "1/5/12/".
+    # A subtree is every row whose path starts with the node's path.
+    path = models.CharField(max_length=255, db_index=True, editable=False, default="")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         ordering = ["name"]
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        old_path = self.path
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_slug(self, self.name, partial(super().save, *args, **kwargs))
+        self._update_path(old_path)
+
+    def delete(self, *args, **kwargs):
+        path, depth = self.path, self.depth
+        result = super().delete(*args, **kwargs)
+        if path:
+            # SET_NULL turned the children into roots; re-root their subtrees.
+            Category.objects.filter(path__startswith=path).update(
+                path=Substr("path", len(path) + 1),
+                depth=F("depth") - (depth + 1),
+            )
+        return result
+
+    def is_within(self, ancestor):
+        """
+        Whether this category is ``ancestor`` or one of its descendants. Without
+        both paths, the parent chain is walked instead.
+        """
+        if self.path and ancestor.path:
+            return self.path.startswith(ancestor.path)
+        seen = set()
+        node = self
+        while node is not None and node.pk not in seen:
+            if node.pk == ancestor.pk:
+                return True
+            seen.add(node.pk)
+            node = node.parent
+        return False
+
+    def _parent_id_from_path(self):
+        ids = self.path.rstrip(PATH_SEPARATOR).split(PATH_SEPARATOR)
+        return int(ids[-2]) if len(ids) > 1 else None
+
+    def _update_path(self, old_path):
+        if old_path and self._parent_id_from_path() == self.parent_id:
+            return
+
+        parent_path = ""
+        if self.parent_id:
+            parent_path = Category.objects.values_list("path", flat=True).get(pk=self.parent_id)
+        new_path = f"{parent_path}{self.pk}{PATH_SEPARATOR}"
+        new_depth = new_path.count(PATH_SEPARATOR) - 1
+        if new_path == old_path:
+            return
+
+        with transaction.atomic():
+            Category.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+            if old_path:
+                # Moved: re-home every descendant in one statement.
+                Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                    path=Concat(
+                        Value(new_path),
+                        Substr("path", len(old_path) + 1),
+                        output_field=models.CharField(),
+                    ),
+                    depth=F("depth") + (new_depth - self.depth),
+                )
+        self.path, self.depth = new_path, new_depth
 
     def __str__(self):
         return self.name
@@ -47,8 +136,13 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock_quantity = models.PositiveIntegerField(default=0)
     images = models.JSONField(default=list, blank=True, help_text="List of image file paths/URLs")
+    # Review aggregates, maintained by ReviewViewSet and the
+    # reconcile_product_ratings command.
+    rating_sum = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
-    search_vector = models.TextField(blank=True, default="")
+    # Maintained by a database trigger on PostgreSQL (see catalog/search.py).
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -56,25 +150,29 @@ class Product(models.Model):
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["slug"]),
-            models.Index(fields=["is_active", "updated_at"]),
             models.Index(fields=["seller"]),
+            # Keyset pagination: one index per sort field, with id as tiebreaker.
+            models.Index(fields=["is_active", "created_at", "id"], name="product_active_created_id"),
+            models.Index(fields=["is_active", "updated_at", "id"], name="product_active_updated_id"),
+            models.Index(fields=["is_active", "price", "id"], name="product_active_price_id"),
+            models.Index(fields=["is_active", "title", "id"], name="product_active_title_id"),
+            GinIndex(fields=["search_vector"], name="catalog_product_search_gin"),
         ]
 
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            suffix = 1
-            while Product.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{suffix}"
-                suffix += 1
-            self.slug = slug
+    @property
+    def rating_avg(self) -> float:
+        if not self.review_count:
+            return 0.0
+        return self.rating_sum / self.review_count
 
-        self.search_vector = f"{self.title} {self.description}".strip()
-        super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_slug(self, self.title, partial(super().save, *args, **kwargs))
 
 
 class Review(models.Model):
@@ -93,3 +191,40 @@ class Review(models.Model):
 
     def __str__(self):
         return f"{self.product.title} - {self.rating}★"
+
+
+class ProductImport(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+    FORMAT_CHOICES = [
+        ("csv", "CSV"),
+        ("jsonl", "JSON Lines"),
+    ]
+
+    seller = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="product_imports",
+        on_delete=models.CASCADE,
+    )
+    file = models.FileField(upload_to="imports/products/")
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    # Per-row errors as [{"row": <line>, "errors": {...}}], capped in catalog.importers.
+    errors = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"ProductImport({self.pk}, {self.status})"
@@ -0,0 +1,14 @@
+"""
+Keyset (cursor) pagination for the product catalog.
+
+Opt in with ``?pagination=cursor``. Pages are ordered by the ``sort`` field
+(``-created_at`` by default) with ``id`` as a tiebreaker; the composite
+(is_active, <sort>, id) indexes bound each page's scan.
+"""
+from core.pagination import KeysetPagination
+
+
+class ProductKeysetPagination(KeysetPagination):
+    def get_ordering(self, view):
+        sort_field = getattr(view, "get_sort_field", lambda: None)()
+        return sort_field or self.default_ordering
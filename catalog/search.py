@@ -0,0 +1,52 @@
+"""
+Product search backed by PostgreSQL full-text search.
+
+``Product.search_vector`` is a tsvector kept up to date by a database
+trigger (see migration 0007) and covered by a GIN index. Other database
+backends, such as SQLite in local development, fall back to ``icontains``.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connection
+from django.db.models import F, Q
+
+SEARCH_CONFIG = "english"
+TRIGRAM_THRESHOLD = 0.3
+
+
+def _uses_postgres_search():
+    return connection.vendor == "postgresql"
+
+
+def search_products(queryset, value):
+    """
+    Filter ``queryset`` to products matching ``value``, most relevant first.
+
+    ``value`` accepts web-search syntax (quoted phrases, ``or``, ``-term``).
+    When nothing matches and CATALOG_SEARCH_TRIGRAM_FALLBACK is enabled,
+    titles are matched by trigram similarity instead so typos still find
+    results; this requires the pg_trgm extension.
+    """
+    value = (value or "").strip()
+    if not value:
+        return queryset
+
+    if not _uses_postgres_search():
+        return queryset.filter(
+            Q(title__icontains=value) | Q(description__icontains=value)
+        )
+
+    query = SearchQuery(value, config=SEARCH_CONFIG, search_type="websearch")
+    matches = (
+        queryset.filter(search_vector=query)
+        .annotate(search_rank=SearchRank(F("search_vector"), query))
+        .order_by("-search_rank", "-created_at")
+    )
+
+    if getattr(settings, "CATALOG_SEARCH_TRIGRAM_FALLBACK", False) and not matches.exists():
+        return (
+            queryset.annotate(similarity=TrigramSimilarity("title", value))
+            .filter(similarity__gt=TRIGRAM_THRESHOLD)
+            .order_by("-similarity", "-created_at")
+        )
+    return matches
@@ -1,6 +1,15 @@
-from rest_framework import serializers
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from drf_spectacular.utils import extend_schema_field
-from .models import Category, Product, Review
+from .images import ImageURLResolver, entry_path, pending_entry, stage_images, with_urls
+from .importers import detect_format
+from .models import Category, Product, ProductImport, Review
+from .tasks import process_product_images
 
 
 class CategoryChildSerializer(serializers.ModelSerializer):
@@ -10,7 +19,20 @@ class CategoryChildSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'slug']
 
 
+def children_by_parent(categories):
+    """Group ``categories`` into ``{parent_id: [children]}``, keeping their order."""
+    children = {}
+    for category in categories:
+        children.setdefault(category.parent_id, []).append(category)
+    return children
+
+
 class CategorySerializer(serializers.ModelSerializer):
+    """
+    With ``include_children``, each category is nested with its full active
+    subtree. The view can pass a ``category_children`` map built from one
+    query; otherwise each top-level category loads its subtree by path.
+    """
     children = serializers.SerializerMethodField()
 
     @extend_schema_field(
@@ -28,8 +50,20 @@ class CategorySerializer(serializers.ModelSerializer):
         if not include_children:
             return []
 
-        children_queryset = obj.children.filter(is_active=True)
-        return CategoryChildSerializer(children_queryset, many=True, context=self.context).data
+        context = self.context
+        if context.get("category_children") is None:
+            subtree = Category.objects.subtree(obj, include_self=False).filter(is_active=True)
+            context = {**context, "category_children": children_by_parent(subtree)}
+        children = context["category_children"].get(obj.pk, [])
+        return CategorySerializer(children, many=True, context=context).data
+
+    def validate_parent(self, parent):
+        instance = self.instance
+        if parent is not None and instance is not None and parent.is_within(instance):
+            raise serializers.ValidationError(
+                "A category cannot be moved under itself or one of its descendants."
+            )
+        return parent
 
     class Meta:
         model = Category
@@ -37,6 +71,19 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'slug']
 
 
+def images_urls(images, context):
+    if not images:
+        return []
+    size = context.get("image_size", "large")
+    if not context.get('request'):
+        return [entry_path(entry, size) for entry in images]
+    # One resolver per serialization, shared by every product in a list.
+    resolver = context.get("image_url_resolver")
+    if resolver is None:
+        resolver = context["image_url_resolver"] = ImageURLResolver(context["request"])
+    return [resolver.entry_url(entry, size) for entry in images]
+
+
 class ProductSerializer(serializers.ModelSerializer):
     images = serializers.ListField(
         child=serializers.ImageField(allow_empty_file=False, required=False),
@@ -86,28 +133,12 @@ class ProductSerializer(serializers.ModelSerializer):
         ]
 
     def get_images_urls(self, obj):
-        """Return list of image URLs from the images JSONField"""
-        if not obj.images:
-            return []
-        # If images are stored as relative paths, convert them to full URLs
-        request = self.context.get('request')
-        if request:
-            from django.conf import settings
-            from django.core.files.storage import default_storage
-            urls = []
-            for img_path in obj.images:
-                if img_path.startswith('http'):
-                    urls.append(img_path)
-                else:
-                    # Build URL using MEDIA_URL
-                    url = default_storage.url(img_path)
-                    if request:
-                        # Make it absolute if we have a request
-                        if not url.startswith('http'):
-                            url = request.build_absolute_uri(url)
-                    urls.append(url)
-            return urls
-        return obj.images
+        """
+        Return one URL per image, for the size in the ``image_size`` context
+        (a key of IMAGE_VARIANT_SIZES or "original"; defaults to "large").
+        Images without that variant yet fall back to the original.
+        """
+        return images_urls(obj.images, self.context)
 
     def validate_images(self, value):
         """Validate images field - allow empty list in JSON format"""
@@ -128,26 +159,9 @@ class ProductSerializer(serializers.ModelSerializer):
         images = validated_data.pop('images', [])
         product = super().create(validated_data)
         
-        # Handle image uploads
+        # Store the uploads untouched; variants are generated in the background
         if images:
-            image_paths = []
-            from django.core.files.storage import default_storage
-            import os
-            from django.utils import timezone
-            
-            for idx, image in enumerate(images):
-                # Generate unique filename to avoid conflicts
-                timestamp = int(timezone.now().timestamp())
-                file_ext = os.path.splitext(image.name)[1] or '.jpg'
-                filename = f"{timestamp}_{idx}{file_ext}"
-                image_path = f"products/{product.id}/{filename}"
-                
-                # Save the file using default storage
-                saved_path = default_storage.save(image_path, image)
-                image_paths.append(saved_path)
-            
-            product.images = image_paths
-            product.save(update_fields=['images'])
+            self._stage_images(product, images)
         
         return product
 
@@ -176,37 +190,109 @@ class ProductSerializer(serializers.ModelSerializer):
             images_provided = True
             images = []
         
-        product = super().update(instance, validated_data)
-        
+        # Write only the submitted fields. A full save would put back the
+        # rating counters as they were loaded, undoing concurrent reviews.
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        product = instance
+
         # Handle image uploads
         # Only update images if explicitly provided in the request
         if images_provided:
             if images and len(images) > 0:
-                # Save new images
-                image_paths = []
-                from django.core.files.storage import default_storage
-                import os
-                from django.utils import timezone
-                
-                for idx, image in enumerate(images):
-                    if image:  # Skip None values
-                        # Generate unique filename to avoid conflicts
-                        timestamp = int(timezone.now().timestamp())
-                        file_ext = os.path.splitext(image.name)[1] if hasattr(image, 'name') and image.name else '.jpg'
-                        filename = f"{timestamp}_{idx}{file_ext}"
-                        image_path = f"products/{product.id}/{filename}"
-                        
-                        # Save the file using default storage
-                        saved_path = default_storage.save(image_path, image)
-                        image_paths.append(saved_path)
-                product.images = image_paths
+                # Store the new uploads untouched; variants are generated in the background
+                self._stage_images(product, images)
             else:
                 # Empty list means clear all images
                 product.images = []
-            product.save(update_fields=['images'])
+                product.save(update_fields=['images'])
         
         return product
 
+    def _stage_images(self, product, images):
+        paths = stage_images(product, images)
+        product.images = [with_urls(pending_entry(path)) for path in paths]
+        product.save(update_fields=['images'])
+        transaction.on_commit(lambda: process_product_images.delay(product.pk, paths))
+
+
+class ProductReadSerializer:
+    """
+    Read-only counterpart of ProductSerializer for list and retrieve.
+
+    Builds each product's dict directly instead of running a DRF field per
+    attribute; the output is identical to ``ProductSerializer(...).data``.
+    Querysets only need ``columns`` loaded. Takes the same ``instance``,
+    ``many`` and ``context`` arguments as a serializer.
+    """
+
+    columns = (
+        "id",
+        "title",
+        "slug",
+        "description",
+        "price",
+        "stock_quantity",
+        "category",
+        "seller",
+        "images",
+        "rating_sum",
+        "review_count",
+        "is_active",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(self, instance, many=False, context=None):
+        self.instance = instance
+        self.many = many
+        self.context = context if context is not None else {}
+
+    @property
+    def data(self):
+        if self.many:
+            return [self.to_representation(product) for product in self.instance]
+        return self.to_representation(self.instance)
+
+    def _datetime(self, value):
+        # Same conversion as serializers.DateTimeField.
+        if not value:
+            return None
+        if settings.USE_TZ:
+            value = timezone.localtime(value)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, datetime.timezone.utc)
+        output_format = api_settings.DATETIME_FORMAT
+        if output_format is None:
+            return value
+        if output_format.lower() != ISO_8601:
+            return value.strftime(output_format)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    def to_representation(self, product):
+        price = product.price
+        return {
+            "id": product.id,
+            "title": product.title,
+            "slug": product.slug,
+            "description": product.description,
+            "price": "{:f}".format(price) if api_settings.COERCE_DECIMAL_TO_STRING else price,
+            "stock_quantity": product.stock_quantity,
+            "category": product.category_id,
+            "seller": product.seller_id,
+            "images_urls": images_urls(product.images, self.context),
+            "rating_avg": float(product.rating_avg),
+            "review_count": product.review_count,
+            "is_active": product.is_active,
+            "created_at": self._datetime(product.created_at),
+            "updated_at": self._datetime(product.updated_at),
+        }
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(read_only=True)
 
@@ -226,3 +312,46 @@ class ReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Rating must be between 1 and 10.")
         return value
 
+
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    file = serializers.FileField(write_only=True)
+    format = serializers.ChoiceField(
+        choices=ProductImport.FORMAT_CHOICES,
+        required=False,
+        help_text="Defaults to jsonl for .jsonl/.ndjson uploads, else csv.",
+    )
+
+    class Meta:
+        model = ProductImport
+        fields = [
+            "id",
+            "file",
+            "format",
+            "status",
+            "processed_rows",
+            "created_count",
+            "updated_count",
+            "failed_count",
+            "errors",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+        read_only_fields = [
+            "id",
+            "status",
+            "processed_rows",
+            "created_count",
+            "updated_count",
+            "failed_count",
+            "errors",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+
+    def validate(self, attrs):
+        if not attrs.get("format"):
+            attrs["format"] = detect_format(attrs["file"].name)
+        return attrs
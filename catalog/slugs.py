@@ -0,0 +1,118 @@
+"""
+Set-based slug allocation.
+
+``allocate_slugs`` picks unique slugs for a whole batch of values with a
+single aggregate query: for every base slug it asks the database whether the
+base is taken and what the highest ``<base>-<n>`` suffix is, then hands out
+``<base>-<n+1>``, ``<base>-<n+2>``... This replaces probing ``slug``,
+``slug-1``, ``slug-2``... with one ``exists()`` query per candidate.
+
+``save_with_unique_slug`` wraps a model save with allocation and retries when
+a concurrent insert claims the same slug first.
+"""
+import re
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, Max, Q, When
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+# Room kept at the end of every base slug for a "-<n>" suffix.
+SUFFIX_RESERVE = 8
+# Longer numeric tails are not treated as suffixes (and cannot overflow the cast).
+MAX_SUFFIX_DIGITS = 18
+SLUG_CONFLICT_RETRIES = 3
+
+
+def slug_base(value, max_length, fallback="item"):
+    base = slugify(value or "")[: max_length - SUFFIX_RESERVE].strip("-")
+    return base or fallback
+
+
+def _existing_suffixes(model, field, bases, exclude_pk=None):
+    """
+    Return ``{base: (base_taken, max_suffix)}`` in one query. The prefix
+    filter lets PostgreSQL use the slug's pattern index.
+    """
+    aggregates = {}
+    for idx, base in enumerate(bases):
+        suffix_pattern = r"^%s-[0-9]{1,%d}$" % (re.escape(base), MAX_SUFFIX_DIGITS)
+        aggregates[f"taken_{idx}"] = Count(Case(When(**{field: base}, then=1)))
+        aggregates[f"suffix_{idx}"] = Max(
+            Case(
+                When(
+                    **{f"{field}__regex": suffix_pattern},
+                    then=Cast(Substr(field, len(base) + 2), models.BigIntegerField()),
+                )
+            )
+        )
+
+    prefixes = Q()
+    for base in bases:
+        prefixes |= Q(**{f"{field}__startswith": base})
+    queryset = model._default_manager.filter(prefixes)
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    result = queryset.aggregate(**aggregates)
+
+    return {
+        base: (bool(result[f"taken_{idx}"]), result[f"suffix_{idx}"] or 0)
+        for idx, base in enumerate(bases)
+    }
+
+
+def allocate_slugs(model, values, field="slug", reserved=(), exclude_pk=None):
+    """
+    Return one unique slug per entry in ``values``, in order.
+
+    Slugs stored on ``model`` (other than row ``exclude_pk``) and those in
+    ``reserved`` are never returned.
+    """
+    max_length = model._meta.get_field(field).max_length
+    bases = [slug_base(value, max_length) for value in values]
+    if not bases:
+        return []
+
+    existing = _existing_suffixes(model, field, sorted(set(bases)), exclude_pk)
+    reserved = set(reserved)
+    next_suffix = {}
+    slugs = []
+    for base in bases:
+        base_taken, max_suffix = existing[base]
+        if not base_taken and base not in reserved:
+            slug = base
+            existing[base] = (True, max_suffix)
+        else:
+            suffix = next_suffix.get(base, max_suffix + 1)
+            while f"{base}-{suffix}" in reserved:
+                suffix += 1
+            next_suffix[base] = suffix + 1
+            slug = f"{base}-{suffix}"
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_unique_slug(instance, value, save, field="slug"):
+    """
+    Allocate a slug for ``instance`` from ``value`` and call ``save()``.
+
+    If another transaction inserts the same slug between allocation and
+    insert, the unique constraint fails and a fresh slug is allocated.
+    """
+    model = type(instance)
+    for attempt in range(SLUG_CONFLICT_RETRIES):
+        slug = allocate_slugs(model, [value], field=field, exclude_pk=instance.pk)[0]
+        setattr(instance, field, slug)
+        try:
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            setattr(instance, field, "")
+            conflict = (
+                model._default_manager.filter(**{field: slug})
+                .exclude(pk=instance.pk)
+                .exists()
+            )
+            if not conflict or attempt == SLUG_CONFLICT_RETRIES - 1:
+                raise
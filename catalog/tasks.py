@@ -0,0 +1,84 @@
+import logging
+
+from celery import shared_task
+from django.db import transaction
+from django.utils import timezone
+
+from .cache_utils import invalidate_product_cache
+from .images import STATUS_FAILED, STATUS_READY, generate_variants, with_urls
+from .importers import ProductImporter, iter_rows
+from .models import Product, ProductImport
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def import_products(import_id):
+    """
+    Run an uploaded ProductImport, saving progress after every chunk. The
+    uploaded file is deleted once the import completes or fails.
+    """
+    try:
+        job = ProductImport.objects.select_related("seller").get(pk=import_id)
+    except ProductImport.DoesNotExist:
+        logger.error(f"ProductImport {import_id} does not exist.")
+        return {"status": "failed", "id": import_id, "error": "Import does not exist"}
+
+    ProductImport.objects.filter(pk=job.pk).update(status="running", updated_at=timezone.now())
+
+    def save_progress(stats, **extra):
+        ProductImport.objects.filter(pk=job.pk).update(
+            processed_rows=stats.processed,
+            created_count=stats.created,
+            updated_count=stats.updated,
+            failed_count=stats.failed,
+            errors=stats.errors,
+            updated_at=timezone.now(),
+            **extra,
+        )
+
+    importer = ProductImporter(job.seller, on_progress=save_progress)
+    try:
+        with job.file.open("rb") as stream:
+            stats = importer.run(iter_rows(stream, job.format))
+    except Exception:
+        logger.exception(f"ProductImport {job.pk} failed.")
+        save_progress(importer.stats, status="failed", finished_at=timezone.now(), file="")
+        return {"status": "failed", "id": job.pk}
+    finally:
+        # The outcome is recorded on the ProductImport; the upload is not kept.
+        job.file.delete(save=False)
+
+    save_progress(stats, status="completed", finished_at=timezone.now(), file="")
+    return {"status": "completed", "id": job.pk, **stats.as_dict()}
+
+
+@shared_task
+def process_product_images(product_id, paths):
+    """
+    Generate resized variants for staged product images and record them in
+    Product.images. Entries replaced while the task ran are left alone.
+    """
+    results = {}
+    for path in paths:
+        try:
+            results[path] = {"status": STATUS_READY, "variants": generate_variants(path)}
+        except Exception:
+            logger.exception(f"Could not process image {path} for product {product_id}.")
+            results[path] = {"status": STATUS_FAILED, "variants": {}}
+
+    with transaction.atomic():
+        product = Product.objects.select_for_update().filter(pk=product_id).first()
+        if product is None:
+            return {"status": "failed", "id": product_id, "error": "Product does not exist"}
+        images = []
+        for entry in product.images:
+            if isinstance(entry, dict) and entry.get("original") in results:
+                entry = with_urls({**entry, **results[entry["original"]]})
+            images.append(entry)
+        product.images = images
+        product.save(update_fields=["images", "updated_at"])
+    invalidate_product_cache(product_id)
+
+    processed = sum(result["status"] == STATUS_READY for result in results.values())
+    return {"status": "ok", "id": product_id, "processed": processed, "failed": len(paths) - processed}
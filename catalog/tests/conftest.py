@@ -6,6 +6,7 @@ import itertools
 import pytest
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.db.models import F
 from rest_framework.test import APIClient
 
 from catalog.models import Category, Product, Review
@@ -116,7 +117,13 @@ def review_factory(db, product_factory, user_factory):
             "user": reviewer,
         }
         defaults.update(kwargs)
-        return Review.objects.create(**defaults)
+        review = Review.objects.create(**defaults)
+        # Mirror ReviewViewSet, which maintains the product's rating counters.
+        Product.objects.filter(pk=product.pk).update(
+            rating_sum=F("rating_sum") + review.rating,
+            review_count=F("review_count") + 1,
+        )
+        return review
 
     return FactoryHelper(create_review)
 
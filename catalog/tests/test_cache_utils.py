@@ -0,0 +1,285 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+from django.http import QueryDict
+from django.urls import reverse
+
+from catalog.cache_utils import (
+    LOCK_KEY,
+    PRODUCT_DETAIL_KEY,
+    PRODUCT_LIST_GENERATION_KEY,
+    build_product_list_key,
+    canonical_query_key,
+    get_or_compute,
+    get_product_list_generation,
+    invalidate_product_cache,
+)
+
+
+class TestProductListGeneration:
+    def test_invalidate_bumps_generation(self):
+        before = get_product_list_generation()
+
+        invalidate_product_cache()
+
+        assert get_product_list_generation() == before + 1
+
+    def test_list_key_changes_after_invalidation(self):
+        key = build_product_list_key("/api/catalog/products/")
+
+        invalidate_product_cache()
+
+        assert build_product_list_key("/api/catalog/products/") != key
+
+    def test_invalidate_seeds_missing_generation(self):
+        cache.delete(PRODUCT_LIST_GENERATION_KEY)
+
+        invalidate_product_cache()
+
+        assert cache.get(PRODUCT_LIST_GENERATION_KEY) is not None
+
+    def test_invalidate_keeps_unrelated_keys(self):
+        cache.set("sessions:abc", "keep-me")
+
+        invalidate_product_cache(product_id=1)
+
+        assert cache.get("sessions:abc") == "keep-me"
+
+
+class TestCanonicalQueryKey:
+    allowed = {"category", "min_price", "page", "sort", "search"}
+
+    def key(self, query_string, **kwargs):
+        return canonical_query_key(QueryDict(query_string), self.allowed, **kwargs)
+
+    def test_parameter_order_is_ignored(self):
+        assert self.key("category=1&min_price=5") == self.key("min_price=5&category=1")
+
+    def test_unknown_and_empty_parameters_are_ignored(self):
+        assert self.key("category=1") == self.key(
+            "utm_source=mail&category=1&min_price=&search=%20"
+        )
+
+    def test_lowercase_parameters_are_case_folded(self):
+        assert self.key("sort=-Price", lowercase={"sort"}) == self.key(
+            "sort=-price", lowercase={"sort"}
+        )
+
+    def test_default_values_are_dropped(self):
+        assert self.key("page=1", defaults={"page": "1"}) == self.key("")
+
+    def test_different_values_produce_different_keys(self):
+        assert self.key("category=1") != self.key("category=2")
+
+
+class TestGetOrCompute:
+    key = "tests:stampede"
+
+    def store_expired(self, value):
+        cache.set(
+            self.key,
+            {"value": value, "expires_at": time.time() - 1, "delta": 0.0},
+            timeout=60,
+        )
+
+    def test_miss_computes_and_caches(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "fresh"
+
+        assert get_or_compute(self.key, compute, timeout=60) == ("fresh", False)
+        assert get_or_compute(self.key, compute, timeout=60) == ("fresh", False)
+        assert len(calls) == 1
+
+    def test_expired_entry_is_recomputed(self):
+        self.store_expired("old")
+
+        value, is_stale = get_or_compute(self.key, lambda: "new", timeout=60)
+
+        assert (value, is_stale) == ("new", False)
+        assert cache.get(LOCK_KEY.format(key=self.key)) is None
+
+    def test_expired_entry_served_stale_while_locked(self):
+        self.store_expired("old")
+        cache.add(LOCK_KEY.format(key=self.key), 1, timeout=10)
+
+        value, is_stale = get_or_compute(self.key, lambda: "new", timeout=60)
+
+        assert (value, is_stale) == ("old", True)
+
+    def test_lock_released_when_compute_fails(self):
+        def compute():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            get_or_compute(self.key, compute, timeout=60)
+
+        assert cache.get(LOCK_KEY.format(key=self.key)) is None
+
+    def test_expired_lock_is_not_released_by_its_old_holder(self):
+        lock_key = LOCK_KEY.format(key=self.key)
+
+        def compute():
+            # The lock expires mid-compute and another caller takes it.
+            cache.set(lock_key, "next-holder", timeout=10)
+            return "value"
+
+        assert get_or_compute(self.key, compute, timeout=60) == ("value", False)
+        assert cache.get(lock_key) == "next-holder"
+
+    def test_waiter_computes_once_wait_timeout_passes(self):
+        lock_key = LOCK_KEY.format(key=self.key)
+        cache.add(lock_key, "stuck-holder", timeout=10)
+
+        started = time.monotonic()
+        value = get_or_compute(self.key, lambda: "value", timeout=60, wait_timeout=0.2)
+
+        assert value == ("value", False)
+        assert time.monotonic() - started < 1
+        assert cache.get(lock_key) == "stuck-holder"
+
+    def test_wait_is_capped_at_lock_timeout(self):
+        cache.add(LOCK_KEY.format(key=self.key), "stuck-holder", timeout=10)
+
+        started = time.monotonic()
+        get_or_compute(self.key, lambda: "value", timeout=60, lock_timeout=0.2, wait_timeout=30)
+
+        assert time.monotonic() - started < 1
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        def worker():
+            results.append(get_or_compute(self.key, compute, timeout=60))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [("value", False)] * 8
+
+    def run_concurrently(self, compute, workers=5):
+        outcomes = []
+
+        def worker():
+            started = time.monotonic()
+            try:
+                outcome = get_or_compute(self.key, compute, timeout=60)
+            except RuntimeError as exc:
+                outcome = exc
+            outcomes.append((outcome, time.monotonic() - started))
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_waiters_stop_waiting_when_compute_fails(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            raise RuntimeError("missing")
+
+        outcomes = self.run_concurrently(compute)
+
+        assert all(isinstance(outcome, RuntimeError) for outcome, _ in outcomes)
+        # Waiters take the lock over one at a time instead of sleeping out a timeout.
+        assert len(calls) == 5
+        assert max(elapsed for _, elapsed in outcomes) < 1.5
+        assert cache.get(LOCK_KEY.format(key=self.key)) is None
+
+    def test_waiter_takes_over_after_failed_compute(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return "value"
+
+        outcomes = self.run_concurrently(compute)
+
+        results = [outcome for outcome, _ in outcomes]
+        errors = [outcome for outcome in results if isinstance(outcome, RuntimeError)]
+        assert len(calls) == 2
+        assert len(errors) == 1
+        assert [r for r in results if r not in errors] == [("value", False)] * 4
+
+
+@pytest.mark.django_db
+class TestProductDetailStaleWhileRevalidate:
+    def test_stale_payload_is_flagged(self, api_client, product_factory):
+        product = product_factory()
+        key = PRODUCT_DETAIL_KEY.format(product_id=product.id)
+        cache.set(
+            key,
+            {
+                "value": {"payload": {"id": product.id}, "last_modified": None},
+                "expires_at": time.time() - 1,
+                "delta": 0.0,
+            },
+            timeout=60,
+        )
+        cache.add(LOCK_KEY.format(key=key), 1, timeout=10)
+
+        res = api_client.get(reverse("product-detail", args=[product.id]))
+
+        assert res.status_code == 200
+        assert res.data == {"id": product.id}
+        assert "Stale" in res["Warning"]
+
+
+@pytest.mark.django_db
+class TestProductListCacheKey:
+    def test_equivalent_query_strings_share_cache_entry(
+        self, api_client, product_factory, django_assert_num_queries
+    ):
+        product_factory.create_batch(2)
+        url = reverse("product-list")
+
+        api_client.get(f"{url}?sort=price&page=1&utm_campaign=launch")
+
+        with django_assert_num_queries(0):
+            res = api_client.get(f"{url}?utm_source=ads&sort=PRICE")
+
+        assert res.status_code == 200
+        assert len(res.data["results"]) == 2
+
+
+@pytest.mark.django_db
+class TestProductListCacheInvalidation:
+    def test_update_invalidates_cached_list(
+        self, api_client, seller_user, product_factory
+    ):
+        product = product_factory(seller=seller_user, title="Old title")
+        url = reverse("product-list")
+
+        first = api_client.get(url)
+        assert first.data["results"][0]["title"] == "Old title"
+
+        api_client.force_authenticate(seller_user)
+        api_client.patch(
+            reverse("product-detail", args=[product.id]), {"title": "New title"}
+        )
+        api_client.force_authenticate(None)
+
+        second = api_client.get(url)
+        assert second.data["results"][0]["title"] == "New title"
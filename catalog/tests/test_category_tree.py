@@ -0,0 +1,215 @@
+import importlib
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Category, Product
+
+build_paths = importlib.import_module("catalog.migrations.0010_category_path").build_paths
+
+CATEGORIES_URL = "/api/catalog/categories/"
+PRODUCTS_URL = "/api/catalog/products/"
+
+
+@pytest.fixture
+def tree(db):
+    """
+    electronics
+    ├── computers
+    │   └── laptops
+    │       └── gaming
+    └── phones
+    """
+    electronics = Category.objects.create(name="Electronics")
+    computers = Category.objects.create(name="Computers", parent=electronics)
+    laptops = Category.objects.create(name="Laptops", parent=computers)
+    gaming = Category.objects.create(name="Gaming", parent=laptops)
+    phones = Category.objects.create(name="Phones", parent=electronics)
+    return {
+        "electronics": electronics,
+        "computers": computers,
+        "laptops": laptops,
+        "gaming": gaming,
+        "phones": phones,
+    }
+
+
+def refresh(tree):
+    for category in tree.values():
+        category.refresh_from_db()
+    return tree
+
+
+def names(children):
+    return [child["name"] for child in children]
+
+
+@pytest.mark.django_db
+class TestCategoryPath:
+    def test_paths_follow_the_tree(self, tree):
+        electronics, computers, laptops, gaming = (
+            tree["electronics"], tree["computers"], tree["laptops"], tree["gaming"]
+        )
+        assert electronics.path == f"{electronics.pk}/"
+        assert gaming.path == f"{electronics.pk}/{computers.pk}/{laptops.pk}/{gaming.pk}/"
+        assert (electronics.depth, laptops.depth, gaming.depth) == (0, 2, 3)
+
+    def test_subtree(self, tree):
+        subtree = Category.objects.subtree(tree["computers"])
+        assert set(subtree.values_list("name", flat=True)) == {"Computers", "Laptops", "Gaming"}
+        below = Category.objects.subtree(tree["computers"], include_self=False)
+        assert set(below.values_list("name", flat=True)) == {"Laptops", "Gaming"}
+
+    def test_moving_a_category_repaths_its_descendants(self, tree):
+        laptops = tree["laptops"]
+        laptops.parent = tree["phones"]
+        laptops.save()
+
+        refresh(tree)
+        phones, gaming = tree["phones"], tree["gaming"]
+        assert tree["laptops"].path == f"{phones.path}{laptops.pk}/"
+        assert gaming.path == f"{phones.path}{laptops.pk}/{gaming.pk}/"
+        assert gaming.depth == 3
+
+    def test_moving_to_the_root(self, tree):
+        computers = tree["computers"]
+        computers.parent = None
+        computers.save()
+
+        refresh(tree)
+        assert tree["computers"].path == f"{computers.pk}/"
+        assert tree["gaming"].depth == 2
+        assert tree["gaming"].path.startswith(tree["computers"].path)
+
+    def test_saving_without_moving_skips_path_queries(self, tree):
+        laptops = tree["laptops"]
+        laptops.name = "Notebooks"
+        with CaptureQueriesContext(connection) as ctx:
+            laptops.save()
+        assert len(ctx.captured_queries) == 1
+
+    def test_categories_without_a_path(self, tree):
+        loose, = Category.objects.bulk_create([Category(name="Loose", slug="loose")])
+        child, = Category.objects.bulk_create([Category(name="Child", slug="child", parent=loose)])
+
+        assert list(Category.objects.subtree(loose)) == [loose]
+        assert child.is_within(loose) and child.is_within(child)
+        assert not loose.is_within(child)
+        assert not tree["gaming"].is_within(loose)
+
+    def test_deleting_a_category_reroots_its_children(self, tree):
+        tree["computers"].delete()
+        laptops = Category.objects.get(pk=tree["laptops"].pk)
+        gaming = Category.objects.get(pk=tree["gaming"].pk)
+        assert laptops.parent_id is None
+        assert laptops.path == f"{laptops.pk}/"
+        assert (laptops.depth, gaming.depth) == (0, 1)
+        assert gaming.path == f"{laptops.pk}/{gaming.pk}/"
+
+
+@pytest.mark.django_db
+class TestBuildPathsMigration:
+    def test_backfills_paths_and_depths(self, tree):
+        Category.objects.update(path="", depth=0)
+
+        build_paths(apps, None)
+
+        refresh(tree)
+        electronics, gaming = tree["electronics"], tree["gaming"]
+        assert electronics.path == f"{electronics.pk}/"
+        assert gaming.path.startswith(electronics.path)
+        assert (electronics.depth, gaming.depth) == (0, 3)
+
+    def test_parent_cycle_is_reported(self, tree):
+        # computers -> laptops -> gaming -> computers
+        Category.objects.filter(pk=tree["computers"].pk).update(parent=tree["gaming"])
+
+        with pytest.raises(RuntimeError) as exc_info:
+            build_paths(apps, None)
+
+        cycle = sorted(tree[name].pk for name in ("computers", "laptops", "gaming"))
+        assert str(cycle) in str(exc_info.value)
+
+
+@pytest.mark.django_db
+class TestCategoryTreeAPI:
+    def test_list_with_children_is_one_query(self, api_client, tree):
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(CATEGORIES_URL, {"include_children": "1"})
+
+        assert response.status_code == 200
+        assert len(ctx.captured_queries) == 1
+        electronics = next(c for c in response.data if c["name"] == "Electronics")
+        assert names(electronics["children"]) == ["Computers", "Phones"]
+        computers = electronics["children"][0]
+        assert names(computers["children"]) == ["Laptops"]
+        assert names(computers["children"][0]["children"]) == ["Gaming"]
+
+    def test_retrieve_loads_the_subtree_in_one_query(self, api_client, tree):
+        url = f"{CATEGORIES_URL}{tree['electronics'].pk}/"
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(url, {"include_children": "1"})
+
+        assert response.status_code == 200
+        # the category itself, then its whole subtree
+        assert len(ctx.captured_queries) == 2
+        laptops = response.data["children"][0]["children"][0]
+        assert names(laptops["children"]) == ["Gaming"]
+
+    def test_inactive_categories_hide_their_subtree(self, api_client, tree):
+        Category.objects.filter(pk=tree["laptops"].pk).update(is_active=False)
+        url = f"{CATEGORIES_URL}{tree['electronics'].pk}/"
+        response = api_client.get(url, {"include_children": "1"})
+
+        computers = response.data["children"][0]
+        assert computers["children"] == []
+
+    def test_parent_cannot_be_a_descendant(self, api_client, admin_user, tree):
+        api_client.force_authenticate(admin_user)
+        url = f"{CATEGORIES_URL}{tree['computers'].pk}/"
+
+        response = api_client.patch(url, {"parent": tree["gaming"].pk}, format="json")
+        assert response.status_code == 400
+        assert "parent" in response.data
+
+        response = api_client.patch(url, {"parent": tree["computers"].pk}, format="json")
+        assert response.status_code == 400
+
+    def test_categories_without_a_path_via_api(self, api_client, admin_user, seller_user, tree):
+        loose, = Category.objects.bulk_create([Category(name="Loose", slug="loose")])
+        child, = Category.objects.bulk_create([Category(name="Child", slug="child", parent=loose)])
+        for category in (loose, tree["phones"]):
+            Product.objects.create(
+                seller=seller_user, category=category, title=f"{category.name} product",
+                price="10.00", stock_quantity=1,
+            )
+
+        response = api_client.get(PRODUCTS_URL, {"category": loose.pk})
+        assert [p["title"] for p in response.data["results"]] == ["Loose product"]
+
+        api_client.force_authenticate(admin_user)
+        response = api_client.patch(f"{CATEGORIES_URL}{loose.pk}/", {"parent": child.pk}, format="json")
+        assert response.status_code == 400
+        response = api_client.patch(
+            f"{CATEGORIES_URL}{child.pk}/", {"parent": tree["phones"].pk}, format="json"
+        )
+        assert response.status_code == 200
+
+    def test_product_filter_includes_descendant_categories(self, api_client, seller_user, tree):
+        for name in ("electronics", "gaming", "phones"):
+            Product.objects.create(
+                seller=seller_user,
+                category=tree[name],
+                title=f"{name} product",
+                price="10.00",
+                stock_quantity=1,
+            )
+
+        response = api_client.get(PRODUCTS_URL, {"category": tree["computers"].pk})
+        assert response.status_code == 200
+        assert [p["title"] for p in response.data["results"]] == ["gaming product"]
+
+        response = api_client.get(PRODUCTS_URL, {"category": tree["electronics"].pk})
+        assert response.data["count"] == 3
@@ -0,0 +1,66 @@
+import pytest
+from django.urls import reverse
+
+
+def walk_cursor_pages(api_client, params):
+    url = reverse("product-list")
+    res = api_client.get(url, {"pagination": "cursor", **params})
+    pages = [res]
+    while res.data["next"]:
+        res = api_client.get(res.data["next"])
+        pages.append(res)
+    return pages
+
+
+@pytest.mark.django_db
+class TestProductKeysetPagination:
+    def test_pages_cover_every_product_once(self, api_client, product_factory):
+        # Many ties on price exercise the id tiebreaker.
+        for idx in range(30):
+            product_factory(title=f"Item {idx:02d}", price=10 + idx % 3)
+
+        pages = walk_cursor_pages(api_client, {"sort": "price"})
+
+        ids = [item["id"] for page in pages for item in page.data["results"]]
+        prices = [
+            float(item["price"]) for page in pages for item in page.data["results"]
+        ]
+        assert len(pages) == 3
+        assert len(ids) == len(set(ids)) == 30
+        assert prices == sorted(prices)
+
+    def test_descending_sort(self, api_client, product_factory):
+        for idx in range(15):
+            product_factory(title=f"Item {idx:02d}")
+
+        pages = walk_cursor_pages(api_client, {"sort": "-title"})
+
+        titles = [item["title"] for page in pages for item in page.data["results"]]
+        assert titles == sorted(titles, reverse=True)
+
+    def test_default_ordering_is_newest_first(self, api_client, product_factory):
+        products = product_factory.create_batch(3)
+
+        res = api_client.get(reverse("product-list"), {"pagination": "cursor"})
+
+        assert [item["id"] for item in res.data["results"]] == [
+            p.id for p in reversed(products)
+        ]
+        assert res.data["next"] is None
+        assert "count" not in res.data
+
+    def test_invalid_cursor_returns_404(self, api_client, product_factory):
+        product_factory()
+
+        res = api_client.get(
+            reverse("product-list"), {"pagination": "cursor", "cursor": "garbage"}
+        )
+
+        assert res.status_code == 404
+
+    def test_page_number_pagination_is_default(self, api_client, product_factory):
+        product_factory.create_batch(2)
+
+        res = api_client.get(reverse("product-list"))
+
+        assert res.data["count"] == 2
@@ -0,0 +1,142 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+
+from catalog.images import IMAGE_VARIANT_SIZES, enabled_formats, pending_entry
+from catalog.tasks import process_product_images
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+def image_upload(name="photo.jpg", size=(1600, 900)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color="red").save(buffer, format="JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+@pytest.mark.django_db
+class TestProductImagePipeline:
+    def upload(self, api_client, seller_user, product, capture):
+        api_client.force_authenticate(seller_user)
+        url = reverse("product-detail", args=[product.pk])
+        with capture(execute=True):
+            res = api_client.patch(url, {"images": [image_upload()]}, format="multipart")
+        assert res.status_code == 200
+        product.refresh_from_db()
+        return res
+
+    def test_upload_is_staged_then_processed(
+        self, api_client, seller_user, product_factory, django_capture_on_commit_callbacks
+    ):
+        product = product_factory(seller=seller_user)
+
+        self.upload(api_client, seller_user, product, django_capture_on_commit_callbacks)
+
+        [entry] = product.images
+        assert entry["status"] == "ready"
+        assert default_storage.exists(entry["original"])
+        assert set(entry["variants"]) == set(IMAGE_VARIANT_SIZES)
+        for size, edge in IMAGE_VARIANT_SIZES.items():
+            assert set(entry["variants"][size]) == set(enabled_formats())
+            with default_storage.open(entry["variants"][size]["webp"]) as f:
+                assert max(Image.open(f).size) == edge
+
+    def test_list_links_thumbnails_and_detail_links_large(
+        self, api_client, seller_user, product_factory, django_capture_on_commit_callbacks
+    ):
+        product = product_factory(seller=seller_user)
+        self.upload(api_client, seller_user, product, django_capture_on_commit_callbacks)
+
+        listed = api_client.get(reverse("product-list")).data["results"][0]
+        detail = api_client.get(reverse("product-detail", args=[product.pk])).data
+
+        assert listed["images_urls"][0].endswith("_thumbnail.webp")
+        assert detail["images_urls"][0].endswith("_large.webp")
+
+    def test_pending_and_legacy_entries_fall_back_to_original(
+        self, api_client, product_factory
+    ):
+        product = product_factory(
+            images=["products/1/legacy.jpg", pending_entry("products/1/new.jpg")]
+        )
+
+        res = api_client.get(reverse("product-detail", args=[product.pk]))
+
+        assert res.data["images_urls"] == [
+            "http://testserver/media/products/1/legacy.jpg",
+            "http://testserver/media/products/1/new.jpg",
+        ]
+
+    def test_unreadable_image_is_marked_failed(self, product_factory):
+        path = default_storage.save("products/1/broken.jpg", ContentFile(b"not an image"))
+        product = product_factory(images=[pending_entry(path)])
+
+        result = process_product_images(product.pk, [path])
+
+        product.refresh_from_db()
+        assert result["failed"] == 1
+        assert product.images[0]["status"] == "failed"
+
+    def test_replaced_images_are_left_alone(self, product_factory):
+        path = default_storage.save("products/1/old.jpg", image_upload())
+        product = product_factory(images=[pending_entry("products/1/newer.jpg")])
+
+        process_product_images(product.pk, [path])
+
+        product.refresh_from_db()
+        assert product.images == [pending_entry("products/1/newer.jpg")]
+
+
+@pytest.mark.django_db
+class TestImageURLResolution:
+    @pytest.fixture
+    def storage_calls(self, monkeypatch):
+        calls = []
+        real_url = default_storage.url
+
+        def counting_url(name):
+            calls.append(name)
+            return real_url(name)
+
+        monkeypatch.setattr(default_storage, "url", counting_url)
+        return calls
+
+    def test_list_resolves_each_path_once(self, api_client, product_factory, storage_calls):
+        for _ in range(3):
+            product_factory(images=["products/shared.jpg", "products/shared.jpg"])
+
+        res = api_client.get(reverse("product-list"))
+
+        urls = [url for item in res.data["results"] for url in item["images_urls"]]
+        assert urls == ["http://testserver/media/products/shared.jpg"] * 6
+        assert storage_calls == ["products/shared.jpg"]
+
+    def test_write_time_urls_skip_storage_calls(
+        self, settings, api_client, seller_user, product_factory, storage_calls,
+        django_capture_on_commit_callbacks,
+    ):
+        settings.CATALOG_IMAGE_URLS_AT_WRITE = True
+        product = product_factory(seller=seller_user)
+        api_client.force_authenticate(seller_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.patch(
+                reverse("product-detail", args=[product.pk]),
+                {"images": [image_upload()]},
+                format="multipart",
+            )
+        product.refresh_from_db()
+        assert product.images[0]["urls"]["thumbnail"].endswith("_thumbnail.webp")
+        storage_calls.clear()
+
+        res = api_client.get(reverse("product-list"))
+
+        assert res.data["results"][0]["images_urls"][0].startswith("http://testserver/media/")
+        assert storage_calls == []
@@ -0,0 +1,219 @@
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.urls import reverse
+
+from catalog import importers, tasks
+from catalog.importers import FORMAT_CSV, FORMAT_JSONL, ProductImporter, iter_rows
+from catalog.models import Product, ProductImport
+
+
+def csv_rows(text):
+    return iter_rows(io.BytesIO(text.encode()), FORMAT_CSV)
+
+
+@pytest.mark.django_db
+class TestProductImporter:
+    def test_creates_products_and_reports_row_errors(self, seller_user, category_factory):
+        category = category_factory(name="Shoes")
+        rows = csv_rows(
+            "title,price,category,stock_quantity,description\n"
+            f"Runner,49.99,{category.pk},5,Light\n"
+            "Runner,59.99,shoes,,\n"
+            "No price,,shoes,1,\n"
+            "Lost,10,unknown,1,\n"
+        )
+
+        stats = ProductImporter(seller_user).run(rows)
+
+        assert (stats.processed, stats.created, stats.failed) == (4, 2, 2)
+        assert [error["row"] for error in stats.errors] == [4, 5]
+        assert "price" in stats.errors[0]["errors"]
+        assert "category" in stats.errors[1]["errors"]
+        products = Product.objects.order_by("id")
+        assert [p.slug for p in products] == ["runner", "runner-1"]
+        assert products[1].stock_quantity == 0
+        assert all(p.seller_id == seller_user.pk for p in products)
+
+    def test_slug_column_updates_own_products(
+        self, seller_user, user_factory, product_factory, category_factory
+    ):
+        category = category_factory(name="Shoes")
+        mine = product_factory(title="Runner", slug="runner", stock_quantity=5)
+        product_factory(title="Other", slug="other", seller=user_factory())
+        rows = csv_rows(
+            "slug,title,price,category,stock_quantity\n"
+            "runner,Runner v2,20,shoes,7\n"
+            "other,Hijack,1,shoes,1\n"
+        )
+
+        stats = ProductImporter(seller_user).run(rows)
+
+        assert (stats.created, stats.updated, stats.failed) == (0, 1, 1)
+        assert stats.errors[0]["errors"] == {"slug": ["This slug is already in use."]}
+        mine.refresh_from_db()
+        assert (mine.title, mine.stock_quantity, mine.category_id) == ("Runner v2", 7, category.pk)
+        assert mine.updated_at > mine.created_at
+
+    def test_writes_in_chunks_and_invalidates_once(
+        self, seller_user, category_factory, monkeypatch
+    ):
+        category_factory(name="Shoes")
+        invalidations = []
+        monkeypatch.setattr(
+            importers, "invalidate_product_cache", lambda *a: invalidations.append(a)
+        )
+        progress = []
+        rows = csv_rows(
+            "title,price,category\n" + "".join(f"Item {i},1,shoes\n" for i in range(5))
+        )
+
+        importer = ProductImporter(
+            seller_user, batch_size=2, on_progress=lambda s: progress.append(s.processed)
+        )
+        importer.run(rows)
+
+        assert progress == [2, 4, 5]
+        assert len(invalidations) == 1
+        assert Product.objects.count() == 5
+
+    def test_failed_chunk_still_invalidates_committed_ones(
+        self, seller_user, category_factory, product_factory, monkeypatch
+    ):
+        category_factory(name="Shoes")
+        product = product_factory(title="Runner", slug="runner")
+        detail_key = importers.PRODUCT_DETAIL_KEY.format(product_id=product.pk)
+        importers.cache.set(detail_key, "stale")
+        invalidations = []
+        monkeypatch.setattr(
+            importers, "invalidate_product_cache", lambda *a: invalidations.append(a)
+        )
+        write = ProductImporter._write
+        calls = []
+
+        def fail_second_chunk(importer, valid):
+            calls.append(1)
+            if len(calls) > 1:
+                raise IntegrityError("duplicate key")
+            return write(importer, valid)
+
+        monkeypatch.setattr(ProductImporter, "_write", fail_second_chunk)
+        rows = csv_rows(
+            "slug,title,price,category\n"
+            "runner,Runner v2,20,shoes\n"
+            ",Item,1,shoes\n"
+            ",Lost,1,shoes\n"
+        )
+
+        with pytest.raises(IntegrityError):
+            ProductImporter(seller_user, batch_size=2).run(rows)
+
+        assert Product.objects.filter(title="Item").exists()
+        assert len(invalidations) == 1
+        assert importers.cache.get(detail_key) is None
+
+    def test_jsonl_reports_unparseable_lines(self, seller_user, category_factory):
+        category_factory(name="Shoes")
+        data = (
+            b'{"title": "Runner", "price": "9.50", "category": "shoes"}\n'
+            b"\n"
+            b"not json\n"
+            b"[1, 2]\n"
+        )
+
+        stats = ProductImporter(seller_user).run(iter_rows(io.BytesIO(data), FORMAT_JSONL))
+
+        assert (stats.created, stats.failed) == (1, 2)
+        assert [error["row"] for error in stats.errors] == [3, 4]
+
+
+@pytest.mark.django_db
+class TestImportProductsCommand:
+    def test_imports_file(self, tmp_path, seller_user, category_factory):
+        category_factory(name="Shoes")
+        path = tmp_path / "products.jsonl"
+        path.write_text('{"title": "Runner", "price": 10, "category": "shoes"}\n')
+        out = io.StringIO()
+
+        call_command("import_products", str(path), seller=seller_user.username, stdout=out)
+
+        assert Product.objects.filter(slug="runner", seller=seller_user).exists()
+        assert "1 created" in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestProductImportEndpoint:
+    url = reverse("product-import-list")
+
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+
+    def upload(self, text, name="products.csv"):
+        return SimpleUploadedFile(name, text.encode(), content_type="text/csv")
+
+    def test_seller_upload_runs_in_background(
+        self, api_client, seller_user, category_factory, django_capture_on_commit_callbacks
+    ):
+        category_factory(name="Shoes")
+        api_client.force_authenticate(seller_user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            res = api_client.post(
+                self.url,
+                {"file": self.upload("title,price,category\nRunner,10,shoes\nBad,,shoes\n")},
+                format="multipart",
+            )
+
+        assert res.status_code == 202
+        assert res.data["status"] == "pending"
+        detail = api_client.get(reverse("product-import-detail", args=[res.data["id"]]))
+        assert detail.data["status"] == "completed"
+        assert detail.data["format"] == "csv"
+        assert (detail.data["created_count"], detail.data["failed_count"]) == (1, 1)
+        assert detail.data["errors"][0]["row"] == 3
+        assert ProductImport.objects.get(pk=res.data["id"]).file.name == ""
+        assert default_storage.listdir("imports/products/") == ([], [])
+
+    def test_failed_import_deletes_the_upload(
+        self, api_client, seller_user, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        def explode(importer, rows):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(tasks.ProductImporter, "run", explode)
+        api_client.force_authenticate(seller_user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            res = api_client.post(
+                self.url, {"file": self.upload("title,price,category\n")}, format="multipart"
+            )
+
+        job = ProductImport.objects.get(pk=res.data["id"])
+        assert job.status == "failed"
+        assert job.file.name == ""
+        assert default_storage.listdir("imports/products/") == ([], [])
+
+    def test_imports_are_private_to_their_seller(
+        self, api_client, seller_user, user_factory
+    ):
+        job = ProductImport.objects.create(
+            seller=seller_user, file="imports/products/x.csv", format="csv"
+        )
+        other = user_factory(is_seller=True)
+        api_client.force_authenticate(other)
+
+        res = api_client.get(reverse("product-import-detail", args=[job.pk]))
+
+        assert res.status_code == 404
+
+    def test_regular_user_cannot_import(self, api_client, user):
+        api_client.force_authenticate(user)
+
+        res = api_client.post(self.url, {"file": self.upload("title\n")}, format="multipart")
+
+        assert res.status_code == 403
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from catalog.models import Product
+from catalog.serializers import ProductReadSerializer, ProductSerializer
+
+PRODUCTS_URL = "/api/catalog/products/"
+
+
+@pytest.fixture
+def products(product_factory, category_factory, seller_user):
+    category = category_factory()
+    return [
+        product_factory(category=category, price="10.50", images=[]),
+        product_factory(
+            category=category,
+            price="1999.99",
+            description="",
+            images=[
+                "products/1/legacy.jpg",
+                {
+                    "original": "products/1/new.jpg",
+                    "status": "ready",
+                    "variants": {"thumbnail": {"webp": "products/1/new_thumbnail.webp"}},
+                },
+            ],
+            rating_sum=7,
+            review_count=3,
+        ),
+        product_factory(category=category, price="0.00", stock_quantity=0, is_active=False),
+    ]
+
+
+def render_both(queryset, context, many=True):
+    drf = ProductSerializer(queryset, many=many, context=dict(context)).data
+    fast = ProductReadSerializer(queryset, many=many, context=dict(context)).data
+    return JSONRenderer().render(drf), JSONRenderer().render(fast)
+
+
+@pytest.mark.django_db
+class TestProductReadSerializer:
+    @pytest.mark.parametrize("image_size", ["thumbnail", "large", "original"])
+    def test_matches_product_serializer(self, products, image_size):
+        request = APIRequestFactory().get(PRODUCTS_URL)
+        queryset = Product.objects.order_by("id")
+
+        drf, fast = render_both(queryset, {"request": request, "image_size": image_size})
+        assert fast == drf
+
+    def test_matches_without_request(self, products):
+        drf, fast = render_both(Product.objects.order_by("id"), {})
+        assert fast == drf
+
+    def test_single_product(self, products):
+        drf, fast = render_both(Product.objects.get(pk=products[1].pk), {}, many=False)
+        assert fast == drf
+
+    def test_loaded_columns_are_enough(self, products):
+        queryset = Product.objects.only(*ProductReadSerializer.columns).order_by("id")
+        with CaptureQueriesContext(connection) as ctx:
+            ProductReadSerializer(queryset, many=True).data
+        assert len(ctx.captured_queries) == 1
+
+    def test_api_list_and_detail_match_product_serializer(self, api_client, products):
+        response = api_client.get(PRODUCTS_URL)
+        request = response.wsgi_request
+        active = Product.objects.filter(is_active=True).order_by("-created_at", "-id")
+        expected = ProductSerializer(
+            active, many=True, context={"request": request, "image_size": "thumbnail"}
+        ).data
+        assert JSONRenderer().render(response.data["results"]) == JSONRenderer().render(expected)
+
+        product = products[1]
+        response = api_client.get(f"{PRODUCTS_URL}{product.pk}/")
+        expected = ProductSerializer(
+            product, context={"request": response.wsgi_request, "image_size": "large"}
+        ).data
+        assert JSONRenderer().render(response.data) == JSONRenderer().render(expected)
@@ -1,7 +1,11 @@
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
 from django.urls import reverse
 
-from catalog.models import Review
+from catalog.models import Product, Review
+from catalog.serializers import ProductSerializer
 
 
 @pytest.mark.django_db
@@ -122,3 +126,98 @@ class TestReviewDetail:
         res = api_client.delete(url)
 
         assert res.status_code == 204
+
+
+@pytest.mark.django_db
+class TestReviewRatingCounters:
+    def test_create_increments_counters(self, api_client, user, product_factory):
+        product = product_factory()
+        api_client.force_authenticate(user)
+
+        url = reverse("product-reviews-list", kwargs={"product_pk": product.id})
+        api_client.post(url, {"rating": 4, "comment": "Good"})
+
+        product.refresh_from_db()
+        assert product.rating_sum == 4
+        assert product.review_count == 1
+        assert product.rating_avg == 4.0
+
+    def test_update_applies_rating_delta(self, api_client, review_factory):
+        review = review_factory(rating=2)
+        api_client.force_authenticate(review.user)
+
+        url = reverse(
+            "product-reviews-detail",
+            kwargs={"product_pk": review.product_id, "pk": review.id},
+        )
+        api_client.patch(url, {"rating": 5})
+
+        product = Product.objects.get(pk=review.product_id)
+        assert product.rating_sum == 5
+        assert product.review_count == 1
+
+    def test_delete_decrements_counters(self, api_client, review_factory):
+        review = review_factory(rating=3)
+        api_client.force_authenticate(review.user)
+
+        url = reverse(
+            "product-reviews-detail",
+            kwargs={"product_pk": review.product_id, "pk": review.id},
+        )
+        api_client.delete(url)
+
+        product = Product.objects.get(pk=review.product_id)
+        assert product.rating_sum == 0
+        assert product.review_count == 0
+        assert product.rating_avg == 0.0
+
+    def test_product_update_keeps_concurrent_review_counts(self, product_factory):
+        product = product_factory(price=10)
+        # A review lands between loading the product and saving the edit.
+        Product.objects.filter(pk=product.pk).update(rating_sum=4, review_count=1)
+
+        serializer = ProductSerializer(product, data={"price": "12.00"}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        product.refresh_from_db()
+        assert (product.price, product.rating_sum, product.review_count) == (12, 4, 1)
+
+    def test_product_detail_exposes_counters(self, api_client, product_factory):
+        product = product_factory()
+        Product.objects.filter(pk=product.pk).update(rating_sum=9, review_count=2)
+
+        res = api_client.get(reverse("product-detail", args=[product.id]))
+
+        assert res.data["rating_avg"] == 4.5
+        assert res.data["review_count"] == 2
+
+
+@pytest.mark.django_db
+class TestReconcileProductRatings:
+    def test_fixes_drifted_counters(self, review_factory, product_factory):
+        product = product_factory()
+        review_factory(product=product, rating=5)
+        review_factory(product=product, rating=3)
+        Product.objects.filter(pk=product.pk).update(rating_sum=1, review_count=7)
+        untouched = product_factory()
+
+        out = StringIO()
+        call_command("reconcile_product_ratings", stdout=out)
+
+        product.refresh_from_db()
+        untouched.refresh_from_db()
+        assert (product.rating_sum, product.review_count) == (8, 2)
+        assert (untouched.rating_sum, untouched.review_count) == (0, 0)
+        assert "Reconciled 1 product(s)." in out.getvalue()
+
+    def test_dry_run_does_not_write(self, review_factory):
+        review = review_factory(rating=5)
+        Product.objects.filter(pk=review.product_id).update(rating_sum=0, review_count=0)
+
+        out = StringIO()
+        call_command("reconcile_product_ratings", "--dry-run", stdout=out)
+
+        product = Product.objects.get(pk=review.product_id)
+        assert product.review_count == 0
+        assert "1 product(s) out of sync." in out.getvalue()
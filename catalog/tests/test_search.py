@@ -0,0 +1,59 @@
+import pytest
+from django.urls import reverse
+
+from catalog import search
+from catalog.models import Product
+
+
+@pytest.mark.django_db
+class TestProductSearch:
+    def test_search_vector_maintained_on_save(self, product_factory):
+        product = product_factory(title="Gaming Laptop")
+
+        assert Product.objects.filter(pk=product.pk, search_vector="laptop").exists()
+
+        product.title = "Desk Lamp"
+        product.save()
+
+        assert not Product.objects.filter(pk=product.pk, search_vector="laptop").exists()
+
+    def test_q_matches_stemmed_words(self, api_client, product_factory):
+        product_factory(title="Gaming Laptop")
+        product_factory(title="Coffee Mug")
+
+        res = api_client.get(reverse("product-list"), {"q": "laptops"})
+
+        assert [item["title"] for item in res.data["results"]] == ["Gaming Laptop"]
+
+    def test_title_matches_rank_above_description_matches(
+        self, api_client, product_factory
+    ):
+        product_factory(title="Backpack", description="Fits a 15 inch laptop")
+        product_factory(title="Laptop Stand", description="Aluminium")
+
+        res = api_client.get(reverse("product-list"), {"search": "laptop"})
+
+        assert [item["title"] for item in res.data["results"]] == [
+            "Laptop Stand",
+            "Backpack",
+        ]
+
+    def test_explicit_sort_overrides_rank(self, api_client, product_factory):
+        product_factory(title="Laptop Sleeve", price=30)
+        product_factory(title="Laptop", description="laptop laptop", price=900)
+
+        res = api_client.get(reverse("product-list"), {"q": "laptop", "sort": "price"})
+
+        assert [item["title"] for item in res.data["results"]] == [
+            "Laptop Sleeve",
+            "Laptop",
+        ]
+
+    def test_degraded_path_without_postgres(self, monkeypatch, product_factory):
+        monkeypatch.setattr(search, "_uses_postgres_search", lambda: False)
+        product_factory(title="Gaming Laptop")
+        product_factory(title="Coffee Mug")
+
+        results = search.search_products(Product.objects.all(), "lapt")
+
+        assert [p.title for p in results] == ["Gaming Laptop"]
@@ -0,0 +1,80 @@
+"""
+Product serialization benchmark: ProductSerializer against ProductReadSerializer
+for 12-, 100- and 1000-item pages.
+
+Run with ``-s`` to see the per-item cost. Only serialization is timed; the
+page is loaded before the clock starts.
+"""
+import time
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from catalog.models import Category, Product
+from catalog.serializers import ProductReadSerializer, ProductSerializer
+
+PAGE_SIZES = (12, 100, 1000)
+ROUNDS = 5
+
+
+def best_time(serializer_class, products, context):
+    """Fastest of ROUNDS runs, and the rendered output of the last one."""
+    best = None
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        data = serializer_class(products, many=True, context=dict(context)).data
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+class TestProductSerializationBenchmark:
+    @pytest.fixture
+    def catalog(self):
+        category = Category.objects.create(name="Benchmark")
+        Product.objects.bulk_create(
+            [
+                Product(
+                    title=f"Product {idx}",
+                    slug=f"benchmark-{idx}",
+                    description="A product used to benchmark serialization. " * 4,
+                    price="19.99",
+                    stock_quantity=idx,
+                    category=category,
+                    images=[
+                        {
+                            "original": f"products/{idx}/1.jpg",
+                            "status": "ready",
+                            "variants": {
+                                "thumbnail": {"webp": f"products/{idx}/1_thumbnail.webp"}
+                            },
+                        }
+                    ],
+                    rating_sum=idx % 25,
+                    review_count=idx % 5,
+                )
+                for idx in range(max(PAGE_SIZES))
+            ]
+        )
+
+    @pytest.mark.parametrize("page_size", PAGE_SIZES)
+    def test_per_item_cost(self, catalog, page_size):
+        context = {
+            "request": APIRequestFactory().get("/api/catalog/products/"),
+            "image_size": "thumbnail",
+        }
+        full = list(Product.objects.select_related("category", "seller")[:page_size])
+        lean = list(Product.objects.only(*ProductReadSerializer.columns)[:page_size])
+
+        drf_time, drf_output = best_time(ProductSerializer, full, context)
+        fast_time, fast_output = best_time(ProductReadSerializer, lean, context)
+
+        assert fast_output == drf_output
+        assert fast_time < drf_time
+        print(
+            f"\n{page_size:>4} items: ProductSerializer {drf_time / page_size * 1e6:.1f}us/item, "
+            f"ProductReadSerializer {fast_time / page_size * 1e6:.1f}us/item "
+            f"({drf_time / fast_time:.1f}x)"
+        )
@@ -0,0 +1,86 @@
+"""
+Slug allocation benchmark: inserting many products that share one title.
+
+Run with ``-s`` to see the numbers, and with SLUG_BENCHMARK_SIZE=10000 for the
+full-size run (the default keeps the regular suite fast).
+"""
+import os
+import time
+
+import pytest
+from django.db import connection
+from django.utils.text import slugify
+
+from catalog.models import Category, Product
+from catalog.slugs import allocate_slugs
+
+SIZE = int(os.getenv("SLUG_BENCHMARK_SIZE", 300))
+TITLE = "iPhone case"
+
+
+def count_queries(func):
+    """Run ``func`` and count its queries (CaptureQueriesContext keeps at most 9000)."""
+    count = 0
+
+    def counter(execute, *args):
+        nonlocal count
+        count += 1
+        return execute(*args)
+
+    with connection.execute_wrapper(counter):
+        result = func()
+    return result, count
+
+
+def legacy_slug(title):
+    """The per-row probing loop Product.save used before catalog.slugs."""
+    base_slug = slugify(title)
+    slug = base_slug
+    suffix = 1
+    while Product.objects.filter(slug=slug).exists():
+        slug = f"{base_slug}-{suffix}"
+        suffix += 1
+    return slug
+
+
+@pytest.mark.django_db
+class TestSlugAllocationBenchmark:
+    @pytest.fixture
+    def category(self):
+        return Category.objects.create(name="Accessories")
+
+    def test_save_allocates_in_constant_queries(self, category):
+        started = time.perf_counter()
+        for _ in range(SIZE - 1):
+            Product.objects.create(title=TITLE, price=5, category=category)
+        elapsed = time.perf_counter() - started
+
+        last, queries = count_queries(
+            lambda: Product.objects.create(title=TITLE, price=5, category=category)
+        )
+        legacy_started = time.perf_counter()
+        legacy, legacy_queries = count_queries(lambda: legacy_slug(TITLE))
+        legacy_elapsed = time.perf_counter() - legacy_started
+
+        assert last.slug == f"iphone-case-{SIZE - 1}"
+        assert legacy == f"iphone-case-{SIZE}"
+        # slug allocation, insert, and the savepoint pair around the insert
+        assert queries == 4
+        assert legacy_queries == SIZE + 1
+        print(
+            f"\n{SIZE} saves: {elapsed:.2f}s ({SIZE / elapsed:.0f}/s); "
+            f"queries for insert #{SIZE}: {queries} (legacy probing loop: "
+            f"{legacy_queries} queries, {legacy_elapsed:.2f}s for one slug)"
+        )
+
+    def test_batch_allocation(self, category):
+        started = time.perf_counter()
+        new_slugs = allocate_slugs(Product, [TITLE] * SIZE)
+        Product.objects.bulk_create(
+            [Product(title=TITLE, slug=slug, price=5, category=category) for slug in new_slugs],
+            batch_size=1000,
+        )
+        elapsed = time.perf_counter() - started
+
+        assert Product.objects.values("slug").distinct().count() == SIZE
+        print(f"\n{SIZE} products with batch allocation + bulk_create: {elapsed:.2f}s")
@@ -0,0 +1,99 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from catalog import slugs
+from catalog.models import Category, Product
+from catalog.slugs import allocate_slugs
+
+
+@pytest.mark.django_db
+class TestAllocateSlugs:
+    def test_continues_after_highest_suffix(self, product_factory):
+        product_factory(title="Blue Shirt")  # takes "blue-shirt"
+        product_factory(title="Blue Shirt", slug="blue-shirt-2")
+        product_factory(title="Blue Shirt Pro", slug="blue-shirt-pro")
+
+        result = allocate_slugs(Product, ["Blue Shirt", "Blue shirt", "Red Shirt"])
+
+        assert result == ["blue-shirt-3", "blue-shirt-4", "red-shirt"]
+
+    def test_batch_uses_one_query(self, db):
+        with CaptureQueriesContext(connection) as ctx:
+            result = allocate_slugs(Product, ["Case", "Case", "Cover", "Case"])
+
+        assert result == ["case", "case-1", "cover", "case-2"]
+        assert len(ctx.captured_queries) == 1
+
+    def test_reserved_slugs_are_skipped(self, db):
+        result = allocate_slugs(Product, ["Case", "Case"], reserved={"case", "case-1"})
+
+        assert result == ["case-2", "case-3"]
+
+    def test_long_titles_leave_room_for_suffix(self, db):
+        result = allocate_slugs(Product, ["x" * 80, "x" * 80])
+
+        assert result[1] == f"{result[0]}-1"
+        assert all(len(slug) <= 50 for slug in result)
+
+
+@pytest.mark.django_db
+class TestModelSlugs:
+    def test_duplicate_product_titles_get_suffixes(self, product_factory):
+        first = product_factory(title="iPhone case")
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = Product.objects.create(
+                title="iPhone case", price=5, category=first.category
+            )
+
+        assert (first.slug, second.slug) == ("iphone-case", "iphone-case-1")
+        # slug allocation, insert, and the savepoint pair around the insert
+        assert len(ctx.captured_queries) == 4
+
+    def test_blank_slug_on_resave_can_keep_own_slug(self, product_factory):
+        product = product_factory(title="Lamp")
+
+        product.slug = ""
+        product.save()
+
+        assert product.slug == "lamp"
+
+    def test_category_slugs_are_unique(self, db):
+        Category.objects.create(name="Shoes")
+        other = Category.objects.create(name="Shoes!")
+
+        assert other.slug == "shoes-1"
+
+    def test_retries_when_slug_is_claimed_concurrently(
+        self, product_factory, monkeypatch
+    ):
+        taken = product_factory(title="Mug")
+        real_allocate = slugs.allocate_slugs
+        calls = []
+
+        def stale_allocate(*args, **kwargs):
+            # First call behaves as if "mug" were still free.
+            calls.append(args)
+            return ["mug"] if len(calls) == 1 else real_allocate(*args, **kwargs)
+
+        monkeypatch.setattr(slugs, "allocate_slugs", stale_allocate)
+
+        product = product_factory(title="Mug", category=taken.category)
+
+        assert product.slug == "mug-1"
+        assert len(calls) == 2
+
+    def test_other_integrity_errors_are_not_retried(self, product_factory, monkeypatch):
+        product = product_factory(title="Mug")
+        calls = []
+        monkeypatch.setattr(
+            slugs, "allocate_slugs", lambda *a, **k: calls.append(a) or ["fresh"]
+        )
+
+        with pytest.raises(IntegrityError):
+            Product.objects.create(
+                title="Broken", price=1, stock_quantity=-1, category=product.category
+            )
+
+        assert len(calls) == 1
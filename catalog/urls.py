@@ -2,11 +2,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
-from .views import CategoryViewSet, ProductViewSet, ReviewViewSet
+from .views import CategoryViewSet, ProductImportViewSet, ProductViewSet, ReviewViewSet
 
 router = DefaultRouter()
 router.register(r"categories", CategoryViewSet, basename="category")
 router.register(r"products", ProductViewSet, basename="product")
+router.register(r"product-imports", ProductImportViewSet, basename="product-import")
 
 products_router = routers.NestedDefaultRouter(router, "products", lookup="product")
 products_router.register("reviews", ReviewViewSet, basename="product-reviews")
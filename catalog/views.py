@@ -3,31 +3,54 @@ import hashlib
 from datetime import datetime, timezone as dt_timezone
 
 from django.core.cache import cache
-from django.db import models
-from django.db.models import Avg, Count, Max, Value
-from django.db.models.functions import Coalesce
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.http import http_date, parse_http_date
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
-from rest_framework import permissions, status, viewsets
+from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from catalog.cache_utils import (
+    PRODUCT_DETAIL_KEY,
+    build_product_list_key,
+    canonical_query_key,
+    get_or_compute,
+    invalidate_product_cache,
+)
 
-from catalog.cache_utils import invalidate_product_cache
+from orders.reservations import get_ledger, reservations_enabled
 
-from .filters import ProductFilter
-from .models import Category, Product, Review
+from .filters import ProductFilter, ProductSearchFilter
+from .models import Category, Product, ProductImport, Review
+from .pagination import ProductKeysetPagination
 from .permissions import IsReviewOwnerOrAdmin, IsSellerOrAdmin
 from .serializers import (
     CategorySerializer,
+    ProductImportSerializer,
+    ProductReadSerializer,
     ProductSerializer,
     ReviewSerializer,
+    children_by_parent,
 )
+from .tasks import import_products
+
+STALE_WARNING = '110 - "Response is Stale"'
+
+
+def mark_stale(response):
+    """Flag a response served from an expired cache entry."""
+    response["Warning"] = STALE_WARNING
+    return response
 
 
 @extend_schema(
@@ -103,19 +126,18 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         cache_key = f"categories_list_{request.query_params.get('include_children', '0')}"
-        data = cache.get(cache_key)
-
-        if not data:
-            queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(
-                queryset,
-                many=True,
-                context=self.get_serializer_context()
-            )
-            data = serializer.data
-            cache.set(cache_key, data, timeout=60*60)
 
-        return Response(data)
+        def compute():
+            queryset = list(self.filter_queryset(self.get_queryset()))
+            context = self.get_serializer_context()
+            # Every active category is already loaded; nest them without more queries.
+            context["category_children"] = children_by_parent(queryset)
+            serializer = self.get_serializer(queryset, many=True, context=context)
+            return serializer.data
+
+        data, is_stale = get_or_compute(cache_key, compute, timeout=60*60)
+        response = Response(data)
+        return mark_stale(response) if is_stale else response
 
 
     def perform_create(self, serializer):
@@ -126,6 +148,8 @@ class CategoryViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         instance = serializer.save()
         self._invalidate_category_cache(category_id=instance.id)
+        # Moving a category changes which products its ancestors' filters match.
+        invalidate_product_cache()
         return instance
 
     def retrieve(self, request, *args, **kwargs):
@@ -133,14 +157,14 @@ class CategoryViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         include_children = request.query_params.get('include_children', '0')
         cache_key = f"category_{instance.id}_{include_children}"
-        data = cache.get(cache_key)
 
-        if not data:
+        def compute():
             serializer = self.get_serializer(instance, context=self.get_serializer_context())
-            data = serializer.data
-            cache.set(cache_key, data, timeout=60*60)
+            return serializer.data
 
-        return Response(data)
+        data, is_stale = get_or_compute(cache_key, compute, timeout=60*60)
+        response = Response(data)
+        return mark_stale(response) if is_stale else response
 
     def perform_destroy(self, instance):
         instance.is_active = False
@@ -155,48 +179,79 @@ class ProductViewSet(viewsets.ModelViewSet):
     """
 
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, OrderingFilter]
     filterset_class = ProductFilter
-    search_fields = ["title", "description", "slug"]
+    search_fields = ["title", "description"]
     ordering_fields = ["price", "title", "created_at", "updated_at"]
+    sort_fields = {"price", "title", "created_at", "updated_at"}
     cache_timeout = 300  # seconds
 
     def get_queryset(self):
-        return (
-            Product.objects.filter(is_active=True)
-            .select_related("category", "seller")
-            .annotate(
-                rating_avg=Coalesce(
-                    Avg("reviews__rating"),
-                    Value(0.0),
-                ),
-                review_count=Coalesce(
-                    Count("reviews"),
-                    Value(0, output_field=models.IntegerField()),
-                ),
-            )
-        )
+        # rating_avg/review_count come from the denormalized counters on
+        # Product, so no join against reviews is needed here.
+        queryset = Product.objects.filter(is_active=True)
+        if self.action in ("list", "retrieve"):
+            # ProductReadSerializer only needs the product's own columns.
+            return queryset.only(*ProductReadSerializer.columns)
+        return queryset.select_related("category", "seller")
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
             return [IsSellerOrAdmin()]
         return [permissions.AllowAny()]
 
+    def get_serializer_context(self):
+        """Lists link thumbnails; single-product responses link large images."""
+        context = super().get_serializer_context()
+        context["image_size"] = "thumbnail" if self.action == "list" else "large"
+        return context
+
+    @property
+    def paginator(self):
+        """Use keyset pagination for list requests that opt in with ?pagination=cursor."""
+        if not hasattr(self, "_paginator") and self.action == "list":
+            if ProductKeysetPagination.is_requested(self.request):
+                self._paginator = ProductKeysetPagination()
+        return super().paginator
+
+    def get_sort_field(self):
+        """Return the validated ``sort`` value (e.g. ``-price``) or None."""
+        sort_value = self.request.query_params.get("sort", "").strip().lower()
+        if sort_value.lstrip("-") in self.sort_fields:
+            return sort_value
+        return None
+
     def filter_queryset(self, queryset):
         queryset = super().filter_queryset(queryset)
-        sort_value = self.request.query_params.get("sort")
+        sort_value = self.get_sort_field()
         if sort_value:
-            allowed_fields = {"price", "title", "created_at", "updated_at"}
-            normalized = sort_value.lstrip("-")
-            if normalized in allowed_fields:
-                queryset = queryset.order_by(sort_value)
+            queryset = queryset.order_by(sort_value)
         return queryset
 
     def _build_list_cache_key(self, request):
-        return f"products:list:{request.get_full_path()}"
+        """
+        Key list responses on the query parameters that can change them, so
+        reordered, empty or tracking (utm_*) parameters reuse one entry.
+        """
+        page_param = getattr(self.paginator, "page_query_param", "page")
+        allowed = set(self.filterset_class.base_filters) | {
+            page_param,
+            ProductKeysetPagination.mode_query_param,
+            ProductKeysetPagination.cursor_query_param,
+            "sort",
+            api_settings.ORDERING_PARAM,
+            api_settings.SEARCH_PARAM,
+        }
+        digest = canonical_query_key(
+            request.query_params,
+            allowed,
+            lowercase={"sort", ProductKeysetPagination.mode_query_param},
+            defaults={page_param: "1"},
+        )
+        return build_product_list_key(f"{request.path}:{digest}")
 
     def _build_detail_cache_key(self, pk):
-        return f"products:detail:{pk}"
+        return PRODUCT_DETAIL_KEY.format(product_id=pk)
 
     def _build_etag(self, cache_key, last_modified):
         sig = f"{cache_key}:{last_modified.isoformat() if last_modified else '0'}"
@@ -236,6 +291,48 @@ class ProductViewSet(viewsets.ModelViewSet):
         if last_modified:
             response["Last-Modified"] = http_date(last_modified.timestamp())
 
+    def _build_list_entry(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        last_modified = queryset.aggregate(last=Max("updated_at"))["last"]
+        page = self.paginate_queryset(queryset)
+        serializer = ProductReadSerializer(
+            page if page is not None else queryset,
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        if page is not None:
+            paginated = self.get_paginated_response(serializer.data)
+            data = paginated.data
+        else:
+            data = serializer.data
+        return {
+            "payload": data,
+            "last_modified": self._serialize_last_modified(last_modified),
+        }
+
+    def _build_detail_entry(self):
+        product = self.get_object()
+        serializer = ProductReadSerializer(product, context=self.get_serializer_context())
+        return {
+            "payload": serializer.data,
+            "last_modified": self._serialize_last_modified(product.updated_at),
+        }
+
+    def _cached_response(self, request, cache_key, compute):
+        cached_entry, is_stale = get_or_compute(
+            cache_key, compute, timeout=self.cache_timeout
+        )
+        data = cached_entry.get("payload")
+        last_modified = self._parse_last_modified(cached_entry.get("last_modified"))
+
+        etag = self._build_etag(cache_key, last_modified)
+        if self._should_return_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        self._attach_cache_headers(response, etag, last_modified)
+        return mark_stale(response) if is_stale else response
+
     @extend_schema(
         summary="List products",
         description="Returns a paginated list of active products with filtering, searching, and sorting capabilities. Supports conditional requests with ETag and Last-Modified headers.",
@@ -247,6 +344,20 @@ class ProductViewSet(viewsets.ModelViewSet):
                 location=OpenApiParameter.QUERY,
                 description="Page number for pagination",
             ),
+            OpenApiParameter(
+                name="pagination",
+                type=OpenApiTypes.STR,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Set to 'cursor' for keyset pagination: no total count, follow 'next' links for stable deep paging",
+            ),
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.STR,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Opaque cursor from a previous 'next' link (with pagination=cursor)",
+            ),
             OpenApiParameter(
                 name="category",
                 type=OpenApiTypes.INT,
@@ -294,70 +405,16 @@ class ProductViewSet(viewsets.ModelViewSet):
     )
     def list(self, request, *args, **kwargs):
         cache_key = self._build_list_cache_key(request)
-        cached_entry = cache.get(cache_key)
-
-        if cached_entry:
-            data = cached_entry.get("payload")
-            last_modified = self._parse_last_modified(cached_entry.get("last_modified"))
-        else:
-            queryset = self.filter_queryset(self.get_queryset())
-            last_modified = queryset.aggregate(last=Max("updated_at"))["last"]
-            page = self.paginate_queryset(queryset)
-            serializer = self.get_serializer(
-                page if page is not None else queryset, many=True
-            )
-            if page is not None:
-                paginated = self.get_paginated_response(serializer.data)
-                data = paginated.data
-            else:
-                data = serializer.data
-            cache.set(
-                cache_key,
-                {
-                    "payload": data,
-                    "last_modified": self._serialize_last_modified(last_modified),
-                },
-                timeout=self.cache_timeout,
-            )
-
-        etag = self._build_etag(cache_key, last_modified)
-        if self._should_return_not_modified(request, etag, last_modified):
-            response = Response(status=status.HTTP_304_NOT_MODIFIED)
-        else:
-            response = Response(data)
-        self._attach_cache_headers(response, etag, last_modified)
-        return response
+        return self._cached_response(request, cache_key, self._build_list_entry)
 
     def retrieve(self, request, *args, **kwargs):
-        product = self.get_object()
-        cache_key = self._build_detail_cache_key(product.pk)
-        cached_entry = cache.get(cache_key)
-
-        if cached_entry:
-            data = cached_entry.get("payload")
-            last_modified = self._parse_last_modified(cached_entry.get("last_modified"))
-        else:
-            serializer = self.get_serializer(product)
-            data = serializer.data
-            last_modified = product.updated_at
-            cache.set(
-                cache_key,
-                {
-                    "payload": data,
-                    "last_modified": self._serialize_last_modified(last_modified),
-                },
-                timeout=self.cache_timeout,
-            )
-
-        etag = self._build_etag(cache_key, last_modified or product.updated_at)
-        if self._should_return_not_modified(
-            request, etag, last_modified or product.updated_at
-        ):
-            response = Response(status=status.HTTP_304_NOT_MODIFIED)
-        else:
-            response = Response(data)
-        self._attach_cache_headers(response, etag, last_modified or product.updated_at)
-        return response
+        # Key on the URL pk so cache hits skip the product query entirely.
+        try:
+            pk = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except (TypeError, ValueError):
+            raise Http404
+        cache_key = self._build_detail_cache_key(pk)
+        return self._cached_response(request, cache_key, self._build_detail_entry)
 
     @extend_schema(
         summary="Create a product",
@@ -395,7 +452,11 @@ class ProductViewSet(viewsets.ModelViewSet):
         return super().partial_update(request, *args, **kwargs)
 
     def perform_update(self, serializer):
+        old_stock = serializer.instance.stock_quantity
         instance = serializer.save()
+        if reservations_enabled():
+            # Keep the Redis reservation counter in step with restocks
+            get_ledger().adjust(instance.pk, instance.stock_quantity - old_stock)
         invalidate_product_cache(instance.pk)
         return instance
 
@@ -435,28 +496,85 @@ class ReviewViewSet(viewsets.ModelViewSet):
         if Review.objects.filter(product=product, user=self.request.user).exists():
             raise ValidationError("You have already reviewed this product.")
 
-        review = serializer.save(
-            user=self.request.user,
-            product=product,
-        )
+        with transaction.atomic():
+            review = serializer.save(
+                user=self.request.user,
+                product=product,
+            )
 
-        # Update product statistics
-        self._handle_product_side_effects(product)
+            # Update product statistics
+            self._update_product_rating(
+                product.pk, rating_delta=review.rating, count_delta=1
+            )
+        invalidate_product_cache(product.pk)
 
         return review
 
     def perform_update(self, serializer):
-        review = serializer.save()
-        self._handle_product_side_effects(review.product)
+        old_rating = serializer.instance.rating
+        with transaction.atomic():
+            review = serializer.save()
+            self._update_product_rating(
+                review.product_id, rating_delta=review.rating - old_rating
+            )
+        invalidate_product_cache(review.product_id)
 
     def perform_destroy(self, instance):
-        product = instance.product
-        instance.delete()
-        self._handle_product_side_effects(product)
+        with transaction.atomic():
+            instance.delete()
+            self._update_product_rating(
+                instance.product_id, rating_delta=-instance.rating, count_delta=-1
+            )
+        invalidate_product_cache(instance.product_id)
 
-    def _handle_product_side_effects(self, product):
+    def _update_product_rating(self, product_id, rating_delta=0, count_delta=0):
         """
-        Ensure product caches stay in sync whenever related reviews change.
+        Apply a review change to the product's rating counters with
+        F-expressions, so concurrent review writes cannot lose updates.
         """
-        Product.objects.filter(pk=product.pk).update(updated_at=timezone.now())
-        invalidate_product_cache(product.pk)
+        # Clamp at zero so drifted counters (see reconcile_product_ratings)
+        # cannot make a review delete fail.
+        Product.objects.filter(pk=product_id).update(
+            rating_sum=Greatest(F("rating_sum") + rating_delta, 0),
+            review_count=Greatest(F("review_count") + count_delta, 0),
+            updated_at=timezone.now(),
+        )
+
+
+@extend_schema(tags=["Catalog"])
+class ProductImportViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    POST /api/catalog/product-imports/ -> upload a CSV/JSONL file, imported in the background
+    GET /api/catalog/product-imports/{id}/ -> import progress and per-row errors
+    """
+    serializer_class = ProductImportSerializer
+    permission_classes = [IsSellerOrAdmin]
+
+    def get_queryset(self):
+        queryset = ProductImport.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(seller=self.request.user)
+        return queryset
+
+    @extend_schema(
+        summary="Bulk import products",
+        description=(
+            "Upload a CSV or JSON Lines file of products (multipart/form-data). Columns: title, price, "
+            "category (id or slug), and optionally description, stock_quantity, is_active and slug. "
+            "Rows whose slug matches one of your products update it; other rows create products. "
+            "The import runs in the background; poll the returned import for progress and row errors."
+        ),
+        request=ProductImportSerializer,
+        responses={202: ProductImportSerializer},
+    )
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save(seller=request.user)
+        transaction.on_commit(lambda: import_products.delay(job.pk))
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
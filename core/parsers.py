@@ -0,0 +1,28 @@
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+UTF8_NAMES = {"utf-8", "utf8"}
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser backed by orjson. orjson only reads UTF-8 and always rejects
+    NaN and Infinity, so other charsets and STRICT_JSON = False use the
+    stdlib parser.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not self.strict or encoding.lower().replace("_", "-") not in UTF8_NAMES:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
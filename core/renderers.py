@@ -0,0 +1,46 @@
+"""
+JSON rendering with orjson.
+
+Output matches DRF's JSONRenderer with the default UNICODE_JSON/COMPACT_JSON
+settings, except for floats:
+
+- NaN and infinities render as ``null``. JSONRenderer refuses them under
+  STRICT_JSON.
+- Floats written with an exponent have no zero padding (``1.5e-7`` instead
+  of ``1.5e-07``). Between 1e-5 and 1e-4 they are written out in full
+  (``0.00001`` instead of ``1e-05``). Both parse back to the same value.
+
+Values orjson does not encode the same way (datetimes, dates and times,
+Decimals, lazy strings, querysets...) are handed to DRF's own encoder. Data
+orjson refuses to encode, such as integers beyond 64 bits, is rendered by
+JSONRenderer. So is indented output, as requested by the browsable API or an
+``indent`` media type parameter.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+# Datetimes go through DRF's encoder so UTC keeps its "Z" suffix.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# Escaped by JSONRenderer so the output stays a strict JavaScript subset.
+LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        for raw, escaped in LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
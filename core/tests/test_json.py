@@ -0,0 +1,118 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+UTC = datetime.timezone.utc
+
+
+def payload():
+    return {
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "total": Decimal("1999.90"),
+        "price": "10.50",
+        "created_at": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=UTC),
+        "paid_at": datetime.datetime(2024, 5, 1, 15, 30, tzinfo=ZoneInfo("Africa/Addis_Ababa")),
+        "naive": datetime.datetime(2024, 5, 1, 12, 30),
+        "date": datetime.date(2024, 5, 1),
+        "time": datetime.time(9, 15, 30, 250),
+        "duration": datetime.timedelta(minutes=90),
+        "message": gettext_lazy("This field is required."),
+        "title": "Café ☕     \"quoted\"",
+        "counts": {1: "one", 2: "two"},
+        "results": ReturnList([ReturnDict({"a": 1, "b": None}, serializer=None)], serializer=None),
+        "tags": ("a", "b"),
+        "ratio": 0.1,
+        "flag": True,
+    }
+
+
+class TestORJSONRenderer:
+    def test_output_matches_json_renderer(self):
+        expected = JSONRenderer().render(payload())
+        assert ORJSONRenderer().render(payload()) == expected
+
+    def test_none_renders_empty(self):
+        assert ORJSONRenderer().render(None) == b""
+
+    @pytest.mark.parametrize(
+        "media_type, context",
+        [("application/json; indent=4", {}), ("application/json", {"indent": 2})],
+    )
+    def test_indent_falls_back_to_json_renderer(self, media_type, context):
+        expected = JSONRenderer().render(payload(), media_type, context)
+        assert ORJSONRenderer().render(payload(), media_type, context) == expected
+
+    def test_unsupported_values_raise_type_error(self):
+        with pytest.raises(TypeError):
+            ORJSONRenderer().render({"value": object()})
+
+    @pytest.mark.parametrize("value", [2**64, -(2**63) - 1])
+    def test_integers_beyond_64_bits_fall_back_to_json_renderer(self, value):
+        expected = JSONRenderer().render({"value": value})
+        assert ORJSONRenderer().render({"value": value}) == expected
+
+    @pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+    def test_non_finite_floats_render_as_null(self, value):
+        # JSONRenderer raises ValueError for these under STRICT_JSON.
+        with pytest.raises(ValueError):
+            JSONRenderer().render({"value": value})
+        assert ORJSONRenderer().render({"value": value}) == b'{"value":null}'
+
+    @pytest.mark.parametrize(
+        "value, rendered, stdlib",
+        [(1.5e-7, b"1.5e-7", b"1.5e-07"), (1e-5, b"0.00001", b"1e-05")],
+    )
+    def test_small_floats_are_formatted_differently(self, value, rendered, stdlib):
+        assert JSONRenderer().render({"value": value}) == b'{"value":' + stdlib + b"}"
+        ret = ORJSONRenderer().render({"value": value})
+        assert ret == b'{"value":' + rendered + b"}"
+        assert ORJSONParser().parse(io.BytesIO(ret)) == {"value": value}
+
+
+class TestORJSONParser:
+    def parse(self, body, parser_class=ORJSONParser, **context):
+        return parser_class().parse(io.BytesIO(body), "application/json", context)
+
+    def test_output_matches_json_parser(self):
+        body = '{"title": "Café", "price": 10.5, "items": [1, null, true], "n": 12}'.encode()
+        assert self.parse(body) == self.parse(body, JSONParser)
+
+    @pytest.mark.parametrize("body", [b"", b"{", b'{"price": NaN}'])
+    def test_invalid_json_raises_parse_error(self, body):
+        with pytest.raises(ParseError, match="JSON parse error"):
+            self.parse(body)
+
+    def test_other_encodings_use_json_parser(self):
+        body = '{"title": "Café"}'.encode("utf-16")
+        assert self.parse(body, encoding="utf-16") == {"title": "Café"}
+
+
+@pytest.mark.django_db
+def test_api_round_trip(client):
+    response = client.get("/api/catalog/categories/")
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
+    assert response.content == JSONRenderer().render(response.data)
+
+    response = client.post("/api/auth/jwt/create/", data=b"{bad", content_type="application/json")
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("JSON parse error")
+
+    response = client.post(
+        "/api/auth/jwt/create/",
+        data=b'{"email": "nobody@example.com", "password": "wrong"}',
+        content_type="application/json",
+    )
+    assert response.status_code == 401
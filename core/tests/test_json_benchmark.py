@@ -0,0 +1,92 @@
+"""
+Render benchmark: ORJSONRenderer against DRF's JSONRenderer.
+
+Run with ``-s`` to see the numbers. Payloads mirror a product list page (what
+serializers return: strings for prices and dates) and an order export that
+still carries raw Decimals, UUIDs and datetimes.
+"""
+import datetime
+import time
+import uuid
+from decimal import Decimal
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import ORJSONRenderer
+
+ROUNDS = 5
+NOW = datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+
+
+def product_page(size):
+    return {
+        "count": size,
+        "next": None,
+        "previous": None,
+        "results": [
+            {
+                "id": idx,
+                "title": f"Product {idx}",
+                "slug": f"product-{idx}",
+                "description": "A product used to benchmark rendering. " * 4,
+                "price": "19.99",
+                "stock_quantity": idx,
+                "category": 3,
+                "seller": 7,
+                "images_urls": [f"http://testserver/media/products/{idx}/1_thumbnail.webp"],
+                "rating_avg": 4.5,
+                "review_count": 12,
+                "is_active": True,
+                "created_at": "2024-05-01T12:30:15.123456Z",
+                "updated_at": "2024-05-01T12:30:15.123456Z",
+            }
+            for idx in range(size)
+        ],
+    }
+
+
+def order_export(size):
+    return [
+        {
+            "id": idx,
+            "total": Decimal("1999.90"),
+            "status": "paid",
+            "payment_id": uuid.uuid4(),
+            "created_at": NOW,
+            "items": [
+                {"product": 1, "quantity": 2, "unit_price": Decimal("999.95")},
+            ],
+        }
+        for idx in range(size)
+    ]
+
+
+def best_time(renderer, data):
+    best = None
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        output = renderer.render(data)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+@pytest.mark.parametrize(
+    "name, data",
+    [
+        ("product page, 100 items", product_page(100)),
+        ("product page, 1000 items", product_page(1000)),
+        ("order export, 1000 orders", order_export(1000)),
+    ],
+)
+def test_render_benchmark(name, data):
+    stdlib_time, expected = best_time(JSONRenderer(), data)
+    orjson_time, output = best_time(ORJSONRenderer(), data)
+
+    assert output == expected
+    assert orjson_time < stdlib_time
+    print(
+        f"\n{name}: JSONRenderer {stdlib_time * 1e3:.2f}ms, "
+        f"ORJSONRenderer {orjson_time * 1e3:.2f}ms ({stdlib_time / orjson_time:.1f}x)"
+    )
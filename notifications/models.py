@@ -29,6 +29,7 @@ class Notification(models.Model):
         related_name="notifications",
         null=True,
         blank=True,
+        db_index=False,  # covered by notification_user_created
     )
 
     type = models.CharField(max_length=20, choices=TYPE_CHOICES, default=TYPE_EMAIL)
@@ -42,6 +43,9 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="notification_user_created"),
+        ]
 
     def __str__(self):
         return f"{self.type.upper()} -> {self.user.email if self.user else 'SYSTEM'}"
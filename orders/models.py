@@ -4,6 +4,17 @@ from django.db import models
 from django.utils import timezone
 
 
+class OrderQuerySet(models.QuerySet):
+    def with_details(self):
+        """
+        Orders ready for OrderSerializer: the payment is joined in and the
+        items come from one prefetch query, whatever the number of orders.
+        """
+        return self.select_related("payment").prefetch_related(
+            models.Prefetch("items", queryset=OrderItem.objects.order_by("pk"))
+        )
+
+
 class Order(models.Model):
     STATUS_PENDING = "pending"
     STATUS_CONFIRMED = "confirmed"
@@ -27,7 +38,10 @@ class Order(models.Model):
         (PAYMENT_FAILED, "Failed"),
     ]
 
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="orders")
+    # Indexed by order_user_created below, which also serves FK lookups.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="orders", db_index=False
+    )
     status = models.CharField(max_length=32, choices=STATUS_CHOICES, default=STATUS_PENDING)
     payment_status = models.CharField(max_length=32, choices=PAYMENT_STATUS_CHOICES, default=PAYMENT_PENDING)
     payment_method = models.CharField(max_length=64, blank=True, null=True)  # snapshot of chosen method (e.g. 'chapa')
@@ -45,15 +59,29 @@ class Order(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # A user's order history, newest first
+            models.Index(fields=["user", "-created_at"], name="order_user_created"),
+            # Admin filters and status sweeps
+            models.Index(fields=["status", "-created_at"], name="order_status_created"),
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(payment_status="pending"),
+                name="order_payment_pending",
+            ),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.user}"
 
 
 class OrderItem(models.Model):
-    order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE)
+    # Indexed by orderitem_order_covering below.
+    order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE, db_index=False)
     # keep a snapshot of product details
     product_id = models.IntegerField(null=True, blank=True)  # product PK (catalog.Product) for reference
     product_title = models.CharField(max_length=255)
@@ -61,6 +89,14 @@ class OrderItem(models.Model):
     quantity = models.PositiveIntegerField()
     line_total = models.DecimalField(max_digits=12, decimal_places=2)
 
+    class Meta:
+        indexes = [
+            # Carries what stock reservations read per order, for index-only scans.
+            models.Index(
+                fields=["order"], include=["product_id", "quantity"], name="orderitem_order_covering"
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         # ensure line_total consistent
         self.line_total = (self.unit_price * self.quantity).quantize(Decimal('0.01'))
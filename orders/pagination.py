@@ -0,0 +1,12 @@
+"""
+Keyset (cursor) pagination for order history.
+
+Opt in with ``?pagination=cursor``. Orders come newest first, ordered by
+``(created_at, id)``, which the ``order_user_created`` index serves for one
+user's history. Pages follow ``next`` links and no COUNT(*) is run.
+"""
+from core.pagination import KeysetPagination
+
+
+class OrderHistoryPagination(KeysetPagination):
+    default_ordering = "-created_at"
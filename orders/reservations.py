@@ -0,0 +1,214 @@
+"""
+Redis-backed stock reservation ledger for high-contention checkouts.
+
+When STOCK_RESERVATIONS_ENABLED is set, checkout reserves stock here instead
+of locking ``catalog.Product`` rows:
+
+- ``stock:available:<product_id>`` counts units that can still be reserved.
+  It is seeded from ``Product.stock_quantity`` the first time a product is
+  reserved and never expires.
+- ``stock:hold:<order_id>`` holds the units an unpaid order reserved. Holds
+  older than STOCK_RESERVATION_TTL seconds are returned to the available
+  counters by the ``release_expired_stock_holds`` task.
+- When the order is paid, its hold moves to the ``stock:committed`` hash, and
+  ``flush_committed_stock`` applies the totals to the database in batches.
+
+Every step runs as a Lua script, so each one is atomic in Redis.
+"""
+import time
+
+import redis
+from django.conf import settings
+
+AVAILABLE_KEY_PREFIX = "stock:available:"
+HOLD_KEY = "stock:hold:{order_id}"
+COMMITTED_MARKER_KEY = "stock:committed:{order_id}"
+HOLDS_KEY = "stock:holds"
+COMMITTED_KEY = "stock:committed"
+FLUSHING_KEY = "stock:committed:flushing"
+
+# Keep commit markers long enough to absorb late webhook retries.
+COMMITTED_MARKER_TTL = 7 * 24 * 60 * 60
+
+COMMIT_OK = "committed"
+COMMIT_DUPLICATE = "duplicate"
+COMMIT_NO_HOLD = "no_hold"
+
+# KEYS: hold, holds zset, available counters...
+# ARGV: order id, expires at, then (product id, quantity, seed stock) per counter
+RESERVE_SCRIPT = """
+local n = #KEYS - 2
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+for i = 1, n do
+    local base = 2 + (i - 1) * 3
+    redis.call('SET', KEYS[i + 2], ARGV[base + 3], 'NX')
+    if tonumber(redis.call('GET', KEYS[i + 2])) < tonumber(ARGV[base + 2]) then
+        return i
+    end
+end
+for i = 1, n do
+    local base = 2 + (i - 1) * 3
+    redis.call('DECRBY', KEYS[i + 2], ARGV[base + 2])
+    redis.call('HSET', KEYS[1], ARGV[base + 1], ARGV[base + 2])
+end
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+return 0
+"""
+
+# KEYS: hold, holds zset, committed hash, commit marker
+# ARGV: order id, marker ttl, then (product id, quantity) pairs used when the
+#       hold is already gone (expired and released before payment arrived)
+COMMIT_SCRIPT = """
+if redis.call('EXISTS', KEYS[4]) == 1 then
+    return 2
+end
+local held = redis.call('HGETALL', KEYS[1])
+local status = 1
+if #held == 0 then
+    status = 0
+    for i = 3, #ARGV, 2 do
+        local available = '""" + AVAILABLE_KEY_PREFIX + """' .. ARGV[i]
+        if redis.call('EXISTS', available) == 1 then
+            redis.call('DECRBY', available, ARGV[i + 1])
+        end
+        table.insert(held, ARGV[i])
+        table.insert(held, ARGV[i + 1])
+    end
+end
+for i = 1, #held, 2 do
+    redis.call('HINCRBY', KEYS[3], held[i], held[i + 1])
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('SET', KEYS[4], 1, 'EX', ARGV[2])
+return status
+"""
+
+# KEYS: hold, holds zset
+# ARGV: order id
+RELEASE_SCRIPT = """
+local held = redis.call('HGETALL', KEYS[1])
+for i = 1, #held, 2 do
+    local available = '""" + AVAILABLE_KEY_PREFIX + """' .. held[i]
+    if redis.call('EXISTS', available) == 1 then
+        redis.call('INCRBY', available, held[i + 1])
+    end
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return #held / 2
+"""
+
+# KEYS: committed hash, flushing hash
+# Resumes an unacknowledged flush before taking new commits.
+TAKE_COMMITTED_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 and redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+end
+return redis.call('HGETALL', KEYS[2])
+"""
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id):
+        super().__init__(f"Insufficient stock for product {product_id}.")
+        self.product_id = product_id
+
+
+class StockLedger:
+    def __init__(self, client, hold_ttl=None):
+        self.client = client
+        self.hold_ttl = hold_ttl or settings.STOCK_RESERVATION_TTL
+        self._reserve = client.register_script(RESERVE_SCRIPT)
+        self._commit = client.register_script(COMMIT_SCRIPT)
+        self._release = client.register_script(RELEASE_SCRIPT)
+        self._take_committed = client.register_script(TAKE_COMMITTED_SCRIPT)
+
+    def available(self, product_id):
+        value = self.client.get(f"{AVAILABLE_KEY_PREFIX}{product_id}")
+        return None if value is None else int(value)
+
+    def reserve(self, order_id, quantities, stock_levels):
+        """
+        Hold ``{product_id: quantity}`` for ``order_id``, all or nothing.
+
+        ``stock_levels`` maps product ids to their database stock and is only
+        used to seed counters that do not exist yet. Raises InsufficientStock
+        naming the first product that cannot be covered.
+        """
+        product_ids = sorted(quantities)
+        keys = [HOLD_KEY.format(order_id=order_id), HOLDS_KEY] + [
+            f"{AVAILABLE_KEY_PREFIX}{product_id}" for product_id in product_ids
+        ]
+        args = [order_id, time.time() + self.hold_ttl]
+        for product_id in product_ids:
+            args += [product_id, quantities[product_id], stock_levels[product_id]]
+
+        failed = self._reserve(keys=keys, args=args)
+        if failed:
+            raise InsufficientStock(product_ids[failed - 1])
+
+    def commit(self, order_id, quantities=None):
+        """
+        Move the order's hold to the committed totals awaiting a database flush.
+
+        If the hold already expired, ``quantities`` (the order's items) are
+        committed instead and taken from the available counters again.
+        """
+        args = [order_id, COMMITTED_MARKER_TTL]
+        for product_id, quantity in (quantities or {}).items():
+            args += [product_id, quantity]
+        status = self._commit(
+            keys=[
+                HOLD_KEY.format(order_id=order_id),
+                HOLDS_KEY,
+                COMMITTED_KEY,
+                COMMITTED_MARKER_KEY.format(order_id=order_id),
+            ],
+            args=args,
+        )
+        return {0: COMMIT_NO_HOLD, 1: COMMIT_OK, 2: COMMIT_DUPLICATE}[status]
+
+    def release(self, order_id):
+        """Return the order's held units to the available counters."""
+        return self._release(
+            keys=[HOLD_KEY.format(order_id=order_id), HOLDS_KEY], args=[order_id]
+        )
+
+    def expired_holds(self, now=None):
+        now = time.time() if now is None else now
+        return [
+            int(order_id)
+            for order_id in self.client.zrangebyscore(HOLDS_KEY, "-inf", now)
+        ]
+
+    def adjust(self, product_id, delta):
+        """Apply an out-of-band stock change (e.g. a restock) to a seeded counter."""
+        key = f"{AVAILABLE_KEY_PREFIX}{product_id}"
+        if delta and self.client.exists(key):
+            self.client.incrby(key, delta)
+
+    def take_committed(self):
+        """Return ``{product_id: quantity}`` committed since the last flush."""
+        raw = self._take_committed(keys=[COMMITTED_KEY, FLUSHING_KEY])
+        return {int(raw[i]): int(raw[i + 1]) for i in range(0, len(raw), 2)}
+
+    def ack_committed(self):
+        """Forget the totals returned by ``take_committed`` once they are flushed."""
+        self.client.delete(FLUSHING_KEY)
+
+
+_ledger = None
+
+
+def reservations_enabled():
+    return getattr(settings, "STOCK_RESERVATIONS_ENABLED", False)
+
+
+def get_ledger():
+    global _ledger
+    if _ledger is None:
+        _ledger = StockLedger(redis.Redis.from_url(settings.STOCK_RESERVATIONS_REDIS_URL))
+    return _ledger
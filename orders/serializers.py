@@ -1,6 +1,9 @@
 from decimal import Decimal
 from typing import Optional
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+
+from payments.models import Payment
 from .models import Order, OrderItem, OrderCancellationRequest
 
 
@@ -10,6 +13,13 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ["id", "product_id", "product_title", "unit_price", "quantity", "line_total"]
 
 
+class OrderPaymentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Payment
+        fields = ["id", "tx_ref", "status", "paid_at"]
+        read_only_fields = fields
+
+
 class ShippingAddressSerializer(serializers.Serializer):
     """User-friendly shipping address input"""
     address_line = serializers.CharField(max_length=255, required=True)
@@ -21,6 +31,7 @@ class ShippingAddressSerializer(serializers.Serializer):
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     shipping_address = serializers.SerializerMethodField()
+    payment = serializers.SerializerMethodField()
 
     class Meta:
         model = Order
@@ -33,10 +44,13 @@ class OrderSerializer(serializers.ModelSerializer):
             "shipping_address",
             "total",
             "items",
+            "payment",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "user", "status", "payment_status", "total", "items", "created_at", "updated_at"]
+        read_only_fields = [
+            "id", "user", "status", "payment_status", "total", "items", "payment", "created_at", "updated_at"
+        ]
 
     def get_shipping_address(self, obj) -> Optional[dict]:
         """Return shipping address as a user-friendly object"""
@@ -49,6 +63,14 @@ class OrderSerializer(serializers.ModelSerializer):
             }
         return None
 
+    @extend_schema_field(OrderPaymentSerializer(allow_null=True))
+    def get_payment(self, obj):
+        """The order's Chapa payment, or None before one is initiated."""
+        # Loaded by Order.objects.with_details(); a missing payment raises
+        # RelatedObjectDoesNotExist, which is an AttributeError.
+        payment = getattr(obj, "payment", None)
+        return OrderPaymentSerializer(payment).data if payment else None
+
 
 class OrderCreateSerializer(serializers.Serializer):
     """User-friendly order creation - accepts shipping address as object"""
@@ -0,0 +1,63 @@
+import logging
+
+from celery import shared_task
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+
+from catalog.cache_utils import invalidate_product_cache
+from catalog.models import Product
+
+from .reservations import get_ledger, reservations_enabled
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 500
+
+
+@shared_task
+def flush_committed_stock(batch_size=FLUSH_BATCH_SIZE):
+    """
+    Apply stock committed in the reservation ledger to Product.stock_quantity,
+    one UPDATE per ``batch_size`` products.
+    """
+    if not reservations_enabled():
+        return {"status": "disabled"}
+
+    ledger = get_ledger()
+    committed = ledger.take_committed()
+    if not committed:
+        return {"status": "ok", "products": 0}
+
+    product_ids = sorted(committed)
+    with transaction.atomic():
+        for start in range(0, len(product_ids), batch_size):
+            batch = product_ids[start:start + batch_size]
+            decrement = Case(
+                *[When(pk=pk, then=Value(committed[pk])) for pk in batch],
+                output_field=IntegerField(),
+            )
+            Product.objects.filter(pk__in=batch).update(
+                stock_quantity=Greatest(F("stock_quantity") - decrement, 0)
+            )
+    ledger.ack_committed()
+    invalidate_product_cache()
+
+    logger.info("Flushed committed stock for %s product(s).", len(product_ids))
+    return {"status": "ok", "products": len(product_ids)}
+
+
+@shared_task
+def release_expired_stock_holds():
+    """Return units held by orders that were not paid in time."""
+    if not reservations_enabled():
+        return {"status": "disabled"}
+
+    ledger = get_ledger()
+    expired = ledger.expired_holds()
+    for order_id in expired:
+        ledger.release(order_id)
+
+    if expired:
+        logger.info("Released %s expired stock hold(s).", len(expired))
+    return {"status": "ok", "released": len(expired)}
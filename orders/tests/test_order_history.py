@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.pagination import PageNumberPagination
+
+from orders.models import Order, OrderItem
+from orders.pagination import OrderHistoryPagination
+from payments.models import Payment
+
+ORDERS = 100
+ITEMS_PER_ORDER = 20
+
+
+@pytest.fixture
+def history(user):
+    """100 orders of 20 items; every other order has a payment."""
+    now = timezone.now()
+    orders = Order.objects.bulk_create(
+        [
+            # pairs share a timestamp so the cursor has to break ties on id
+            Order(user=user, payment_method="chapa", total=100, created_at=now - timedelta(minutes=idx // 2))
+            for idx in range(ORDERS)
+        ]
+    )
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(
+                order=order,
+                product_id=n,
+                product_title=f"Item {n}",
+                unit_price=5,
+                quantity=1,
+                line_total=5,
+            )
+            for order in orders
+            for n in range(ITEMS_PER_ORDER)
+        ]
+    )
+    Payment.objects.bulk_create(
+        [
+            Payment(order=order, tx_ref=f"tx-{order.pk}", amount=order.total, status=Payment.STATUS_COMPLETED)
+            for order in orders[::2]
+        ]
+    )
+    return orders
+
+
+def newest_first(orders):
+    return [order.pk for order in sorted(orders, key=lambda o: (o.created_at, o.pk), reverse=True)]
+
+
+@pytest.mark.django_db
+class TestOrderHistory:
+    def test_page_of_100_orders_is_three_queries(self, monkeypatch, authenticated_client, history):
+        monkeypatch.setattr(PageNumberPagination, "page_size", ORDERS)
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(reverse("orders:order-list"))
+
+        assert response.status_code == 200
+        # count, orders joined with payments, items
+        assert len(ctx.captured_queries) == 3
+        results = response.data["results"]
+        assert len(results) == ORDERS
+        assert all(len(order["items"]) == ITEMS_PER_ORDER for order in results)
+
+        paid = {order.pk for order in history[::2]}
+        for order in results:
+            if order["id"] in paid:
+                assert order["payment"]["status"] == Payment.STATUS_COMPLETED
+                assert order["payment"]["tx_ref"] == f"tx-{order['id']}"
+            else:
+                assert order["payment"] is None
+
+    def test_cursor_page_of_100_orders_is_two_queries(self, monkeypatch, authenticated_client, history):
+        monkeypatch.setattr(OrderHistoryPagination, "page_size", ORDERS)
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(reverse("orders:order-list"), {"pagination": "cursor"})
+
+        assert response.status_code == 200
+        assert len(ctx.captured_queries) == 2
+        assert [order["id"] for order in response.data["results"]] == newest_first(history)
+        assert response.data["next"] is None
+
+    def test_cursor_pages_cover_every_order_once(self, authenticated_client, history):
+        seen = []
+        url, params = reverse("orders:order-list"), {"pagination": "cursor"}
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = authenticated_client.get(url, params)
+            assert response.status_code == 200
+            assert len(ctx.captured_queries) == 2
+            seen += [order["id"] for order in response.data["results"]]
+            url, params = response.data["next"], None
+
+        assert seen == newest_first(history)
+
+    def test_invalid_cursor(self, authenticated_client, history):
+        response = authenticated_client.get(reverse("orders:order-list"), {"pagination": "cursor", "cursor": "nope"})
+        assert response.status_code == 404
+
+    def test_retrieve_includes_items_and_payment(self, authenticated_client, history):
+        order = history[0]
+        url = reverse("orders:order-detail", args=[order.pk])
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(url)
+
+        assert len(ctx.captured_queries) == 2
+        assert len(response.data["items"]) == ITEMS_PER_ORDER
+        assert response.data["payment"]["status"] == Payment.STATUS_COMPLETED
+
+    def test_status_update_does_not_reload_items(self, admin_client, history):
+        url = reverse("orders:order-detail", args=[history[0].pk])
+        with CaptureQueriesContext(connection) as ctx:
+            response = admin_client.patch(url, {"status": "shipped"})
+
+        assert response.status_code == 200
+        # load order with payment, load items, UPDATE
+        assert len(ctx.captured_queries) == 3
+        assert response.data["status"] == "shipped"
+        assert len(response.data["items"]) == ITEMS_PER_ORDER
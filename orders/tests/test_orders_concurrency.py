@@ -0,0 +1,97 @@
+"""
+Contention benchmark: parallel checkouts against one hot SKU.
+
+Run with ``-s`` to see the throughput numbers.
+"""
+import threading
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from cart.models import Cart
+from catalog.models import Category, Product
+from orders.models import Order, OrderItem
+
+User = get_user_model()
+
+CHECKOUTS = 24
+STOCK = 10
+
+ORDER_PAYLOAD = {
+    "shipping_address": {
+        "address_line": "123 Test St",
+        "city": "Test City",
+        "postal_code": "12345",
+        "country": "Test Country",
+    },
+    "payment_method": "chapa",
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCheckoutContention:
+    def test_parallel_checkouts_do_not_oversell(self):
+        category = Category.objects.create(name="Flash Sale")
+        hot = Product.objects.create(
+            category=category, title="Hot SKU", price=100, stock_quantity=STOCK
+        )
+        # A second product locked by every checkout exercises lock ordering.
+        side = Product.objects.create(
+            category=category, title="Side SKU", price=5, stock_quantity=CHECKOUTS
+        )
+        users = []
+        for idx in range(CHECKOUTS):
+            user = User.objects.create_user(
+                username=f"buyer{idx}", email=f"buyer{idx}@test.com", password="pass12345"
+            )
+            cart = Cart.objects.create(user=user)
+            # Alternate insertion order so carts list the products differently.
+            lines = [side, hot] if idx % 2 else [hot, side]
+            for product in lines:
+                cart.items.create(product=product, quantity=1, unit_price=product.price)
+            users.append(user)
+
+        statuses = []
+        barrier = threading.Barrier(CHECKOUTS)
+
+        def checkout(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                barrier.wait()
+                response = client.post(
+                    reverse("orders:order-list"), ORDER_PAYLOAD, format="json"
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=checkout, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        hot.refresh_from_db()
+        side.refresh_from_db()
+        sold = OrderItem.objects.filter(product_id=hot.pk).count()
+
+        print(
+            f"\n{CHECKOUTS} parallel checkouts in {elapsed:.3f}s "
+            f"({CHECKOUTS / elapsed:.1f} checkouts/s), "
+            f"{statuses.count(201)} succeeded, {statuses.count(400)} rejected"
+        )
+
+        assert len(statuses) == CHECKOUTS
+        assert set(statuses) <= {201, 400}
+        assert statuses.count(201) == STOCK
+        assert sold == STOCK
+        assert hot.stock_quantity == 0
+        assert side.stock_quantity == CHECKOUTS - STOCK
+        assert Order.objects.count() == STOCK
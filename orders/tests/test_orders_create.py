@@ -1,6 +1,15 @@
+from decimal import Decimal
+from unittest.mock import patch
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from catalog.models import Product
+from orders import views as order_views
+from orders.models import Order
+
 @pytest.mark.django_db
 class TestOrderCreate:
     def test_requires_auth(self, api_client):
@@ -76,3 +85,81 @@ class TestOrderCreate:
 
         cart = cart_model.objects.get(user=cart_with_items.user)
         assert cart.items.count() == 0
+
+
+ORDER_PAYLOAD = {
+    "shipping_address": {
+        "address_line": "123 Test St",
+        "city": "Test City",
+        "postal_code": "12345",
+        "country": "Test Country",
+    },
+    "payment_method": "chapa",
+}
+
+
+@pytest.mark.django_db
+class TestOrderCreateBatched:
+    def fill_cart(self, user, product_factory, cart_model, lines):
+        cart, _ = cart_model.objects.get_or_create(user=user)
+        for idx in range(lines):
+            product = product_factory(title=f"Line {idx}", price=10, stock_quantity=5)
+            cart.items.create(product=product, quantity=2, unit_price=product.price)
+        return cart
+
+    def count_queries(self, client):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post(reverse("orders:order-list"), ORDER_PAYLOAD, format="json")
+        assert response.status_code == 201
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_independent_of_cart_size(
+        self, api_client, user, other_user, product_factory, cart_model
+    ):
+        self.fill_cart(user, product_factory, cart_model, lines=1)
+        api_client.force_authenticate(user)
+        small = self.count_queries(api_client)
+
+        self.fill_cart(other_user, product_factory, cart_model, lines=25)
+        api_client.force_authenticate(other_user)
+        large = self.count_queries(api_client)
+
+        assert small == large
+
+    def test_items_totals_and_stock(
+        self, authenticated_client, user, product_factory, cart_model
+    ):
+        self.fill_cart(user, product_factory, cart_model, lines=3)
+
+        response = authenticated_client.post(
+            reverse("orders:order-list"), ORDER_PAYLOAD, format="json"
+        )
+
+        order = Order.objects.get(pk=response.data["id"])
+        assert order.total == Decimal("60.00")
+        assert [item.line_total for item in order.items.all()] == [Decimal("20.00")] * 3
+        assert set(Product.objects.values_list("stock_quantity", flat=True)) == {3}
+
+    def test_stock_shortfall_rolls_back(
+        self, authenticated_client, user, product_factory, cart_model
+    ):
+        cart = self.fill_cart(user, product_factory, cart_model, lines=2)
+        short = cart.items.first().product
+        # Simulate a concurrent checkout draining stock after the cart was read.
+        original_update = order_views.reserve_stock
+
+        def drain_then_reserve(quantities):
+            Product.objects.filter(pk=short.pk).update(stock_quantity=0)
+            return original_update(quantities)
+
+        with patch.object(order_views, "reserve_stock", drain_then_reserve):
+            response = authenticated_client.post(
+                reverse("orders:order-list"), ORDER_PAYLOAD, format="json"
+            )
+
+        assert response.status_code == 400
+        assert Order.objects.count() == 0
+        assert cart.items.count() == 2
+        assert set(
+            Product.objects.exclude(pk=short.pk).values_list("stock_quantity", flat=True)
+        ) == {5}
@@ -0,0 +1,177 @@
+"""
+EXPLAIN checks for the hot order, payment and notification lookups.
+
+The fixture loads QUERY_PLAN_ROWS orders (default 50k) spread over 1,000
+users. Every order gets two items and a payment, and there are as many
+notifications as orders. Rows go in through set-based INSERTs, followed
+by ANALYZE. Each test then asks PostgreSQL
+for the plan of a query the API or admin runs, and asserts which index it
+uses and that no large table is read with a sequential scan.
+
+For the full-size run, use QUERY_PLAN_ROWS=1000000. The data takes about a
+minute and a half to load.
+"""
+import json
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from notifications.models import Notification
+from orders.models import Order, OrderCancellationRequest, OrderItem
+from payments.models import Payment
+
+ROWS = int(os.getenv("QUERY_PLAN_ROWS", 50_000))
+USERS = 1000
+
+User = get_user_model()
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def scans(plan):
+    """Yield every node of ``plan`` that reads a table."""
+    if "Relation Name" in plan or "Index Name" in plan:
+        yield plan
+    for child in plan.get("Plans", []):
+        yield from scans(child)
+
+
+def assert_plan(queryset, uses_index, tables):
+    """
+    The plan for ``queryset`` reads through ``uses_index`` and never seq-scans
+    any of ``tables``.
+    """
+    plan = explain(queryset)
+    nodes = list(scans(plan))
+    indexes = {node.get("Index Name") for node in nodes}
+    seq_scanned = {
+        node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"
+    }
+    detail = json.dumps(plan, indent=2)
+    assert uses_index in indexes, detail
+    assert not seq_scanned & set(tables), detail
+
+
+@pytest.fixture(scope="module")
+def dataset(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        users = User.objects.bulk_create(
+            [
+                User(username=f"plan{idx}", email=f"plan{idx}@example.com", password="!")
+                for idx in range(USERS)
+            ]
+        )
+        user_ids = [user.pk for user in users]
+        order, item = Order._meta.db_table, OrderItem._meta.db_table
+        payment, notification = Payment._meta.db_table, Notification._meta.db_table
+
+        with connection.cursor() as cursor:
+            # 2% unpaid and 10% of each later fulfilment status
+            cursor.execute(
+                f"""
+                INSERT INTO {order}
+                    (user_id, status, payment_status, payment_method, total, created_at, updated_at)
+                SELECT (%s::bigint[])[1 + i %% {USERS}],
+                       (ARRAY['pending', 'confirmed', 'shipped', 'cancelled',
+                              'confirmed', 'confirmed', 'confirmed', 'confirmed',
+                              'confirmed', 'confirmed'])[1 + i %% 10],
+                       CASE WHEN i %% 50 = 0 THEN 'pending' ELSE 'paid' END,
+                       'chapa', 100, now() - i * interval '1 minute', now()
+                FROM generate_series(1, %s) AS i
+                """,
+                [user_ids, ROWS],
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {item}
+                    (order_id, product_id, product_title, unit_price, quantity, line_total)
+                SELECT o.id, (o.id + n) % 5000, 'Item', 50, 1, 50
+                FROM {order} o CROSS JOIN generate_series(1, 2) AS n
+                """
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {payment}
+                    (id, order_id, tx_ref, amount, currency, status, created_at, updated_at)
+                SELECT gen_random_uuid(), o.id, 'tx-' || o.id, o.total, 'ETB',
+                       CASE WHEN o.payment_status = 'pending' THEN 'pending' ELSE 'completed' END,
+                       o.created_at, o.updated_at
+                FROM {order} o
+                """
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {notification} (id, user_id, type, subject, is_sent, created_at)
+                SELECT gen_random_uuid(), (%s::bigint[])[1 + i %% {USERS}], 'email',
+                       'Order update', i %% 20 <> 0, now() - i * interval '1 minute'
+                FROM generate_series(1, %s) AS i
+                """,
+                [user_ids, ROWS],
+            )
+            for table in (order, item, payment, notification):
+                cursor.execute(f"ANALYZE {table}")
+
+    yield users[0]
+
+    with django_db_blocker.unblock():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"TRUNCATE {item}, {payment}, {OrderCancellationRequest._meta.db_table}, "
+                f"{order}, {notification}"
+            )
+        User.objects.filter(pk__in=user_ids).delete()
+
+
+@pytest.mark.django_db
+class TestHotQueryPlans:
+    def test_order_history(self, dataset):
+        queryset = Order.objects.filter(user=dataset).order_by("-created_at")[:12]
+        assert_plan(queryset, "order_user_created", [Order._meta.db_table])
+
+    def test_order_items_prefetch(self, dataset):
+        order_ids = list(
+            Order.objects.filter(user=dataset).order_by("-created_at").values_list("pk", flat=True)[:12]
+        )
+        queryset = OrderItem.objects.filter(order_id__in=order_ids)
+        assert_plan(queryset, "orderitem_order_covering", [OrderItem._meta.db_table])
+
+    def test_order_items_for_stock_commit(self, dataset):
+        order = Order.objects.filter(user=dataset).first()
+        queryset = OrderItem.objects.filter(order_id=order.pk).values_list("product_id", "quantity")
+        assert_plan(queryset, "orderitem_order_covering", [OrderItem._meta.db_table])
+
+    def test_admin_orders_by_status(self, dataset):
+        queryset = Order.objects.filter(status="shipped").order_by("-created_at")[:100]
+        assert_plan(queryset, "order_status_created", [Order._meta.db_table])
+
+    def test_unpaid_orders(self, dataset):
+        queryset = Order.objects.filter(payment_status="pending").order_by("created_at")[:100]
+        assert_plan(queryset, "order_payment_pending", [Order._meta.db_table])
+
+    def test_user_payments(self, dataset):
+        queryset = Payment.objects.filter(order__user=dataset).order_by("-created_at")[:12]
+        assert_plan(
+            queryset, "order_user_created", [Order._meta.db_table, Payment._meta.db_table]
+        )
+
+    def test_pending_payments(self, dataset):
+        queryset = Payment.objects.filter(status="pending").order_by("created_at")[:100]
+        assert_plan(queryset, "payment_pending_created", [Payment._meta.db_table])
+
+    def test_admin_payments_by_status(self, dataset):
+        queryset = Payment.objects.filter(status="failed").order_by("-created_at")[:10]
+        assert_plan(queryset, "payment_status_created", [Payment._meta.db_table])
+
+    def test_user_notifications(self, dataset):
+        queryset = Notification.objects.filter(user=dataset)[:20]
+        assert_plan(queryset, "notification_user_created", [Notification._meta.db_table])
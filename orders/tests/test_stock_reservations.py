@@ -0,0 +1,180 @@
+import hashlib
+import hmac
+import json
+import uuid
+
+import fakeredis
+import pytest
+from django.urls import reverse
+
+from catalog.models import Product
+from orders import reservations
+from orders.models import Order
+from orders.reservations import (
+    COMMIT_DUPLICATE,
+    COMMIT_NO_HOLD,
+    COMMIT_OK,
+    InsufficientStock,
+    StockLedger,
+)
+from orders.tasks import flush_committed_stock, release_expired_stock_holds
+from payments.models import Payment
+
+ORDER_PAYLOAD = {
+    "shipping_address": {
+        "address_line": "123 Test St",
+        "city": "Test City",
+        "postal_code": "12345",
+        "country": "Test Country",
+    },
+    "payment_method": "chapa",
+}
+
+
+@pytest.fixture
+def ledger():
+    return StockLedger(fakeredis.FakeRedis(), hold_ttl=60)
+
+
+@pytest.fixture
+def ledger_enabled(settings, monkeypatch, ledger):
+    settings.STOCK_RESERVATIONS_ENABLED = True
+    monkeypatch.setattr(reservations, "_ledger", ledger)
+    return ledger
+
+
+class TestStockLedger:
+    def test_reserve_seeds_and_decrements(self, ledger):
+        ledger.reserve(1, {10: 3, 11: 1}, {10: 5, 11: 1})
+
+        assert ledger.available(10) == 2
+        assert ledger.available(11) == 0
+
+    def test_reserve_is_all_or_nothing(self, ledger):
+        with pytest.raises(InsufficientStock) as exc:
+            ledger.reserve(1, {10: 1, 11: 2}, {10: 5, 11: 1})
+
+        assert exc.value.product_id == 11
+        assert ledger.available(10) == 5
+        assert ledger.available(11) == 1
+
+    def test_seed_is_only_used_once(self, ledger):
+        ledger.reserve(1, {10: 4}, {10: 5})
+
+        with pytest.raises(InsufficientStock):
+            ledger.reserve(2, {10: 4}, {10: 5})
+
+    def test_release_returns_units(self, ledger):
+        ledger.reserve(1, {10: 3}, {10: 5})
+
+        ledger.release(1)
+
+        assert ledger.available(10) == 5
+        assert ledger.expired_holds(now=float("inf")) == []
+
+    def test_commit_moves_hold_to_committed(self, ledger):
+        ledger.reserve(1, {10: 3}, {10: 5})
+
+        assert ledger.commit(1) == COMMIT_OK
+        assert ledger.commit(1) == COMMIT_DUPLICATE
+        assert ledger.take_committed() == {10: 3}
+        assert ledger.available(10) == 2
+
+    def test_commit_after_expiry_uses_order_quantities(self, ledger):
+        ledger.reserve(1, {10: 3}, {10: 5})
+        for order_id in ledger.expired_holds(now=float("inf")):
+            ledger.release(order_id)
+
+        assert ledger.commit(1, {10: 3}) == COMMIT_NO_HOLD
+        assert ledger.available(10) == 2
+        assert ledger.take_committed() == {10: 3}
+
+    def test_unacknowledged_flush_is_resumed(self, ledger):
+        ledger.reserve(1, {10: 1}, {10: 5})
+        ledger.commit(1)
+        assert ledger.take_committed() == {10: 1}
+
+        ledger.reserve(2, {10: 2}, {10: 5})
+        ledger.commit(2)
+
+        assert ledger.take_committed() == {10: 1}
+        ledger.ack_committed()
+        assert ledger.take_committed() == {10: 2}
+
+    def test_adjust_only_touches_seeded_counters(self, ledger):
+        ledger.adjust(10, 5)
+        assert ledger.available(10) is None
+
+        ledger.reserve(1, {10: 1}, {10: 1})
+        ledger.adjust(10, 5)
+        assert ledger.available(10) == 5
+
+
+@pytest.mark.django_db
+class TestCheckoutWithLedger:
+    def checkout(self, client):
+        return client.post(reverse("orders:order-list"), ORDER_PAYLOAD, format="json")
+
+    def test_checkout_holds_stock_without_touching_db(
+        self, ledger_enabled, authenticated_client, cart_with_items
+    ):
+        product = cart_with_items.items.get().product
+
+        response = self.checkout(authenticated_client)
+
+        assert response.status_code == 201
+        product.refresh_from_db()
+        assert product.stock_quantity == 10
+        assert ledger_enabled.available(product.pk) == 8
+
+    def test_checkout_rejected_when_ledger_is_short(
+        self, ledger_enabled, authenticated_client, cart_with_items
+    ):
+        product = cart_with_items.items.get().product
+        ledger_enabled.reserve(999, {product.pk: 9}, {product.pk: 10})
+
+        response = self.checkout(authenticated_client)
+
+        assert response.status_code == 400
+        assert Order.objects.count() == 0
+        assert cart_with_items.items.count() == 1
+
+    def test_paid_order_is_flushed_to_db(
+        self, settings, ledger_enabled, authenticated_client, cart_with_items
+    ):
+        settings.CHAPA_SECRET_KEY = "test_secret_key_for_webhook"
+        product = cart_with_items.items.get().product
+        order = Order.objects.get(pk=self.checkout(authenticated_client).data["id"])
+        payment = Payment.objects.create(
+            order=order, tx_ref=str(uuid.uuid4()), amount=order.total
+        )
+
+        body = json.dumps({"tx_ref": payment.tx_ref, "status": "success"}).encode()
+        signature = hmac.new(
+            settings.CHAPA_SECRET_KEY.encode(), msg=body, digestmod=hashlib.sha256
+        ).hexdigest()
+        authenticated_client.post(
+            reverse("payments:payment-webhook"),
+            data=body,
+            content_type="application/json",
+            HTTP_CHAPA_SIGNATURE=signature,
+        )
+        result = flush_committed_stock()
+
+        product.refresh_from_db()
+        assert result == {"status": "ok", "products": 1}
+        assert product.stock_quantity == 8
+        assert ledger_enabled.available(product.pk) == 8
+
+    def test_expired_holds_are_released(
+        self, ledger_enabled, authenticated_client, cart_with_items
+    ):
+        product = cart_with_items.items.get().product
+        ledger_enabled.hold_ttl = -1
+        self.checkout(authenticated_client)
+
+        result = release_expired_stock_holds()
+
+        assert result == {"status": "ok", "released": 1}
+        assert ledger_enabled.available(product.pk) == 10
+        assert Product.objects.get(pk=product.pk).stock_quantity == 10
@@ -1,15 +1,19 @@
 from decimal import Decimal
 from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 
-from cart.models import Cart, CartItem  # assume cart app exists
+from cart.cache_utils import invalidate_cart_cache
+from cart.stores import get_cart_store  # assume cart app exists
 from catalog.models import Product
 from orders.permissions import IsOwnerOrAdmin  # assume catalog app exists
 from .models import Order, OrderItem, OrderCancellationRequest
+from .pagination import OrderHistoryPagination
+from .reservations import InsufficientStock, get_ledger, reservations_enabled
 from .serializers import (
     OrderSerializer,
     OrderCreateSerializer,
@@ -21,17 +25,38 @@ from .serializers import (
 
 
 
+def reserve_stock(quantities):
+    """
+    Decrement stock for ``{product_id: quantity}`` in one conditional UPDATE.
+
+    Only active products with enough stock are updated, so the returned row
+    count is less than ``len(quantities)`` when any product falls short and
+    the caller must roll back.
+    """
+    if not quantities:
+        return 0
+    enough_stock = Q()
+    decrement = []
+    for product_id, quantity in quantities.items():
+        enough_stock |= Q(pk=product_id, stock_quantity__gte=quantity)
+        decrement.append(When(pk=product_id, then=Value(quantity)))
+    return Product.objects.filter(enough_stock, is_active=True).update(
+        stock_quantity=F("stock_quantity") - Case(*decrement, output_field=IntegerField())
+    )
+
+
 @extend_schema(tags=["Orders"])
 class OrderViewSet(viewsets.ModelViewSet):
     """
     Orders endpoints:
-    - list: GET /api/orders/ (current user's orders, paginated)
+    - list: GET /api/orders/ (current user's orders with items and payment, paginated)
     - create: POST /api/orders/ (create order from cart)
     - retrieve: GET /api/orders/{id}/
     - partial_update: PATCH /api/orders/{id}/ (for admin to update status)
     - cancel: POST /api/orders/{id}/cancel/
     """
-    queryset = Order.objects.all().select_related("user").prefetch_related("items")
+    # One query for a page of orders with their payments, one for their items
+    queryset = Order.objects.with_details()
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
     lookup_field = "pk"
@@ -50,6 +75,48 @@ class OrderViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(user=self.request.user)
         return queryset
 
+    @property
+    def paginator(self):
+        """Use keyset pagination for list requests that opt in with ?pagination=cursor."""
+        if not hasattr(self, "_paginator") and self.action == "list":
+            if OrderHistoryPagination.is_requested(self.request):
+                self._paginator = OrderHistoryPagination()
+        return super().paginator
+
+    @extend_schema(
+        summary="List orders",
+        description=(
+            "Returns the current user's orders, newest first, each with its items and payment status. "
+            "Admins see all orders."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="page",
+                type=OpenApiTypes.INT,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Page number for pagination",
+            ),
+            OpenApiParameter(
+                name="pagination",
+                type=OpenApiTypes.STR,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Set to 'cursor' for keyset pagination: no total count, follow 'next' links for stable deep paging",
+            ),
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.STR,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Opaque cursor from a previous 'next' link (with pagination=cursor)",
+            ),
+        ],
+        tags=["Orders"],
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @extend_schema(
         summary="Create order from current user's cart",
         description=(
@@ -82,72 +149,99 @@ class OrderViewSet(viewsets.ModelViewSet):
             )
 
         # get cart
-        cart, _ = Cart.objects.get_or_create(user=request.user)
-        cart_items = list(cart.items.select_related("product").all())
+        cart = get_cart_store(request.user)
+        cart_items = cart.list_items()
         if not cart_items:
             return Response({"detail": "Cart is empty."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # transaction: validate stock, create order + items, decrement stock, clear cart
+        quantities = {}
+        for ci in cart_items:
+            quantities[ci.product_id] = quantities.get(ci.product_id, 0) + ci.quantity
+
+        # transaction: lock products, validate stock, create order + items,
+        # decrement stock, clear cart. Query count is constant regardless of cart size.
+        use_ledger = reservations_enabled()
         with transaction.atomic():
-            # validate stock
-            for ci in cart_items:
-                product = ci.product
-                if not product.is_active:
-                    return Response({"detail": f"Product {product.id} is inactive."}, status=status.HTTP_400_BAD_REQUEST)
-                if product.stock_quantity < ci.quantity:
+            # Lock rows in primary key order so concurrent checkouts over
+            # overlapping products queue up instead of deadlocking, then
+            # validate against the locked (current) stock and price. With the
+            # Redis reservation ledger enabled, stock is checked there instead
+            # and no row locks are taken.
+            products_qs = Product.objects.filter(pk__in=quantities).order_by("pk")
+            if not use_ledger:
+                products_qs = products_qs.select_for_update()
+            products = {product.pk: product for product in products_qs}
+            for product_id, quantity in quantities.items():
+                product = products.get(product_id)
+                if product is None or not product.is_active:
+                    return Response({"detail": f"Product {product_id} is inactive."}, status=status.HTTP_400_BAD_REQUEST)
+                if not use_ledger and product.stock_quantity < quantity:
                     return Response(
-                        {"detail": f"Insufficient stock for product {product.id}."},
+                        {"detail": f"Insufficient stock for product {product_id}."},
                         status=status.HTTP_400_BAD_REQUEST,
                     )
 
-            # Prepare order creation data with shipping address
-            order_data = {
-                "user": request.user,
-                "payment_method": payment_method,
-                "payment_status": Order.PAYMENT_PENDING,
-                "total": Decimal("0.00"),
-                "shipping_address_line": shipping_address_data["address_line"],
-                "shipping_city": shipping_address_data["city"],
-                "shipping_postal_code": shipping_address_data["postal_code"],
-                "shipping_country": shipping_address_data["country"],
-            }
-
-            # create order
-            order = Order.objects.create(**order_data)
-
+            # build order items in memory so the whole cart is written in one INSERT
+            order_items = []
             total = Decimal("0.00")
-            # create items and adjust product stock
             for ci in cart_items:
-                product = ci.product
-                unit_price = product.price
-                quantity = ci.quantity
-                line_total = (unit_price * quantity).quantize(Decimal('0.01'))
-
-                OrderItem.objects.create(
-                    order=order,
-                    product_id=product.pk,
-                    product_title=product.title,
-                    unit_price=unit_price,
-                    quantity=quantity,
-                    line_total=line_total,
+                product = products[ci.product_id]
+                line_total = (product.price * ci.quantity).quantize(Decimal('0.01'))
+                order_items.append(
+                    OrderItem(
+                        product_id=product.pk,
+                        product_title=product.title,
+                        unit_price=product.price,
+                        quantity=ci.quantity,
+                        line_total=line_total,
+                    )
                 )
+                total += line_total
 
-                # decrement stock (reserve)
-                product.stock_quantity -= quantity
-                product.save(update_fields=["stock_quantity"])
+            order = Order.objects.create(
+                user=request.user,
+                payment_method=payment_method,
+                payment_status=Order.PAYMENT_PENDING,
+                total=total,
+                shipping_address_line=shipping_address_data["address_line"],
+                shipping_city=shipping_address_data["city"],
+                shipping_postal_code=shipping_address_data["postal_code"],
+                shipping_country=shipping_address_data["country"],
+            )
 
-                total += line_total
+            for item in order_items:
+                item.order = order
+            OrderItem.objects.bulk_create(order_items)
+
+            if use_ledger:
+                # hold stock in Redis; the hold expires unless the order is paid
+                try:
+                    get_ledger().reserve(
+                        order.pk,
+                        quantities,
+                        {pk: product.stock_quantity for pk, product in products.items()},
+                    )
+                except InsufficientStock as exc:
+                    transaction.set_rollback(True)
+                    return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-            # set total and save
-            order.total = total
-            order.save(update_fields=["total"])
+            # decrement stock (reserve) for every product in a single UPDATE;
+            # the stock condition is re-checked in the database as a safeguard
+            elif reserve_stock(quantities) != len(quantities):
+                transaction.set_rollback(True)
+                return Response(
+                    {"detail": "Insufficient stock for one or more products."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
             # clear cart
-            cart.items.all().delete()
+            cart.clear()
 
             # NOTE: Payment record creation / enqueueing should be done in payments app (or via signal).
             # For now, order.payment_status stays 'pending' and payment_method contains snapshot.
 
+        invalidate_cart_cache(request.user.pk)
+
         # return minimal response
         out = OrderSerializer(order, context={"request": request})
         return Response(out.data, status=status.HTTP_201_CREATED)
@@ -171,6 +265,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         serializer.save()
         # TODO: enqueue notification email/email task on status change (Celery)
+        # get_object() loaded the items and payment; only status changed since.
         return Response(OrderSerializer(order).data)
 
     @extend_schema(
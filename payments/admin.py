@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Payment
+from .models import Payment, WebhookEvent
+from .tasks import process_webhook_events
 # Register your models here.
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
@@ -12,4 +13,21 @@ class PaymentAdmin(admin.ModelAdmin):
     list_max_show_all = 100
     list_editable = ["status"]  # Status can be edited in list view
     list_display_links = ["id", "order"]
-    list_select_related = ["order"]
\ No newline at end of file
+    list_select_related = ["order"]
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ["id", "tx_ref", "status", "received_at", "processed_at", "attempts"]
+    list_filter = ["status", "processed_at"]
+    search_fields = ["tx_ref"]
+    readonly_fields = [
+        "tx_ref", "status", "payload", "received_at", "processed_at", "attempts", "last_error"
+    ]
+    actions = ["replay"]
+
+    @admin.action(description="Replay selected events")
+    def replay(self, request, queryset):
+        count = queryset.update(processed_at=None, attempts=0, last_error="")
+        process_webhook_events.delay()
+        self.message_user(request, f"{count} event(s) queued for replay.")
@@ -0,0 +1,182 @@
+"""
+HTTP client for the Chapa payment gateway.
+
+One ``ChapaClient`` per process holds a ``requests.Session``, so payment
+initiation reuses pooled keep-alive connections instead of paying a TCP and
+TLS handshake per call. Every call has a connect and a read timeout (the
+CHAPA_*_TIMEOUT settings), so a slow gateway cannot hold a worker
+indefinitely.
+
+Only failures where Chapa cannot have acted on the request are retried:
+connection errors, and 429/502/503 responses. A read timeout or a 504 is not
+retried, because the transaction may already exist on Chapa's side. Retries
+back off by ``backoff_factor`` and ignore Retry-After, so the gateway cannot
+stretch a call past its timeouts.
+
+A circuit breaker counts consecutive gateway failures (timeouts, connection
+errors, 5xx, 429). Once CHAPA_BREAKER_FAILURES is reached, calls fail
+immediately with ``ChapaUnavailable`` for CHAPA_BREAKER_RESET seconds. After
+that, a single trial call decides whether the circuit closes again.
+"""
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 502, 503)
+
+
+class ChapaError(Exception):
+    """Chapa rejected the request or answered with something unusable."""
+
+
+class ChapaUnavailable(ChapaError):
+    """Chapa could not be reached in time, or the circuit is open."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Whether a call may go out now. Half-open lets one trial call through."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning("Chapa circuit opened after %s failures.", self.failures)
+                self.opened_at = self.clock()
+            self._trial_running = False
+
+
+class ChapaClient:
+    def __init__(
+        self,
+        base_url,
+        secret_key,
+        connect_timeout=3.05,
+        read_timeout=10,
+        max_retries=2,
+        backoff_factor=0.2,
+        pool_size=10,
+        breaker=None,
+        verify=True,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker(failure_threshold=5, reset_timeout=30)
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,  # POST included: only retried when Chapa did not act
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Authorization"] = f"Bearer {secret_key}"
+        # Passed per request: REQUESTS_CA_BUNDLE would override session.verify.
+        self.verify = verify
+
+    def _post(self, path, data):
+        if not self.breaker.allow():
+            raise ChapaUnavailable("Chapa circuit is open.")
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}{path}", data=data, timeout=self.timeout, verify=self.verify
+            )
+        except requests.RequestException as exc:
+            self.breaker.record_failure()
+            raise ChapaUnavailable(f"Chapa request failed: {exc}") from exc
+
+        if response.status_code >= 500 or response.status_code == 429:
+            self.breaker.record_failure()
+            raise ChapaUnavailable(f"Chapa answered {response.status_code}.")
+        self.breaker.record_success()
+
+        if response.status_code != 200:
+            raise ChapaError(f"Chapa answered {response.status_code}: {response.text[:200]}")
+        try:
+            return response.json()
+        except ValueError as exc:
+            raise ChapaError("Chapa answered with invalid JSON.") from exc
+
+    def initialize(self, payload):
+        """Start a hosted checkout for ``payload`` and return its checkout URL."""
+        body = self._post("/transaction/initialize", payload)
+        try:
+            return body["data"]["checkout_url"]
+        except (KeyError, TypeError) as exc:
+            raise ChapaError("Chapa response has no checkout_url.") from exc
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+
+
+def get_chapa_client():
+    global _client
+    if _client is None:
+        _client = ChapaClient(
+            settings.CHAPA_BASE_URL,
+            settings.CHAPA_SECRET_KEY,
+            connect_timeout=settings.CHAPA_CONNECT_TIMEOUT,
+            read_timeout=settings.CHAPA_READ_TIMEOUT,
+            max_retries=settings.CHAPA_MAX_RETRIES,
+            pool_size=settings.CHAPA_POOL_SIZE,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.CHAPA_BREAKER_FAILURES,
+                reset_timeout=settings.CHAPA_BREAKER_RESET,
+            ),
+        )
+    return _client
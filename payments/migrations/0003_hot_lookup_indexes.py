@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-17 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_hot_lookup_indexes'),
+        ('payments', '0002_webhook_event'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', '-created_at'], name='payment_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='payment_pending_created'),
+        ),
+    ]
@@ -1,13 +1,19 @@
 import uuid
 import hashlib
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
+from orders.models import Order
+
 class Payment(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+
     STATUS_CHOICES = [
-        ("pending", "Pending"),
-        ("completed", "Completed"),
-        ("failed", "Failed"),
+        (STATUS_PENDING, "Pending"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -28,20 +34,92 @@ class Payment(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     paid_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-created_at"], name="payment_status_created"),
+            # Pending payments are few but swept often; keep them in a small index.
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(status="pending"),
+                name="payment_pending_created",
+            ),
+        ]
+
+    def transition(self, status, from_statuses, order_payment_status, **changes):
+        """
+        Move this payment from one of ``from_statuses`` to ``status`` and set
+        its order's payment_status, in one transaction of two UPDATEs.
+
+        The status check is part of the payment UPDATE's WHERE clause, so when
+        duplicate webhooks race, exactly one caller changes the row and gets
+        True; the others match nothing and get False. No row is read or
+        locked beforehand.
+        """
+        now = timezone.now()
+        changes = {"status": status, "updated_at": now, **changes}
+        with transaction.atomic():
+            changed = Payment.objects.filter(
+                pk=self.pk, status__in=from_statuses
+            ).update(**changes)
+            if changed:
+                Order.objects.filter(pk=self.order_id).update(
+                    payment_status=order_payment_status, updated_at=now
+                )
+        if changed:
+            for field, value in changes.items():
+                setattr(self, field, value)
+        return bool(changed)
+
     def mark_completed(self):
-        if self.status == "completed":
-            return False  # idempotent
-        self.status = "completed"
-        self.paid_at = timezone.now()
-        self.save()
-        return True
+        # A late success still wins over an earlier failure: the money moved.
+        return self.transition(
+            self.STATUS_COMPLETED,
+            [self.STATUS_PENDING, self.STATUS_FAILED],
+            Order.PAYMENT_PAID,
+            paid_at=timezone.now(),
+        )
 
     def mark_failed(self):
-        if self.status == "failed":
-            return False
-        self.status = "failed"
-        self.save()
-        return True
+        return self.transition(self.STATUS_FAILED, [self.STATUS_PENDING], Order.PAYMENT_FAILED)
 
     def __str__(self):
         return f"{self.tx_ref} ({self.status})"
+
+
+class WebhookEventQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(processed_at__isnull=True)
+
+
+class WebhookEvent(models.Model):
+    """
+    Inbox of verified Chapa webhooks. The webhook view only records events;
+    ``process_webhook_events`` applies them to payments and orders. Redelivery
+    of the same ``tx_ref``/``status`` pair is dropped on insert.
+    """
+    tx_ref = models.CharField(max_length=100)
+    status = models.CharField(max_length=50)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    # Set once the event is applied, or given up on after too many attempts.
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+
+    objects = WebhookEventQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(fields=["tx_ref", "status"], name="webhook_event_tx_ref_status"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(processed_at__isnull=True),
+                name="webhook_event_pending",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.tx_ref} {self.status}"
@@ -10,3 +10,12 @@ def send_payment_confirmation_email(self, email, amount, tx_ref):
         f"Transaction Ref: {tx_ref}"
     )
     send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
+
+
+@shared_task
+def process_webhook_events():
+    """Apply pending webhook events from the inbox."""
+    from .webhooks import drain_webhook_events
+
+    applied, failed = drain_webhook_events()
+    return {"status": "ok", "applied": applied, "failed": failed}
@@ -1,13 +1,15 @@
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
-from django.test import override_settings
 from decimal import Decimal
 import uuid
 
 from orders.models import Order
+from payments import gateway
 from payments.models import Payment
 
+from payments.tests.fake_chapa import FakeChapa
+
 User = get_user_model()
 
 
@@ -75,3 +77,17 @@ def chapa_settings(settings):
         settings.CHAPA_SECRET_KEY = "test_secret_key_for_webhook"
     return settings
 
+
+
+@pytest.fixture
+def fake_chapa(settings, monkeypatch):
+    """Point the gateway client at a local fake Chapa server."""
+    server = FakeChapa().start()
+    settings.CHAPA_BASE_URL = server.base_url
+    settings.CHAPA_READ_TIMEOUT = 0.5
+    settings.CHAPA_BREAKER_FAILURES = 3
+    monkeypatch.setattr(gateway, "_client", None)
+    yield server
+    if gateway._client is not None:
+        gateway._client.close()
+    server.stop()
@@ -0,0 +1,152 @@
+"""
+A local stand-in for Chapa's ``/transaction/initialize`` endpoint.
+
+Runs an HTTP/1.1 keep-alive server on a free port in a background thread.
+Responses are scripted per test: ``fail_next(503, 503)`` answers the next
+two calls with 503, ``delay`` holds every answer back, and ``retry_after``
+adds a Retry-After header to failures. ``FakeChapa`` also
+records each request and counts the TCP connections it accepts. With
+``tls=True`` it serves HTTPS from a throwaway self-signed certificate
+(``cert_path`` is the file to verify against).
+"""
+import datetime
+import ipaddress
+import json
+import ssl
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+def _self_signed_cert(directory):
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = f"{directory}/cert.pem"
+    key_path = f"{directory}/key.pem"
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle delay the body.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.fake.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        fake = self.server.fake
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        fake.requests.append(
+            {
+                "path": self.path,
+                "headers": dict(self.headers),
+                "data": {key: values[0] for key, values in parse_qs(body.decode()).items()},
+            }
+        )
+        if fake.delay:
+            time.sleep(fake.delay)
+
+        with fake.lock:
+            status = fake.statuses.pop(0) if fake.statuses else 200
+        if status == 200 and self.path.endswith("/transaction/initialize"):
+            tx_ref = fake.requests[-1]["data"].get("tx_ref", "")
+            payload = {
+                "message": "Hosted Link",
+                "status": "success",
+                "data": {"checkout_url": f"https://checkout.chapa.co/checkout/payment/{tx_ref}"},
+            }
+        else:
+            payload = {"message": "Scripted failure", "status": "failed", "data": None}
+
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if status != 200 and fake.retry_after is not None:
+            self.send_header("Retry-After", str(fake.retry_after))
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that time out hang up before the scripted delay is over.
+        pass
+
+
+class FakeChapa:
+    def __init__(self, tls=False):
+        self.requests = []
+        self.statuses = []
+        self.delay = 0
+        self.retry_after = None
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.cert_path = None
+
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.server = _Server(("127.0.0.1", 0), _Handler)
+        self.server.fake = self
+        scheme = "http"
+        if tls:
+            self.cert_path, key_path = _self_signed_cert(self._tmpdir.name)
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.cert_path, key_path)
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+            scheme = "https"
+        host, port = self.server.server_address
+        self.base_url = f"{scheme}://{host}:{port}/v1"
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    def fail_next(self, *statuses):
+        with self.lock:
+            self.statuses.extend(statuses)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmpdir.cleanup()
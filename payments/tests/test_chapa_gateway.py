@@ -0,0 +1,201 @@
+import time
+
+import pytest
+from django.urls import reverse
+
+from payments.gateway import (
+    ChapaClient,
+    ChapaError,
+    ChapaUnavailable,
+    CircuitBreaker,
+    get_chapa_client,
+)
+from payments.models import Payment
+
+PAYLOAD = {"amount": "100.00", "currency": "ETB", "tx_ref": "tx-1"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def client(fake_chapa):
+    client = ChapaClient(
+        fake_chapa.base_url,
+        "secret",
+        connect_timeout=0.5,
+        read_timeout=0.5,
+        backoff_factor=0,
+        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30),
+    )
+    yield client
+    client.close()
+
+
+class TestChapaClient:
+    def test_initialize_returns_checkout_url(self, client, fake_chapa):
+        url = client.initialize(PAYLOAD)
+
+        assert url == "https://checkout.chapa.co/checkout/payment/tx-1"
+        sent = fake_chapa.requests[0]
+        assert sent["path"] == "/v1/transaction/initialize"
+        assert sent["headers"]["Authorization"] == "Bearer secret"
+        assert sent["data"] == PAYLOAD
+
+    def test_connections_are_reused(self, client, fake_chapa):
+        for idx in range(5):
+            client.initialize({**PAYLOAD, "tx_ref": f"tx-{idx}"})
+        assert len(fake_chapa.requests) == 5
+        assert fake_chapa.connections == 1
+
+    def test_unavailable_statuses_are_retried(self, client, fake_chapa):
+        fake_chapa.fail_next(503, 502)
+        assert client.initialize(PAYLOAD).endswith("tx-1")
+        assert len(fake_chapa.requests) == 3
+        assert client.breaker.failures == 0
+
+    def test_retries_are_bounded(self, client, fake_chapa):
+        fake_chapa.fail_next(503, 503, 503, 503)
+        with pytest.raises(ChapaUnavailable):
+            client.initialize(PAYLOAD)
+        assert len(fake_chapa.requests) == 3
+
+    def test_retry_after_is_ignored(self, client, fake_chapa):
+        fake_chapa.retry_after = 3
+        fake_chapa.fail_next(503, 503, 503)
+        started = time.monotonic()
+        with pytest.raises(ChapaUnavailable):
+            client.initialize(PAYLOAD)
+        assert time.monotonic() - started < 1
+        assert len(fake_chapa.requests) == 3
+
+    def test_gateway_timeout_is_not_retried(self, client, fake_chapa):
+        fake_chapa.fail_next(504)
+        with pytest.raises(ChapaUnavailable):
+            client.initialize(PAYLOAD)
+        assert len(fake_chapa.requests) == 1
+        assert client.breaker.failures == 1
+
+    def test_read_timeout_is_not_retried(self, client, fake_chapa):
+        fake_chapa.delay = 1
+        with pytest.raises(ChapaUnavailable):
+            client.initialize(PAYLOAD)
+        assert len(fake_chapa.requests) == 1
+
+    def test_client_errors_are_not_retried(self, client, fake_chapa):
+        fake_chapa.fail_next(400)
+        with pytest.raises(ChapaError) as exc_info:
+            client.initialize(PAYLOAD)
+        assert not isinstance(exc_info.value, ChapaUnavailable)
+        assert len(fake_chapa.requests) == 1
+        assert client.breaker.failures == 0
+
+    def test_unreachable_gateway(self):
+        client = ChapaClient("http://127.0.0.1:9", "secret", connect_timeout=0.2, backoff_factor=0)
+        with pytest.raises(ChapaUnavailable):
+            client.initialize(PAYLOAD)
+        assert client.breaker.failures == 1
+
+    def test_open_circuit_fails_fast(self, client, fake_chapa):
+        fake_chapa.fail_next(*[500] * 9)
+        for _ in range(3):
+            with pytest.raises(ChapaUnavailable):
+                client.initialize(PAYLOAD)
+        sent = len(fake_chapa.requests)
+
+        with pytest.raises(ChapaUnavailable, match="circuit is open"):
+            client.initialize(PAYLOAD)
+        assert len(fake_chapa.requests) == sent
+
+
+class TestCircuitBreaker:
+    def test_half_open_lets_one_trial_through(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        clock.now = 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow()
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        clock.now = 15
+        assert not breaker.allow()
+
+
+@pytest.mark.django_db
+class TestInitiatePayment:
+    @property
+    def url(self):
+        return reverse("payments:payment-initiate")
+
+    def test_returns_checkout_url(self, api_client, user, order_factory, fake_chapa):
+        order = order_factory()
+        api_client.force_authenticate(user=user)
+
+        response = api_client.post(self.url, {"order_id": order.pk}, format="json")
+
+        assert response.status_code == 200
+        payment = Payment.objects.get(order=order)
+        assert response.data["payment_url"].endswith(payment.tx_ref)
+        assert fake_chapa.requests[0]["data"]["amount"] == "100.00"
+        assert get_chapa_client().verify is True
+
+    def test_gateway_down_returns_503(self, api_client, user, order_factory, fake_chapa):
+        order = order_factory()
+        api_client.force_authenticate(user=user)
+        fake_chapa.fail_next(503, 503, 503)
+
+        response = api_client.post(self.url, {"order_id": order.pk}, format="json")
+
+        assert response.status_code == 503
+        assert Payment.objects.get(order=order).status == "failed"
+
+    def test_retry_after_503_reuses_the_payment(self, api_client, user, order_factory, fake_chapa):
+        order = order_factory()
+        api_client.force_authenticate(user=user)
+        fake_chapa.fail_next(503, 503, 503)
+        assert api_client.post(self.url, {"order_id": order.pk}, format="json").status_code == 503
+        failed = Payment.objects.get(order=order)
+
+        response = api_client.post(self.url, {"order_id": order.pk}, format="json")
+
+        assert response.status_code == 200
+        payment = Payment.objects.get(order=order)
+        assert str(payment.pk) == response.data["payment_id"] == str(failed.pk)
+        assert payment.status == "pending"
+        assert payment.tx_ref == response.data["tx_ref"] != failed.tx_ref
+        assert response.data["payment_url"].endswith(payment.tx_ref)
+        order.refresh_from_db()
+        assert order.payment_status == "pending"
+
+    def test_rejected_request_returns_400(self, api_client, user, order_factory, fake_chapa):
+        order = order_factory()
+        api_client.force_authenticate(user=user)
+        fake_chapa.fail_next(400)
+
+        response = api_client.post(self.url, {"order_id": order.pk}, format="json")
+
+        assert response.status_code == 400
+        assert Payment.objects.get(order=order).status == "failed"
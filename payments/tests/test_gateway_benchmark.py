@@ -0,0 +1,69 @@
+"""
+Latency benchmark: a fresh ``requests.post`` per payment initiation (the
+previous view code) against the pooled ``ChapaClient``, over HTTPS to the
+local fake Chapa server.
+
+Run with ``-s`` to see the numbers. The gap is the TCP and TLS handshake the
+pooled session skips after the first call; real gateway round-trips widen it.
+"""
+import statistics
+import time
+
+import pytest
+import requests
+
+from payments.gateway import ChapaClient
+from payments.tests.fake_chapa import FakeChapa
+
+CALLS = 50
+
+
+@pytest.fixture
+def tls_chapa():
+    server = FakeChapa(tls=True).start()
+    yield server
+    server.stop()
+
+
+def latencies(call):
+    timings = []
+    for idx in range(CALLS):
+        started = time.perf_counter()
+        call(idx)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summary(timings):
+    timings = sorted(timings)
+    p50 = statistics.median(timings) * 1e3
+    p95 = timings[int(len(timings) * 0.95) - 1] * 1e3
+    return f"p50 {p50:.2f}ms, p95 {p95:.2f}ms"
+
+
+def test_pooled_client_latency(tls_chapa):
+    url = f"{tls_chapa.base_url}/transaction/initialize"
+
+    def unpooled(idx):
+        response = requests.post(
+            url,
+            headers={"Authorization": "Bearer secret"},
+            data={"tx_ref": f"plain-{idx}"},
+            verify=tls_chapa.cert_path,
+        )
+        assert response.status_code == 200
+
+    unpooled_timings = latencies(unpooled)
+    unpooled_connections = tls_chapa.connections
+
+    client = ChapaClient(tls_chapa.base_url, "secret", verify=tls_chapa.cert_path)
+    pooled_timings = latencies(lambda idx: client.initialize({"tx_ref": f"pooled-{idx}"}))
+    client.close()
+
+    assert unpooled_connections == CALLS
+    assert tls_chapa.connections - unpooled_connections == 1
+    assert statistics.median(pooled_timings) < statistics.median(unpooled_timings)
+    print(
+        f"\n{CALLS} initializations over TLS: requests.post {summary(unpooled_timings)}; "
+        f"ChapaClient {summary(pooled_timings)}"
+    )
@@ -0,0 +1,113 @@
+import hashlib
+import hmac
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.conf import settings
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from orders.models import Order
+from payments import webhooks
+from payments.models import Payment, WebhookEvent
+
+PARALLEL = 50
+
+
+def run_in_parallel(func, count=PARALLEL):
+    """Call ``func`` from ``count`` threads released together; return the results."""
+    barrier = threading.Barrier(count)
+
+    def worker(_):
+        try:
+            barrier.wait()
+            return func()
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(worker, range(count)))
+
+
+@pytest.mark.django_db
+class TestPaymentTransitions:
+    def test_completion_updates_payment_and_order(self, payment_factory):
+        payment = payment_factory()
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert payment.mark_completed() is True
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        assert len(updates) == 2
+        assert "\"status\" IN" in updates[0]
+
+        payment.refresh_from_db()
+        assert payment.status == "completed" and payment.paid_at is not None
+        assert Order.objects.get(pk=payment.order_id).payment_status == Order.PAYMENT_PAID
+
+    def test_transitions_are_idempotent(self, payment_factory):
+        payment = payment_factory()
+        assert payment.mark_completed() is True
+        assert payment.mark_completed() is False
+        # stale instance still "pending" in memory
+        stale = Payment.objects.get(pk=payment.pk)
+        stale.status = "pending"
+        assert stale.mark_completed() is False
+
+    def test_failure_never_overrides_completion(self, payment_factory):
+        payment = payment_factory()
+        payment.mark_completed()
+        assert Payment.objects.get(pk=payment.pk).mark_failed() is False
+        assert Order.objects.get(pk=payment.order_id).payment_status == Order.PAYMENT_PAID
+
+    def test_late_success_completes_a_failed_payment(self, payment_factory):
+        payment = payment_factory()
+        assert payment.mark_failed() is True
+        assert Order.objects.get(pk=payment.order_id).payment_status == Order.PAYMENT_FAILED
+        assert payment.mark_completed() is True
+        assert Order.objects.get(pk=payment.order_id).payment_status == Order.PAYMENT_PAID
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentTransitions:
+    def test_one_of_many_racing_completions_wins(self, payment_factory):
+        payment = payment_factory()
+
+        results = run_in_parallel(lambda: Payment.objects.get(pk=payment.pk).mark_completed())
+
+        assert results.count(True) == 1
+        payment.refresh_from_db()
+        assert payment.status == "completed"
+
+    def test_parallel_duplicate_webhooks_send_one_email(self, payment_factory, monkeypatch):
+        sent = []
+        monkeypatch.setattr(
+            webhooks.send_payment_confirmation_email, "delay", lambda *args: sent.append(args)
+        )
+        payment = payment_factory()
+        body = json.dumps(
+            {"tx_ref": payment.tx_ref, "status": "success", "email": "a@b.co", "amount": "100.00"}
+        ).encode()
+        signature = hmac.new(
+            settings.CHAPA_SECRET_KEY.encode(), msg=body, digestmod=hashlib.sha256
+        ).hexdigest()
+        url = reverse("payments:payment-webhook")
+
+        def deliver():
+            response = APIClient().post(
+                url, data=body, content_type="application/json", HTTP_CHAPA_SIGNATURE=signature
+            )
+            return response.status_code
+
+        statuses = run_in_parallel(deliver)
+
+        assert statuses == [200] * PARALLEL
+        assert WebhookEvent.objects.count() == 1
+        assert not WebhookEvent.objects.pending().exists()
+        assert len(sent) == 1
+        payment.refresh_from_db()
+        assert payment.status == "completed"
+        assert Order.objects.get(pk=payment.order_id).payment_status == Order.PAYMENT_PAID
@@ -0,0 +1,155 @@
+import hashlib
+import hmac
+import json
+import statistics
+import time
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from orders.models import Order
+from payments import tasks, webhooks
+from payments.models import Payment, WebhookEvent
+from payments.webhooks import MAX_ATTEMPTS, drain_webhook_events
+
+
+def post_webhook(api_client, payload):
+    body = json.dumps(payload).encode()
+    signature = hmac.new(
+        settings.CHAPA_SECRET_KEY.encode(), msg=body, digestmod=hashlib.sha256
+    ).hexdigest()
+    return api_client.post(
+        reverse("payments:payment-webhook"),
+        data=body,
+        content_type="application/json",
+        HTTP_CHAPA_SIGNATURE=signature,
+    )
+
+
+@pytest.fixture
+def emails(monkeypatch):
+    sent = []
+    monkeypatch.setattr(
+        webhooks.send_payment_confirmation_email, "delay", lambda *args: sent.append(args)
+    )
+    return sent
+
+
+@pytest.fixture
+def deferred(monkeypatch):
+    """Leave recorded events in the inbox instead of draining them eagerly."""
+    monkeypatch.setattr(tasks.process_webhook_events, "delay", lambda: None)
+
+
+@pytest.mark.django_db
+class TestWebhookInbox:
+    def test_event_is_recorded_and_applied(
+        self, api_client, payment_factory, emails, django_capture_on_commit_callbacks
+    ):
+        payment = payment_factory()
+        payload = {"tx_ref": payment.tx_ref, "status": "success", "email": "a@b.co", "amount": "100.00"}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = post_webhook(api_client, payload)
+
+        assert response.status_code == 200
+        event = WebhookEvent.objects.get()
+        assert (event.tx_ref, event.status, event.payload) == (payment.tx_ref, "success", payload)
+        assert event.processed_at is not None and event.attempts == 1
+        payment.refresh_from_db()
+        assert payment.status == "completed"
+        assert payment.order.payment_status == Order.PAYMENT_PAID
+        assert emails == [("a@b.co", "100.00", payment.tx_ref)]
+
+    def test_redelivery_is_deduplicated(
+        self, api_client, payment_factory, emails, django_capture_on_commit_callbacks
+    ):
+        payment = payment_factory()
+        payload = {"tx_ref": payment.tx_ref, "status": "success", "email": "a@b.co", "amount": "1"}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for _ in range(3):
+                assert post_webhook(api_client, payload).status_code == 200
+
+        assert WebhookEvent.objects.count() == 1
+        assert len(emails) == 1
+
+    def test_ingest_is_a_single_insert(self, api_client, payment_factory, deferred):
+        payment = payment_factory()
+        payload = {"tx_ref": payment.tx_ref, "status": "success"}
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = post_webhook(api_client, payload)
+
+        assert response.status_code == 200
+        assert len(ctx.captured_queries) == 1
+        assert ctx.captured_queries[0]["sql"].startswith('INSERT INTO "payments_webhookevent"')
+        payment.refresh_from_db()
+        assert payment.status == "pending"
+
+        timings = []
+        for idx in range(50):
+            started = time.perf_counter()
+            post_webhook(api_client, {"tx_ref": f"tx-{idx}", "status": "success"})
+            timings.append(time.perf_counter() - started)
+        print(f"\nwebhook ingest p50: {statistics.median(timings) * 1e3:.2f}ms")
+
+    def test_rejected_requests_are_not_recorded(self, api_client, deferred):
+        url = reverse("payments:payment-webhook")
+        response = api_client.post(
+            url, data=b"{}", content_type="application/json", HTTP_CHAPA_SIGNATURE="bad"
+        )
+        assert response.status_code == 403
+        assert post_webhook(api_client, {"status": "success"}).status_code == 400
+        assert post_webhook(api_client, ["not", "an", "object"]).status_code == 400
+        assert not WebhookEvent.objects.exists()
+
+    def test_drain_applies_batches_in_order(self, api_client, payment_factory, deferred):
+        payments = [payment_factory() for _ in range(5)]
+        for payment in payments:
+            post_webhook(api_client, {"tx_ref": payment.tx_ref, "status": "failed"})
+        post_webhook(api_client, {"tx_ref": payments[0].tx_ref, "status": "success"})
+
+        assert drain_webhook_events(batch_size=2) == (6, 0)
+
+        assert not WebhookEvent.objects.pending().exists()
+        # The first payment's "success" arrived after its "failed" and was applied last.
+        payments[0].refresh_from_db()
+        assert payments[0].status == "completed"
+        assert Payment.objects.filter(status="failed").count() == 4
+        assert Order.objects.filter(payment_status=Order.PAYMENT_FAILED).count() == 4
+
+    def test_failing_events_are_retried_then_given_up(self, api_client, payment_factory, deferred):
+        payment = payment_factory()
+        post_webhook(api_client, {"tx_ref": "unknown", "status": "success"})
+        post_webhook(api_client, {"tx_ref": payment.tx_ref, "status": "success"})
+
+        assert drain_webhook_events() == (1, 1)
+        event = WebhookEvent.objects.get(tx_ref="unknown")
+        assert event.processed_at is None
+        assert (event.attempts, event.last_error) == (1, "Payment not found")
+
+        for _ in range(MAX_ATTEMPTS - 1):
+            drain_webhook_events()
+        event.refresh_from_db()
+        assert event.attempts == MAX_ATTEMPTS
+        assert event.processed_at is not None
+        assert drain_webhook_events() == (0, 0)
+
+    def test_replay_is_idempotent(
+        self, api_client, payment_factory, emails, deferred, django_capture_on_commit_callbacks
+    ):
+        payment = payment_factory()
+        post_webhook(api_client, {"tx_ref": payment.tx_ref, "status": "success"})
+        with django_capture_on_commit_callbacks(execute=True):
+            drain_webhook_events()
+
+            WebhookEvent.objects.update(processed_at=None)
+            assert drain_webhook_events() == (1, 0)
+
+        payment.refresh_from_db()
+        assert payment.status == "completed"
+        assert len(emails) == 1
@@ -2,7 +2,7 @@ import uuid
 import hmac
 import json
 import hashlib
-import requests
+import logging
 
 from rest_framework.generics import RetrieveAPIView, ListAPIView
 from rest_framework.permissions import IsAuthenticated
@@ -19,9 +19,12 @@ from drf_spectacular.utils import (
 )
 
 from orders.models import Order
-from .models import Payment
+from .gateway import ChapaError, ChapaUnavailable, get_chapa_client
+from .models import Payment, WebhookEvent
 from .serializers import PaymentSerializer
-from .tasks import send_payment_confirmation_email
+from .tasks import process_webhook_events
+
+logger = logging.getLogger(__name__)
 
 @extend_schema(
     summary="Initiate a payment for an order",
@@ -45,6 +48,7 @@ from .tasks import send_payment_confirmation_email
         200: OpenApiTypes.OBJECT,
         400: OpenApiTypes.OBJECT,
         404: OpenApiTypes.OBJECT,
+        503: OpenApiTypes.OBJECT,
     },
 )
 @api_view(["POST"])
@@ -74,8 +78,7 @@ def initiate_payment(request):
     if hasattr(order, "payment"):
         if order.payment.status == "completed":
             return Response({"detail": "Order already paid"}, status=400)
-        # If payment exists but is pending or failed, we can reuse it or create new one
-        # For simplicity, we'll return the existing payment URL if pending
+        # A pending payment is still in flight; a failed one is retried below.
         if order.payment.status == "pending":
             return Response({
                 "detail": "Payment already initiated",
@@ -85,12 +88,25 @@ def initiate_payment(request):
 
     tx_ref = str(uuid.uuid4())
 
-    payment = Payment.objects.create(
-        order=order,
-        tx_ref=tx_ref,
-        amount=order.total,
-        currency="ETB"
-    )
+    if hasattr(order, "payment"):
+        # Retry after a failed attempt: an order has one payment row, so reuse
+        # it under a fresh tx_ref. Chapa would refuse the old one if it saw it.
+        payment = order.payment
+        if not payment.transition(
+            Payment.STATUS_PENDING,
+            [Payment.STATUS_FAILED],
+            Order.PAYMENT_PENDING,
+            tx_ref=tx_ref,
+            amount=order.total,
+        ):
+            return Response({"detail": "Payment already initiated"}, status=400)
+    else:
+        payment = Payment.objects.create(
+            order=order,
+            tx_ref=tx_ref,
+            amount=order.total,
+            currency="ETB"
+        )
 
     chapa_payload = {
         "amount": str(order.total),
@@ -103,22 +119,17 @@ def initiate_payment(request):
         "return_url": return_url,
     }
 
-    headers = {
-        "Authorization": f"Bearer {settings.CHAPA_SECRET_KEY}",
-    }
-
-    response = requests.post(
-        f"{settings.CHAPA_BASE_URL}/transaction/initialize",
-        headers=headers,
-        data=chapa_payload
-    )
-
-    if response.status_code != 200:
+    try:
+        checkout_url = get_chapa_client().initialize(chapa_payload)
+    except ChapaUnavailable:
+        payment.mark_failed()
+        return Response(
+            {"detail": "Payment gateway is unavailable, please try again later"}, status=503
+        )
+    except ChapaError:
         payment.mark_failed()
         return Response({"detail": "Failed to initialize payment"}, status=400)
 
-    checkout_url = response.json()["data"]["checkout_url"]
-
     return Response({
         "payment_url": checkout_url,
         "payment_id": str(payment.id),
@@ -127,7 +138,10 @@ def initiate_payment(request):
 
 @extend_schema(
     summary="Chapa webhook callback",
-    description="Handles Chapa payment status updates using HMAC signature verification.",
+    description=(
+        "Verifies the HMAC signature and records the payment status update. "
+        "Updates are applied to payments and orders in the background."
+    ),
     tags=["Payments"],
     request=OpenApiTypes.OBJECT,
     responses={200: OpenApiTypes.OBJECT},
@@ -152,39 +166,30 @@ def chapa_webhook(request):
         payload = json.loads(request.body)
     except json.JSONDecodeError:
         return Response({"detail": "Invalid JSON"}, status=400)
+    if not isinstance(payload, dict):
+        return Response({"detail": "Invalid JSON"}, status=400)
 
     tx_ref = payload.get("tx_ref")
     chapa_status = payload.get("status")
-    email = payload.get("email")
-    amount = payload.get("amount")
 
     if not tx_ref:
         return Response({"detail": "tx_ref missing"}, status=400)
-
+    if not isinstance(tx_ref, str) or len(tx_ref) > 100:
+        return Response({"detail": "Invalid tx_ref"}, status=400)
+
+    # Record the event and answer; process_webhook_events applies it.
+    # A redelivered tx_ref/status pair is dropped by the unique constraint.
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(tx_ref=tx_ref, status=str(chapa_status or "")[:50], payload=payload)],
+        ignore_conflicts=True,
+    )
     try:
-        payment = Payment.objects.get(tx_ref=tx_ref)
-    except Payment.DoesNotExist:
-        return Response({"detail": "Payment not found"}, status=404)
-
-    if chapa_status == "success":
-        changed = payment.mark_completed()
-        if changed:
-            payment.order.payment_status = Order.PAYMENT_PAID
-            payment.order.save(update_fields=["payment_status"])
-
-            send_payment_confirmation_email.delay(
-                email,
-                amount,
-                tx_ref
-            )
+        process_webhook_events.delay()
+    except Exception:
+        # The event is stored; the periodic drain will pick it up.
+        logger.warning("Could not enqueue webhook processing.", exc_info=True)
 
-    elif chapa_status == "failed":
-        changed = payment.mark_failed()
-        if changed:
-            payment.order.payment_status = Order.PAYMENT_FAILED
-            payment.order.save(update_fields=["payment_status"])
-
-    return Response({"detail": "Webhook processed"}, status=200)
+    return Response({"detail": "Webhook received"}, status=200)
 
 
 @extend_schema(
@@ -197,7 +202,8 @@ class PaymentListView(ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Payment.objects.filter(order__user=self.request.user)
+        # Joins through order_user_created and the payment's unique order_id index.
+        return Payment.objects.filter(order__user=self.request.user).order_by("-created_at")
 
 
 @extend_schema(
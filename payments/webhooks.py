@@ -0,0 +1,105 @@
+"""
+Applying Chapa webhook events from the ``WebhookEvent`` inbox.
+
+The webhook view verifies the signature, records the event and answers
+straight away. ``drain_webhook_events`` (run by the ``process_webhook_events``
+task) takes pending events in id order, a batch at a time. Each batch holds
+row locks with SKIP LOCKED, so concurrent workers take different batches,
+and the batch's payments are loaded in one query. Every event is applied in
+its own savepoint. A failing event is retried by later drains, up to
+MAX_ATTEMPTS. To replay events, clear their ``processed_at``.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import OrderItem
+from orders.reservations import get_ledger, reservations_enabled
+
+from .models import Payment, WebhookEvent
+from .tasks import send_payment_confirmation_email
+
+logger = logging.getLogger(__name__)
+
+DRAIN_BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+
+
+class WebhookEventError(Exception):
+    pass
+
+
+def apply_event(event, payment):
+    if payment is None:
+        raise WebhookEventError("Payment not found")
+
+    if event.status == "success":
+        # Only the caller whose conditional UPDATE changed the row goes on.
+        if payment.mark_completed():
+            if reservations_enabled():
+                # Turn the order's stock hold into a committed sale
+                quantities = dict(
+                    OrderItem.objects.filter(order_id=payment.order_id)
+                    .values_list("product_id", "quantity")
+                )
+                get_ledger().commit(payment.order_id, quantities)
+
+            email, amount = event.payload.get("email"), event.payload.get("amount")
+            transaction.on_commit(
+                lambda: send_payment_confirmation_email.delay(email, amount, event.tx_ref)
+            )
+
+    elif event.status == "failed":
+        if payment.mark_failed() and reservations_enabled():
+            get_ledger().release(payment.order_id)
+
+
+def _apply_batch(events):
+    payments = Payment.objects.in_bulk(
+        {event.tx_ref for event in events}, field_name="tx_ref"
+    )
+    now = timezone.now()
+    applied = 0
+    for event in events:
+        event.attempts += 1
+        try:
+            with transaction.atomic():
+                apply_event(event, payments.get(event.tx_ref))
+        except Exception as exc:
+            logger.exception("Webhook event %s failed (attempt %s).", event.pk, event.attempts)
+            event.last_error = str(exc)
+            if event.attempts >= MAX_ATTEMPTS:
+                event.processed_at = now
+        else:
+            event.last_error = ""
+            event.processed_at = now
+            applied += 1
+    WebhookEvent.objects.bulk_update(events, ["attempts", "processed_at", "last_error"])
+    return applied
+
+
+def drain_webhook_events(batch_size=DRAIN_BATCH_SIZE):
+    """
+    Apply every pending event once. Returns ``(applied, failed)`` counts;
+    failed events stay pending until they run out of attempts.
+    """
+    applied = failed = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                WebhookEvent.objects.pending()
+                .filter(pk__gt=last_id)
+                .order_by("pk")
+                .select_for_update(skip_locked=True)[:batch_size]
+            )
+            if not events:
+                break
+            batch_applied = _apply_batch(events)
+        applied += batch_applied
+        failed += len(events) - batch_applied
+        last_id = events[-1].pk
+        if len(events) < batch_size:
+            break
+    return applied, failed